@@ -2,62 +2,123 @@
 
 import streamlit as st
 import pandas as pd
-from scraper import scrape_player_stats, select_all_nhl_matches_and_extract_data, fusionner_donnees_par_prenom_nom
-from firebase_utils import initialize_firebase
-from datetime import datetime, timedelta
+from scraper import fusionner_donnees_par_prenom_nom, charger_backend, COLONNES_COTES, NB_NAVIGATEURS
+from data_processing import agreger_cotes
+from firebase_utils import initialize_firebase, publier_table, lire_collection, lire_paquet, decrire_lots, MODE_STOCKAGE
+from config import identifiants_firebase, identifiants_cotes
+from cache import CacheTTL
+from stockage import lire_snapshot, ecrire_snapshot
+from journal_cotes import historique_joueur, mouvements_creneau, joueurs_indexes
+from taches import executer
+from travaux import GestionnaireTravaux
+from index_joueurs import IndexJoueurs
+from schema import appliquer_schema, pour_affichage
+from indicateurs import calculer_indicateurs, COLONNES_INDICATEURS
+from datetime import datetime
+import os
 
 # Initialize Firebase
 try:
-    db = initialize_firebase()
+    # Fichier de configuration local d'abord, puis secrets de Streamlit Cloud
+    firebase_secrets = identifiants_firebase()
+    if firebase_secrets is None and "firebase_credentials" in st.secrets:
+        firebase_secrets = dict(st.secrets["firebase_credentials"])
+    db = initialize_firebase(firebase_secrets)
 except Exception as e:
     st.error(f"Erreur d'initialisation de Firebase: {str(e)}")
     st.stop()
 
+def identifiants_site():
+    """Identifiants du site de cotes : configuration locale, sinon secrets Streamlit"""
+    try:
+        return identifiants_cotes()
+    except KeyError:
+        return dict(st.secrets["credentials"])
+
+# Préchauffage des navigateurs du scraper de cotes en arrière-plan (ODDS_PRECHAUFFAGE=1)
+@st.cache_resource
+def prechauffer_navigateurs():
+    pool = charger_backend('selenium').obtenir_pool_navigateurs(identifiants_site(), NB_NAVIGATEURS)
+    pool.prechauffer()
+    return pool
+
+if os.environ.get("ODDS_PRECHAUFFAGE") == "1":
+    prechauffer_navigateurs()
+
 # Streamlit interface
 st.title("Scraping des Statistiques des Joueurs de Hockey et des Cotes des Matchs")
 
 # Cache management
-def should_refresh_cache(last_update_time):
-    if last_update_time is None:
-        return True
-    return datetime.now() - last_update_time > timedelta(minutes=5)
+# Durée de vie (en secondes) des collections Firestore en cache, configurable par variable d'environnement
+CACHE_TTL_SECONDES = int(os.environ.get("FIRESTORE_CACHE_TTL", 300))
 
-def load_data_from_firestore(collection_name, expected_columns=None):
-    if not db:
-        return None
-    
+@st.cache_resource
+def get_firestore_cache():
+    """Cache des collections partagé entre toutes les sessions"""
+    return CacheTTL(CACHE_TTL_SECONDES)
+
+# Tables du stockage local (Parquet) correspondant aux collections Firestore
+LOCAL_TABLES = {'stats_joueurs_database': 'stats', 'cotes_joueurs_database': 'odds'}
+# Firestore n'est qu'une copie du stockage local ; FIRESTORE_MIRROR=0 désactive les écritures
+FIRESTORE_MIRROR = os.environ.get("FIRESTORE_MIRROR", "1") == "1"
+
+# Dernière version lue de chaque collection en disposition "paquet" : {collection: (version, DataFrame)}
+@st.cache_resource
+def get_paquets_lus():
+    return {}
+
+def _lire_firestore(collection_name, expected_columns=None):
+    """
+    Lit une collection Firestore : paquet si le mode de stockage en écrit un (un pointeur, puis ses
+    blocs seulement si la version a changé), sinon documents par joueur limités aux champs demandés
+    """
+    if MODE_STOCKAGE != 'documents':
+        paquets = get_paquets_lus()
+        version_connue, df_connu = paquets.get(collection_name, (None, None))
+        version, df = lire_paquet(db, collection_name, version_connue)
+        if version is not None:
+            if df is None:
+                return df_connu
+            paquets[collection_name] = (version, df)
+            return df
+    df = lire_collection(db, collection_name, expected_columns)
+    if not df.empty:
+        df = df.dropna(subset=[colonne for colonne in ('Prénom', 'Nom') if colonne in df.columns])
+    return df
+
+def load_data(collection_name, expected_columns=None):
+    """Charge une table depuis le stockage local, ou depuis Firestore si aucun snapshot local n'existe"""
+    cle = (collection_name, tuple(expected_columns) if expected_columns else None)
+    df = get_firestore_cache().obtenir(cle, lambda: _read_collection(collection_name, expected_columns))
+    # Copie pour ne pas modifier l'objet partagé entre les sessions
+    return df.copy() if df is not None else None
+
+def _read_collection(collection_name, expected_columns=None):
     try:
-        # Récupérer tous les documents
-        docs = db.collection(collection_name).stream()
-        data = {}
-        
-        # Créer un dictionnaire avec les données les plus récentes pour chaque joueur
-        for doc in docs:
-            doc_dict = doc.to_dict()
-            if 'Prénom' in doc_dict and 'Nom' in doc_dict:
-                key = f"{doc_dict['Prénom']}_{doc_dict['Nom']}"
-                # Si le joueur existe déjà, comparer les dates de mise à jour si disponibles
-                if key in data:
-                    # Pour l'instant, on garde la première entrée (à améliorer avec des timestamps)
-                    continue
-                data[key] = doc_dict
+        # Lecture du dernier snapshot local (fichier Parquet mappé en mémoire)
+        df = None
+        if collection_name in LOCAL_TABLES:
+            table = LOCAL_TABLES[collection_name]
+            # Les cotes sont stockées au format long et résumées par joueur à la lecture
+            df = lire_snapshot(table, colonnes=COLONNES_COTES if table == 'odds' else expected_columns)
         
-        # Convertir le dictionnaire en DataFrame
-        df = pd.DataFrame(list(data.values()))
+        # Sinon, lecture de Firestore
+        if df is None or df.empty:
+            if not db:
+                return None
+            df = _lire_firestore(collection_name, expected_columns)
         
         # Si le DataFrame est vide, retourner None
         if df.empty:
             return None
+        df = agreger_cotes(df)
         
         # Réorganiser les colonnes si nécessaire
         if expected_columns:
             df = df.reindex(columns=expected_columns)
         
-        # Convertir les colonnes numériques
-        numeric_columns = ['GP', 'G', 'A', 'SOG', 'SPCT', 'TSA']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Types compacts (voir schema.py) ; sans effet sur un snapshot local, déjà typé
+        df = appliquer_schema(df)
         
         # Trier le DataFrame
         if 'Team' in df.columns and 'Nom' in df.columns:
@@ -66,67 +127,127 @@ def load_data_from_firestore(collection_name, expected_columns=None):
         return df
         
     except Exception as e:
-        st.error(f"Erreur lors du chargement des données depuis Firebase: {str(e)}")
+        st.error(f"Erreur lors du chargement des données: {str(e)}")
         return None
 
+# Scrapings exécutés en arrière-plan : un seul travail de chaque type pour toutes les sessions
+@st.cache_resource
+def get_travaux():
+    return GestionnaireTravaux()
+
+def travail_scraping(tache, table, collection, config, cache, travaux):
+    """Scraping en arrière-plan : snapshot local, copie dans Firestore puis invalidation du cache"""
+    # Les messages d'avancement des scrapers vont directement dans la progression du travail
+    travail = travaux.travail_courant()
+    if not executer(tache, config, progression=travail.progression if travail else None):
+        return "Un scraping du même type est déjà en cours dans un autre processus"
+    message = "Données récupérées et stockées avec succès!"
+    if FIRESTORE_MIRROR and db:
+        # Même publication que la tâche de publication : documents par joueur (synchronisation
+        # incrémentale) et/ou paquet, selon FIRESTORE_MODE
+        resultat = publier_table(collection, agreger_cotes(lire_snapshot(table)), db)
+        if resultat is False:
+            message += " La copie dans Firestore a échoué."
+        else:
+            if resultat['documents']:
+                compteurs = resultat['documents']
+                message += (f" Firestore : {compteurs['ajoutés']} ajoutés, {compteurs['modifiés']} modifiés, "
+                            f"{compteurs['supprimés']} supprimés, {compteurs['inchangés']} inchangés, "
+                            f"{decrire_lots(compteurs['lots'])}.")
+            if resultat['paquet']:
+                message += (f" Paquet Firestore : version {resultat['paquet']['version']}, "
+                            f"{resultat['paquet']['blocs']} blocs écrits, {decrire_lots(resultat['paquet']['lots'])}.")
+    cache.invalider(collection)
+    cache.invalider('fusion')
+    return message
+
+def charger_index_fusion():
+    """Fusionne les statistiques et les cotes et indexe le résultat par équipe et position"""
+    stats_columns = ["Prénom", "Nom", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI"]
+    odds_columns = ["Prénom", "Nom", "Team", "Cote"]
+    stats_df = load_data('stats_joueurs_database', stats_columns)
+    odds_df = load_data('cotes_joueurs_database', odds_columns)
+    if stats_df is None or odds_df is None:
+        return None
+    merged_df = fusionner_donnees_par_prenom_nom(stats_df, odds_df, approche=True)
+    merged_df["G"] = merged_df["G"].fillna(0)
+    return IndexJoueurs(calculer_indicateurs(merged_df))
+
+def lancer_scraping(tache, table, collection):
+    config = {'credentials': identifiants_site()} if tache == 'cotes' else {}
+    travaux = get_travaux()
+    return travaux.soumettre(tache, travail_scraping, tache, table, collection, config, get_firestore_cache(), travaux)
+
+@st.fragment(run_every=2)
+def suivi_travail(tache):
+    """Affiche l'état du dernier travail `tache` ; relance la page une fois quand il se termine"""
+    travail = get_travaux().dernier(tache)
+    if travail is None:
+        return
+    if not travail.termine:
+        st.info(f"Travail {travail.etat} depuis {travail.duree:.0f}s")
+        for message in list(travail.messages)[-5:]:
+            st.caption(message)
+        return
+    st.write(f"Dernière mise à jour : {travail.fin.strftime('%d/%m/%Y %H:%M:%S')}")
+    if travail.erreur:
+        st.error(f"Une erreur s'est produite lors du scraping: {travail.erreur}")
+    else:
+        st.success(travail.resultat)
+    # Recharger les données de la page à la fin du travail
+    if st.session_state.get(f"travail_affiche_{tache}") != travail.id:
+        st.session_state[f"travail_affiche_{tache}"] = travail.id
+        st.rerun()
+
 # Load data when needed based on the selected menu
-menu = st.sidebar.radio("Navigation", ("Stats joueurs", "Cote joueurs", "Stats + Cotes", "Tous les joueurs"))
+menu = st.sidebar.radio("Navigation", ("Stats joueurs", "Cote joueurs", "Évolution des cotes", "Stats + Cotes", "Tous les joueurs"))
 
 if menu == "Stats joueurs":
     stats_columns = ["Prénom", "Nom", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI"]
-    st.session_state.stats = load_data_from_firestore('stats_joueurs_database', stats_columns)
+    st.session_state.stats = load_data('stats_joueurs_database', stats_columns)
     if st.session_state.stats is not None:
         st.session_state.stats = st.session_state.stats.sort_values(['Team', 'Nom'])
     
     st.header("Statistiques des Joueurs")
-    if 'last_scrape_time' in st.session_state:
-        st.write(f"Dernière mise à jour : {st.session_state.last_scrape_time}")
     if st.button("Démarrer le scraping des statistiques des joueurs", key="scrape_stats", help="Cliquez pour démarrer le scraping des statistiques des joueurs"):
-        with st.spinner('Récupération des statistiques des joueurs...'):
-            st.session_state.last_scrape_time = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-            st.session_state.stats = scrape_player_stats()
-            # Stocker les statistiques dans Firebase avec un batch pour éviter le dépassement de quota
-            stats_dict = st.session_state.stats.to_dict(orient='records')
-            batch = db.batch()
-            for player in stats_dict:
-                # Créer une clé unique en combinant prénom et nom
-                doc_id = f"{player['Prénom']}_{player['Nom']}".replace(" ", "_")
-                doc_ref = db.collection('stats_joueurs_database').document(doc_id)
-                batch.set(doc_ref, player)
-            batch.commit()
-        st.success("Statistiques récupérées et stockées avec succès!")
+        lancer_scraping('stats', 'stats', 'stats_joueurs_database')
+    suivi_travail('stats')
     if st.session_state.stats is not None:
-        st.dataframe(st.session_state.stats, use_container_width=True)
+        st.dataframe(pour_affichage(st.session_state.stats), use_container_width=True)
 
 elif menu == "Cote joueurs":
-    odds_columns = ["Prénom", "Nom", "Cote"]
-    st.session_state.odds_data = load_data_from_firestore('cotes_joueurs_database', odds_columns)
+    odds_columns = ["Prénom", "Nom", "Team", "Cote", "Cote médiane", "Probabilité", "Bookmakers"]
+    st.session_state.odds_data = load_data('cotes_joueurs_database', odds_columns)
     if st.session_state.odds_data is not None:
         st.session_state.odds_data = st.session_state.odds_data.sort_values('Nom')
     
     st.header("Cotes des Joueurs")
-    if 'last_odds_scrape_time' in st.session_state:
-        st.write(f"Dernière mise à jour : {st.session_state.last_odds_scrape_time}")
     if st.button("Démarrer le scraping des cotes des matchs", key="scrape_odds", help="Cliquez pour démarrer le scraping des cotes des matchs"):
-        with st.spinner('Récupération des cotes des matchs...'):
-            st.session_state.last_odds_scrape_time = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-            st.session_state.odds_data = select_all_nhl_matches_and_extract_data()
-            if not st.session_state.odds_data.empty:
-                # Stocker les cotes dans Firebase avec un batch pour éviter le dépassement de quota
-                odds_dict = st.session_state.odds_data.to_dict(orient='records')
-                batch = db.batch()
-                for player in odds_dict:
-                    # Créer une clé unique en combinant prénom et nom
-                    doc_id = f"{player['Prénom']}_{player['Nom']}".replace(" ", "_")
-                    doc_ref = db.collection('cotes_joueurs_database').document(doc_id)
-                    batch.set(doc_ref, player)
-                batch.commit()
-                st.success("Cotes des matchs récupérées et stockées avec succès!")
-            else:
-                st.warning("Aucune cote n'a été trouvée pour les joueurs.")
+        lancer_scraping('cotes', 'odds', 'cotes_joueurs_database')
+    suivi_travail('cotes')
     if st.session_state.odds_data is not None:
         st.dataframe(st.session_state.odds_data, use_container_width=True)
 
+elif menu == "Évolution des cotes":
+    st.header("Évolution des Cotes")
+    joueurs = joueurs_indexes()
+    if not joueurs:
+        st.info("Aucun relevé de cotes pour l'instant : lancez un scraping des cotes.")
+    else:
+        joueur = st.selectbox("Joueur", joueurs)
+        releves = historique_joueur(joueur)
+        if not releves.empty:
+            # Une courbe par bookmaker
+            st.line_chart(releves.pivot_table(index='horodatage', columns='Bookmaker', values='Cote', observed=True))
+
+        st.subheader("Mouvements sur la période")
+        aujourd_hui = datetime.now().date()
+        periode = st.date_input("Période", (aujourd_hui, aujourd_hui))
+        if len(periode) == 2:
+            debut = datetime.combine(periode[0], datetime.min.time())
+            fin = datetime.combine(periode[1], datetime.max.time())
+            st.dataframe(mouvements_creneau(debut, fin), use_container_width=True)
+
 elif menu == "Stats + Cotes":
     st.header("Statistiques et Cotes des Joueurs")
     if 'last_merge_time' in st.session_state:
@@ -137,26 +258,37 @@ elif menu == "Stats + Cotes":
     odds_columns = ["Prénom", "Nom", "Cote"]
     
     if 'stats' not in st.session_state or st.session_state.stats is None:
-        st.session_state.stats = load_data_from_firestore('stats_joueurs_database', stats_columns)
+        st.session_state.stats = load_data('stats_joueurs_database', stats_columns)
     
     if 'odds_data' not in st.session_state or st.session_state.odds_data is None:
-        st.session_state.odds_data = load_data_from_firestore('cotes_joueurs_database', odds_columns)
+        st.session_state.odds_data = load_data('cotes_joueurs_database', odds_columns)
     
     if st.button("Fusionner les données et afficher", key="merge_data", help="Cliquez pour fusionner les données de statistiques et de cotes"):
         if st.session_state.stats is not None and st.session_state.odds_data is not None:
             # Fusionner les données
-            merged_data = fusionner_donnees_par_prenom_nom(st.session_state.stats, st.session_state.odds_data)
+            merged_data, rapport = fusionner_donnees_par_prenom_nom(st.session_state.stats, st.session_state.odds_data,
+                                                                     audit=True, approche=True)
+            merged_data = calculer_indicateurs(merged_data)
             st.session_state.merged_data = merged_data
+            st.session_state.rapport_appariement = rapport
+            # Index équipe/position construit une fois par fusion, réutilisé à chaque rerun
+            st.session_state.index_fusion = IndexJoueurs(merged_data)
+            ecrire_snapshot('merged', merged_data)
             
             # Afficher les données après fusion
             st.write("### Données après fusion:")
             st.write(f"Nombre total de joueurs: {len(merged_data)}")
             st.success("Données fusionnées avec succès!")
 
+    # Rapport d'audit des appariements approchés (noms orthographiés différemment)
+    rapport = st.session_state.get('rapport_appariement')
+    if rapport is not None and not rapport.empty:
+        with st.expander(f"🔎 Appariements approchés : {int(rapport['Accepté'].sum())} acceptés"):
+            st.dataframe(rapport, use_container_width=True)
+
     # Afficher les données fusionnées par équipe
-    if hasattr(st.session_state, 'merged_data') and st.session_state.merged_data is not None:
-        # Filtrer pour exclure l'équipe "0" et convertir toutes les équipes en string avant le tri
-        filtered_data = st.session_state.merged_data[st.session_state.merged_data['Team'].astype(str) != "0"]
+    if st.session_state.get('index_fusion') is not None:
+        index_fusion = st.session_state.index_fusion
         
         # Créer deux colonnes pour les champs de recherche
         col1, col2 = st.columns(2)
@@ -170,16 +302,15 @@ elif menu == "Stats + Cotes":
             search_player = st.text_input("Rechercher un joueur (nom ou prénom)", "").strip()
         
         # Filtrer les données selon la recherche de joueur
+        lignes = index_fusion.lignes()
         if search_player:
-            search_terms = search_player.lower().split()
-            mask = filtered_data.apply(lambda x: any(term in x['Nom'].lower() for term in search_terms) or 
-                                               any(term in x['Prénom'].lower() for term in search_terms), axis=1)
-            filtered_data = filtered_data[mask]
-            if filtered_data.empty:
+            lignes = index_fusion.rechercher(search_player, lignes)
+            if len(lignes) == 0:
                 st.warning(f"Aucun joueur trouvé pour '{search_player}'")
                 st.stop()
             
-        teams = sorted(filtered_data['Team'].astype(str).unique())
+        # Équipes des joueurs retenus, en excluant l'équipe "0"
+        teams = [team for team in index_fusion.equipes_de(lignes) if team != "0"]
         
         # Filtrer les équipes selon la recherche d'équipe
         if search_team:
@@ -194,10 +325,10 @@ elif menu == "Stats + Cotes":
         # Pour chaque équipe, afficher ses joueurs dans son onglet
         for team, tab in zip(teams, tabs):
             with tab:
-                team_data = filtered_data[filtered_data['Team'].astype(str) == team].copy()
+                team_data = index_fusion.equipe(team, lignes)
                 if not team_data.empty:
                     columns = ["Prénom", "Nom", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI", "Cote"]
-                    st.dataframe(team_data[columns], use_container_width=True)
+                    st.dataframe(pour_affichage(team_data[columns]), use_container_width=True)
 
 elif menu == "Tous les joueurs":
     st.header("Tous les joueurs")
@@ -206,158 +337,149 @@ elif menu == "Tous les joueurs":
     if st.button("🔄 Actualiser avec les dernières données", key="all_players_refresh"):
         with st.spinner('Récupération des données...'):
             # Forcer le rafraîchissement des données
-            if 'stats_joueurs' in st.session_state:
-                del st.session_state['stats_joueurs']
-            if 'cotes_joueurs' in st.session_state:
-                del st.session_state['cotes_joueurs']
+            get_firestore_cache().invalider('stats_joueurs_database')
+            get_firestore_cache().invalider('cotes_joueurs_database')
+            get_firestore_cache().invalider('fusion')
             # Réinitialiser les sélections
             st.session_state.selected_teams = []
             st.session_state.selected_positions = []
     
-    # Chargement des données
-    stats_columns = ["Prénom", "Nom", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI"]
-    odds_columns = ["Prénom", "Nom", "Team", "Cote"]
-    
-    stats_df = load_data_from_firestore('stats_joueurs_database', stats_columns)
-    odds_df = load_data_from_firestore('cotes_joueurs_database', odds_columns)
+    # Chargement des données fusionnées et indexées, partagées entre les sessions jusqu'à
+    # l'expiration du cache ou un nouveau scraping
+    index_fusion = get_firestore_cache().obtenir(('fusion', 'tous_les_joueurs'), charger_index_fusion)
     
-    if stats_df is not None and odds_df is not None:
-        # Fusionner les données
-        merged_df = fusionner_donnees_par_prenom_nom(stats_df, odds_df)
+    if index_fusion is not None:
+        all_valid_teams = index_fusion.equipes
+        all_valid_positions = index_fusion.positions
         
-        if merged_df is not None:
-            # Convertir les colonnes en numérique
-            merged_df["Cote"] = pd.to_numeric(merged_df["Cote"], errors='coerce')
-            merged_df["G"] = pd.to_numeric(merged_df["G"], errors='coerce')
-            
-            # Remplacer les NaN par des valeurs par défaut
-            merged_df["Cote"] = merged_df["Cote"].fillna(999)
-            merged_df["G"] = merged_df["G"].fillna(0)
-            
-            # Obtenir toutes les équipes et positions valides depuis les données originales
-            all_valid_teams = sorted([str(team) for team in merged_df["Team"].unique() 
-                                    if str(team) not in ["nan", "None", "", "Non assigné", "0"]])
-            all_valid_positions = sorted([str(pos) for pos in merged_df["Pos"].unique() 
-                                       if str(pos) not in ["nan", "None", "", "Non assigné"]])
-            
-            # Créer une copie pour les filtres
-            filtered_df = merged_df.copy()
-            
-            # Filtres numériques
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                # Filtre de cote minimum
-                max_cote = min(filtered_df[filtered_df["Cote"] < 999]["Cote"].max(), 10.0)
-                min_cote = st.number_input("Cote minimum", 
-                                         min_value=1.0,
-                                         max_value=float(max_cote),
-                                         value=1.0,
-                                         step=0.1,
-                                         key="all_players_min_cote")
-            
-            with col2:
-                # Filtre de buts minimum
-                max_buts = int(filtered_df["G"].max())
-                min_buts = st.number_input("Nombre minimum de buts", 
-                                         min_value=0,
-                                         max_value=max_buts,
-                                         value=0,
-                                         key="all_players_min_buts")
-            
-            with col3:
-                # Filtre pour exclure les cotes manquantes
-                show_missing_odds = st.checkbox("Afficher les joueurs sans cote", 
-                                             value=False,
-                                             key="all_players_show_missing")
-            
-            # Initialiser les sélections si nécessaire
-            if "selected_teams" not in st.session_state:
-                st.session_state.selected_teams = all_valid_teams.copy()
-            if "selected_positions" not in st.session_state:
-                st.session_state.selected_positions = all_valid_positions.copy()
-            
-            # Fonction de callback pour les sélections d'équipes
-            def on_team_selection():
-                st.session_state.selected_teams = st.session_state.teams_multiselect
-            
-            # Fonction de callback pour les sélections de positions
-            def on_position_selection():
-                st.session_state.selected_positions = st.session_state.positions_multiselect
-            
-            # Expander pour les filtres d'équipe
-            with st.expander("🏒 Filtrer par équipe"):
-                # Boutons pour tout sélectionner/désélectionner
-                col1_1, col1_2 = st.columns(2)
-                with col1_1:
-                    if st.button("Tout sélectionner", key="select_all_teams"):
-                        st.session_state.selected_teams = all_valid_teams.copy()
-                        st.session_state.teams_multiselect = all_valid_teams.copy()
-                with col1_2:
-                    if st.button("Tout désélectionner", key="deselect_all_teams"):
-                        st.session_state.selected_teams = []
-                        st.session_state.teams_multiselect = []
-                
-                # Multiselect pour les équipes avec callback
-                selected_teams = st.multiselect(
-                    "Sélectionner les équipes",
-                    options=all_valid_teams,
-                    default=st.session_state.selected_teams,
-                    key="teams_multiselect",
-                    on_change=on_team_selection
-                )
-            
-            # Expander pour les filtres de position
-            with st.expander("👥 Filtrer par position"):
-                # Boutons pour tout sélectionner/désélectionner
-                col2_1, col2_2 = st.columns(2)
-                with col2_1:
-                    if st.button("Tout sélectionner", key="select_all_positions"):
-                        st.session_state.selected_positions = all_valid_positions.copy()
-                        st.session_state.positions_multiselect = all_valid_positions.copy()
-                with col2_2:
-                    if st.button("Tout désélectionner", key="deselect_all_positions"):
-                        st.session_state.selected_positions = []
-                        st.session_state.positions_multiselect = []
-                
-                # Multiselect pour les positions avec callback
-                selected_positions = st.multiselect(
-                    "Sélectionner les positions",
-                    options=all_valid_positions,
-                    default=st.session_state.selected_positions,
-                    key="positions_multiselect",
-                    on_change=on_position_selection
-                )
-            
-            # Appliquer tous les filtres
-            if not show_missing_odds:
-                filtered_df = filtered_df[filtered_df["Cote"] < 999]
-            
-            filtered_df = filtered_df[
-                (filtered_df["Cote"] >= min_cote) & 
-                (filtered_df["G"] >= min_buts)
-            ]
-            
-            if st.session_state.selected_teams:
-                filtered_df = filtered_df[filtered_df["Team"].isin(st.session_state.selected_teams)]
-            
-            if st.session_state.selected_positions:
-                filtered_df = filtered_df[filtered_df["Pos"].isin(st.session_state.selected_positions)]
+        # Filtres numériques
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            # Filtre de cote minimum
+            cote_la_plus_haute = index_fusion.df["Cote"].max()
+            max_cote = min(cote_la_plus_haute, 10.0) if pd.notna(cote_la_plus_haute) else 10.0
+            min_cote = st.number_input("Cote minimum", 
+                                     min_value=1.0,
+                                     max_value=float(max_cote),
+                                     value=1.0,
+                                     step=0.1,
+                                     key="all_players_min_cote")
+        
+        with col2:
+            # Filtre de buts minimum
+            max_buts = int(index_fusion.df["G"].max())
+            min_buts = st.number_input("Nombre minimum de buts", 
+                                     min_value=0,
+                                     max_value=max_buts,
+                                     value=0,
+                                     key="all_players_min_buts")
+        
+        with col3:
+            # Filtre pour exclure les cotes manquantes
+            show_missing_odds = st.checkbox("Afficher les joueurs sans cote", 
+                                         value=False,
+                                         key="all_players_show_missing")
+        
+        # Initialiser les sélections si nécessaire
+        if "selected_teams" not in st.session_state:
+            st.session_state.selected_teams = all_valid_teams.copy()
+        if "selected_positions" not in st.session_state:
+            st.session_state.selected_positions = all_valid_positions.copy()
+        
+        # Fonction de callback pour les sélections d'équipes
+        def on_team_selection():
+            st.session_state.selected_teams = st.session_state.teams_multiselect
+        
+        # Fonction de callback pour les sélections de positions
+        def on_position_selection():
+            st.session_state.selected_positions = st.session_state.positions_multiselect
+        
+        # Expander pour les filtres d'équipe
+        with st.expander("🏒 Filtrer par équipe"):
+            # Boutons pour tout sélectionner/désélectionner
+            col1_1, col1_2 = st.columns(2)
+            with col1_1:
+                if st.button("Tout sélectionner", key="select_all_teams"):
+                    st.session_state.selected_teams = all_valid_teams.copy()
+                    st.session_state.teams_multiselect = all_valid_teams.copy()
+            with col1_2:
+                if st.button("Tout désélectionner", key="deselect_all_teams"):
+                    st.session_state.selected_teams = []
+                    st.session_state.teams_multiselect = []
             
-            # Afficher le nombre total de joueurs
-            st.write(f"Nombre total de joueurs : {len(filtered_df)}")
+            # Multiselect pour les équipes avec callback
+            selected_teams = st.multiselect(
+                "Sélectionner les équipes",
+                options=all_valid_teams,
+                default=st.session_state.selected_teams,
+                key="teams_multiselect",
+                on_change=on_team_selection
+            )
+        
+        # Expander pour les filtres de position
+        with st.expander("👥 Filtrer par position"):
+            # Boutons pour tout sélectionner/désélectionner
+            col2_1, col2_2 = st.columns(2)
+            with col2_1:
+                if st.button("Tout sélectionner", key="select_all_positions"):
+                    st.session_state.selected_positions = all_valid_positions.copy()
+                    st.session_state.positions_multiselect = all_valid_positions.copy()
+            with col2_2:
+                if st.button("Tout désélectionner", key="deselect_all_positions"):
+                    st.session_state.selected_positions = []
+                    st.session_state.positions_multiselect = []
             
-            # Afficher les données
-            if not filtered_df.empty:
-                st.dataframe(filtered_df[["Prénom", "Nom", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI", "Cote"]], 
-                           use_container_width=True)
-            else:
-                st.warning("Aucun joueur ne correspond aux critères sélectionnés")
+            # Multiselect pour les positions avec callback
+            selected_positions = st.multiselect(
+                "Sélectionner les positions",
+                options=all_valid_positions,
+                default=st.session_state.selected_positions,
+                key="positions_multiselect",
+                on_change=on_position_selection
+            )
+        
+        # Appliquer tous les filtres (intersections des index équipe et position)
+        filtered_df = index_fusion.filtrer(
+            equipes=st.session_state.selected_teams or None,
+            positions=st.session_state.selected_positions or None,
+            cote_min=min_cote,
+            buts_min=min_buts,
+            sans_cote=show_missing_odds,
+        )
+        
+        # Afficher le nombre total de joueurs
+        st.write(f"Nombre total de joueurs : {len(filtered_df)}")
+        
+        # Tri par indicateur de valeur (décroissant), les joueurs sans valeur en dernier
+        tri = st.selectbox("Trier par", ["Équipe"] + COLONNES_INDICATEURS + ["Cote", "G"], key="all_players_tri")
+        if tri != "Équipe":
+            filtered_df = filtered_df.sort_values(tri, ascending=False, na_position='last', kind='stable')
+        
+        # Afficher les données
+        if not filtered_df.empty:
+            colonnes = ["Prénom", "Nom", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI", "Cote"] + COLONNES_INDICATEURS
+            st.dataframe(pour_affichage(filtered_df[colonnes]), use_container_width=True, hide_index=True,
+                         column_config={
+                             "Buts/match": st.column_config.NumberColumn(format="%.2f"),
+                             "Tirs/match": st.column_config.NumberColumn(format="%.2f"),
+                             "Prob. implicite": st.column_config.ProgressColumn(format="%.3f", min_value=0.0, max_value=1.0),
+                             "Prob. buteur": st.column_config.ProgressColumn(format="%.3f", min_value=0.0, max_value=1.0),
+                             "Espérance": st.column_config.NumberColumn(format="%+.3f"),
+                             "Avantage": st.column_config.NumberColumn(format="%+.3f"),
+                         })
         else:
-            st.error("Erreur lors de la fusion des données")
+            st.warning("Aucun joueur ne correspond aux critères sélectionnés")
     else:
         st.error("Erreur lors du chargement des données")
 
+# Métriques du cache Firestore
+metriques_cache = get_firestore_cache().metriques()
+st.sidebar.caption(
+    f"Cache Firestore : {metriques_cache['succes']} succès / {metriques_cache['echecs']} échecs "
+    f"({metriques_cache['taux_succes']:.0%})"
+)
+
 # Options d'exportation des données localement
 if st.sidebar.button("Télécharger les données", key="download_data"):
     if st.session_state.stats is not None:
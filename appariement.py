@@ -0,0 +1,270 @@
+# appariement.py
+
+import os
+import logging
+import hashlib
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+from data_processing import enlever_accents_serie
+from prenoms import charger_index_prenoms
+
+# Score minimal (entre 0 et 1) pour accepter un appariement approché
+SEUIL_APPARIEMENT = float(os.environ.get("SEUIL_APPARIEMENT", 0.85))
+# Longueur du début et de la fin du nom utilisés comme clés de blocage
+LONGUEUR_BLOCAGE = 3
+# Nombre maximal de paires d'un bloc (lignes stats × lignes cotes) : un bloc plus grand est découpé
+# par les clés de RAFFINEMENTS, pour ne pas faire exploser le nombre de paires
+PAIRES_PAR_BLOC_MAX = 2500
+# Longueur du début ou de la fin du nom utilisée par le second raffinement
+LONGUEUR_RAFFINEMENT = LONGUEUR_BLOCAGE + 2
+# Poids du nom dans le score (le reste va au prénom)
+POIDS_NOM = 0.7
+# Équipe joker : un joueur de cotes sans équipe est comparé à toutes les équipes
+EQUIPE_JOKER = "*"
+# Les paires rejetées dont le score est à moins de MARGE_RAPPORT du seuil figurent aussi dans le rapport
+MARGE_RAPPORT = 0.15
+
+# Nombre de rapports gardés en mémoire (voir apparier_restants_en_cache)
+TAILLE_CACHE_APPARIEMENT = 8
+
+COLONNES_RAPPORT = ['Prénom', 'Nom', 'Team', 'Prénom cote', 'Nom cote', 'Team cote', 'Score', 'Accepté']
+
+logger = logging.getLogger(__name__)
+
+_cache_rapports = OrderedDict()
+_verrou_cache = threading.Lock()
+
+
+def similarite(a, b, minimum=0.0):
+    """
+    Similarité de deux chaînes entre 0 et 1 (ratio de difflib). Les bornes supérieures bon marché
+    de difflib écartent d'abord les paires qui ne peuvent pas atteindre `minimum` (score 0).
+    """
+    if a == b:
+        return 1.0
+    comparateur = SequenceMatcher(None, a, b, autojunk=False)
+    if comparateur.real_quick_ratio() < minimum or comparateur.quick_ratio() < minimum:
+        return 0.0
+    return comparateur.ratio()
+
+
+def _similarites(gauches, droites, minimum=0.0):
+    """Similarités terme à terme, calculées une seule fois par couple de chaînes distinct"""
+    couples = pd.MultiIndex.from_arrays([gauches.to_numpy(), droites.to_numpy()])
+    codes, uniques = couples.factorize()
+    if not len(uniques):
+        return np.empty(0)
+    return np.array([similarite(a, b, minimum) for a, b in uniques], dtype=float)[codes]
+
+
+def _preparer(df):
+    """Prénom canonique, nom replié en minuscules et équipe de chaque ligne"""
+    noms = enlever_accents_serie(df['Nom'].astype(str)).str.strip().str.lower()
+    # Team peut être catégorielle (voir schema.py) : conversion en texte avant de remplacer les manquants
+    equipes = (df['Team'].astype(str).where(df['Team'].notna(), '').str.strip() if 'Team' in df
+               else pd.Series('', index=df.index))
+    return pd.DataFrame({
+        'prenom': charger_index_prenoms().canonicaliser(df['Prénom'].astype(str)).to_numpy(),
+        'nom': noms.to_numpy(),
+        'equipe': equipes.replace('', EQUIPE_JOKER).to_numpy(),
+    }, index=df.index)
+
+
+def _cles_blocage(joueurs, equipes_joker=False):
+    """
+    Clés de blocage (équipe, début du nom) et (équipe, fin du nom) : une faute de frappe au début
+    ou à la fin du nom laisse l'autre clé intacte. Avec `equipes_joker`, chaque ligne reçoit aussi
+    les clés de l'équipe joker. La colonne `sens` indique le bout du nom de chaque clé.
+    """
+    equipes = [joueurs['equipe']] + ([pd.Series(EQUIPE_JOKER, index=joueurs.index)] if equipes_joker else [])
+    cles = []
+    for equipe in equipes:
+        for sens, bout in (('debut', joueurs['nom'].str[:LONGUEUR_BLOCAGE]),
+                           ('fin', joueurs['nom'].str[-LONGUEUR_BLOCAGE:])):
+            cles.append(pd.DataFrame({'ligne': joueurs.index, 'cle': (equipe + '|' + bout).to_numpy(), 'sens': sens}))
+    return pd.concat(cles, ignore_index=True)
+
+
+def _initiale_prenom(joueurs, cles):
+    return joueurs.loc[cles['ligne'], 'prenom'].str[:1].to_numpy()
+
+
+def _bout_long(joueurs, cles):
+    noms = joueurs.loc[cles['ligne'], 'nom']
+    return np.where(cles['sens'] == 'debut', noms.str[:LONGUEUR_RAFFINEMENT], noms.str[-LONGUEUR_RAFFINEMENT:])
+
+
+# Clés ajoutées, dans l'ordre, aux blocs trop grands : initiale du prénom, puis bout plus long du nom
+RAFFINEMENTS = (_initiale_prenom, _bout_long)
+
+
+def _blocs_trop_grands(cles_stats, cles_cotes):
+    """Clés dont le bloc compte plus de PAIRES_PAR_BLOC_MAX paires, avec leurs nombres de lignes"""
+    tailles = pd.concat([cles_stats['cle'].value_counts().rename('stats'),
+                         cles_cotes['cle'].value_counts().rename('cotes')], axis=1, join='inner')
+    return tailles[tailles['stats'] * tailles['cotes'] > PAIRES_PAR_BLOC_MAX]
+
+
+def _decouper_blocs(cles_stats, joueurs_stats, cles_cotes, joueurs_cotes):
+    """
+    Découpe les blocs trop grands en ajoutant à leurs clés, des deux côtés, les clés de RAFFINEMENTS
+    jusqu'à ce qu'ils passent sous PAIRES_PAR_BLOC_MAX. Les blocs encore trop grands après le dernier
+    raffinement sont écartés et signalés dans le journal.
+    """
+    for raffinement in RAFFINEMENTS:
+        trop_grands = _blocs_trop_grands(cles_stats, cles_cotes).index
+        if trop_grands.empty:
+            return cles_stats, cles_cotes
+        decoupes = []
+        for cles, joueurs in ((cles_stats, joueurs_stats), (cles_cotes, joueurs_cotes)):
+            a_decouper = cles['cle'].isin(trop_grands).to_numpy()
+            morceau = cles[a_decouper]
+            cles = cles.copy()
+            cles.loc[a_decouper, 'cle'] = morceau['cle'] + '|' + raffinement(joueurs, morceau)
+            decoupes.append(cles)
+        cles_stats, cles_cotes = decoupes
+    trop_grands = _blocs_trop_grands(cles_stats, cles_cotes)
+    if not trop_grands.empty:
+        logger.warning(f"{len(trop_grands)} blocs d'appariement écartés (plus de {PAIRES_PAR_BLOC_MAX} paires) : "
+                       + ", ".join(f"{cle} ({ligne.stats} stats × {ligne.cotes} cotes)"
+                                   for cle, ligne in trop_grands.iterrows()))
+        cles_stats = cles_stats[~cles_stats['cle'].isin(trop_grands.index)]
+        cles_cotes = cles_cotes[~cles_cotes['cle'].isin(trop_grands.index)]
+    return cles_stats, cles_cotes
+
+
+def _rapport_vide():
+    index = pd.MultiIndex.from_arrays([[], []], names=['ligne_stats', 'ligne_cotes'])
+    return pd.DataFrame(columns=COLONNES_RAPPORT, index=index).astype({'Score': float, 'Accepté': bool})
+
+
+def apparier_restants(stats, cotes, seuil=SEUIL_APPARIEMENT):
+    """
+    Appariement approché des joueurs que la jointure exacte n'a pas reliés.
+    `stats` et `cotes` ne contiennent que les lignes restantes (colonnes Prénom, Nom et Team).
+    Les paires candidates sont limitées aux joueurs distincts qui partagent une clé de blocage (les
+    blocs trop grands sont découpés, voir _decouper_blocs), ce qui garde un coût quasi linéaire ;
+    chaque paire reçoit un score pondéré nom/prénom et les paires au-dessus de `seuil` sont retenues
+    une à une par score décroissant (un joueur n'est apparié qu'une fois, toutes saisons confondues).
+    Retourne le rapport d'audit des paires évaluées, indexé par (ligne stats, ligne cotes).
+    """
+    if stats.empty or cotes.empty:
+        return _rapport_vide()
+
+    joueurs_stats, joueurs_cotes = _preparer(stats), _preparer(cotes)
+    # Un joueur présent sur plusieurs saisons n'est comparé qu'une fois : les blocs et les paires
+    # portent sur ses lignes représentantes (la première de chaque identité prénom, nom, équipe)
+    identites = joueurs_stats.drop_duplicates()
+    representants = pd.Series(joueurs_stats.index, index=joueurs_stats.index).groupby(
+        [joueurs_stats['prenom'], joueurs_stats['nom'], joueurs_stats['equipe']], sort=False).transform('first')
+    avec_joker = bool((joueurs_cotes['equipe'] == EQUIPE_JOKER).any())
+    cles_stats, cles_cotes = _decouper_blocs(_cles_blocage(identites, avec_joker), identites,
+                                             _cles_blocage(joueurs_cotes), joueurs_cotes)
+    paires = cles_stats.merge(cles_cotes, on='cle', suffixes=('_stats', '_cotes')
+                              )[['ligne_stats', 'ligne_cotes']].drop_duplicates()
+    if paires.empty:
+        return _rapport_vide()
+
+    # Le nom d'abord : une paire dont le nom ne peut pas porter le score jusqu'au plancher
+    # du rapport, même avec un prénom identique, est écartée sans comparer les prénoms
+    plancher = seuil - MARGE_RAPPORT
+    scores_noms = _similarites(joueurs_stats.loc[paires['ligne_stats'], 'nom'],
+                               joueurs_cotes.loc[paires['ligne_cotes'], 'nom'],
+                               minimum=(plancher - (1 - POIDS_NOM)) / POIDS_NOM)
+    possibles = POIDS_NOM * scores_noms + (1 - POIDS_NOM) >= plancher
+    paires, scores_noms = paires[possibles], scores_noms[possibles]
+    if paires.empty:
+        return _rapport_vide()
+    scores_prenoms = _similarites(joueurs_stats.loc[paires['ligne_stats'], 'prenom'],
+                                  joueurs_cotes.loc[paires['ligne_cotes'], 'prenom'])
+    paires = paires.assign(Score=POIDS_NOM * scores_noms + (1 - POIDS_NOM) * scores_prenoms)
+
+    # Attribution gloutonne par score décroissant
+    paires = paires.sort_values('Score', ascending=False, kind='stable')
+    acceptees = np.zeros(len(paires), dtype=bool)
+    lignes_stats, lignes_cotes = set(), set()
+    for position, (ligne_stats, ligne_cotes, score) in enumerate(paires.itertuples(index=False)):
+        if score < seuil:
+            break
+        if ligne_stats in lignes_stats or ligne_cotes in lignes_cotes:
+            continue
+        lignes_stats.add(ligne_stats)
+        lignes_cotes.add(ligne_cotes)
+        acceptees[position] = True
+    paires['Accepté'] = acceptees
+
+    # Le rapport garde les paires acceptées et les quasi-appariements, utiles pour régler le seuil ;
+    # chaque paire est étendue à toutes les lignes (saisons) du joueur de statistiques
+    paires = paires[paires['Accepté'] | (paires['Score'] >= plancher)]
+    lignes = pd.DataFrame({'ligne_stats': representants.to_numpy(), 'ligne': representants.index})
+    paires = (paires.merge(lignes, on='ligne_stats', sort=False)
+              .drop(columns='ligne_stats').rename(columns={'ligne': 'ligne_stats'}))
+    rapport = pd.DataFrame({
+        'Prénom': stats.loc[paires['ligne_stats'], 'Prénom'].to_numpy(),
+        'Nom': stats.loc[paires['ligne_stats'], 'Nom'].to_numpy(),
+        'Team': stats.loc[paires['ligne_stats'], 'Team'].to_numpy() if 'Team' in stats else None,
+        'Prénom cote': cotes.loc[paires['ligne_cotes'], 'Prénom'].to_numpy(),
+        'Nom cote': cotes.loc[paires['ligne_cotes'], 'Nom'].to_numpy(),
+        'Team cote': cotes.loc[paires['ligne_cotes'], 'Team'].to_numpy() if 'Team' in cotes else None,
+        'Score': paires['Score'].round(3).to_numpy(),
+        'Accepté': paires['Accepté'].to_numpy(),
+    }, index=pd.MultiIndex.from_frame(paires[['ligne_stats', 'ligne_cotes']]))
+    return rapport
+
+
+def _empreinte(stats, cotes, seuil):
+    """Empreinte des noms, équipes et positions des lignes à apparier"""
+    empreinte = hashlib.sha1(repr(seuil).encode())
+    for df in (stats, cotes):
+        colonnes = [colonne for colonne in ('Prénom', 'Nom', 'Team') if colonne in df.columns]
+        empreinte.update(pd.util.hash_pandas_object(df[colonnes].astype(str), index=True).to_numpy().tobytes())
+        empreinte.update(b'|')
+    return empreinte.hexdigest()
+
+
+def apparier_restants_en_cache(stats, cotes, seuil=SEUIL_APPARIEMENT):
+    """
+    apparier_restants avec un cache des derniers rapports : une fusion relancée avec les mêmes joueurs
+    non reliés (nouveau relevé de cotes des mêmes joueurs) ne refait pas les comparaisons
+    """
+    cle = _empreinte(stats, cotes, seuil)
+    with _verrou_cache:
+        if cle in _cache_rapports:
+            _cache_rapports.move_to_end(cle)
+            return _cache_rapports[cle]
+    rapport = apparier_restants(stats, cotes, seuil)
+    with _verrou_cache:
+        _cache_rapports[cle] = rapport
+        while len(_cache_rapports) > TAILLE_CACHE_APPARIEMENT:
+            _cache_rapports.popitem(last=False)
+    return rapport
+
+
+def completer_cotes(stats, cotes, cles_stats, cles_cotes, seuil=SEUIL_APPARIEMENT, approche=True):
+    """
+    Étape d'appariement approché après la jointure exacte, pour les seules lignes non reliées.
+    Retourne, alignées sur `stats`, les cotes complétées (à partir de la colonne `Cote` déjà associée)
+    et le type d'appariement de chaque ligne ('exact', 'approché' ou nul), ainsi que le rapport d'audit.
+    Sans `approche`, seul le type d'appariement des lignes exactes est calculé (rapport vide).
+    """
+    stats_pos, cotes_pos = stats.reset_index(drop=True), cotes.reset_index(drop=True)
+    # Une clé reliée à une ligne de cotes sans prix n'est pas un appariement : la ligne reste
+    # candidate à l'appariement approché
+    exactes = (pd.Index(cles_cotes).unique().get_indexer(cles_stats) >= 0) & stats_pos['Cote'].notna().to_numpy()
+    restantes = (pd.Index(cles_stats).unique().get_indexer(cles_cotes) < 0) & cotes_pos['Cote'].notna().to_numpy()
+    rapport = apparier_restants_en_cache(stats_pos[~exactes], cotes_pos[restantes], seuil) if approche else _rapport_vide()
+
+    valeurs = stats_pos['Cote'].to_numpy(copy=True)
+    appariement = np.where(exactes, 'exact', None).astype(object)
+    acceptes = rapport[rapport['Accepté']]
+    if not acceptes.empty:
+        lignes_stats = acceptes.index.get_level_values('ligne_stats').to_numpy()
+        lignes_cotes = acceptes.index.get_level_values('ligne_cotes').to_numpy()
+        valeurs[lignes_stats] = cotes_pos['Cote'].to_numpy()[lignes_cotes]
+        appariement[lignes_stats] = 'approché'
+    return (pd.Series(valeurs, index=stats.index, name='Cote'),
+            pd.Series(appariement, index=stats.index, name='Appariement'),
+            rapport.reset_index(drop=True))
@@ -0,0 +1,866 @@
+# benchmarks.py
+"""
+Micro-benchmarks des traitements de données.
+
+Utilisation : python benchmarks.py [nom_du_benchmark ...]
+Sans argument, tous les benchmarks sont exécutés. Les parties Selenium de parite_cotes et
+extraction_cotes ne s'exécutent que si selenium, /usr/bin/chromium et /usr/bin/chromedriver sont
+installés (environnement de production, packages.txt) ; sinon elles sont signalées comme ignorées.
+De même, synchronisation demande firebase_admin (requirements.txt), mais aucun projet Firebase.
+"""
+
+import os
+import sys
+import time
+import unicodedata
+import numpy as np
+import pandas as pd
+
+TAILLES = (1_000, 10_000, 100_000)
+
+PRENOMS = ['Alex', 'Alexander', 'Matt', 'Matthew', 'Matty', 'Nick', 'Nicholas', 'Evgeny', 'Evgenii',
+           'Connor', 'Auston', 'Nathan', 'Sidney', 'Tomáš', 'Tomas', 'Mitch', 'Mitchell', 'Dmitry']
+NOMS = ['McDavid', 'Matthews', 'Draisaitl', 'Pastrňák', 'Kucherov', 'Malkin', 'Johnston',
+        'Kopitar', 'Nylander', 'Ovechkin', 'Hischier', 'Zibanejad', 'Hertl', 'Slafkovský']
+EQUIPES = ['ANA', 'BOS', 'BUF', 'CGY', 'CAR', 'CHI', 'COL', 'DAL', 'EDM', 'MTL', 'NYR', 'TOR']
+# Syllabes des noms générés pour l'appariement approché (noms variés, sans suffixe numérique)
+SYLLABES = ['ma', 'ko', 'vi', 'ber', 'son', 'lin', 'dro', 'zel', 'ski', 'ne', 'ga', 'ro', 'hel', 'quist',
+            'bur', 'den', 'al', 'ri', 'to', 'mak', 'ev', 'ov', 'nen', 'er', 'gau', 'thier', 'mc', 'ly', 'ham']
+
+
+def _chronometrer(fonction, *args, repetitions=3):
+    """Retourne le résultat et le meilleur temps (en secondes) sur plusieurs exécutions"""
+    meilleur = float('inf')
+    resultat = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction(*args)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return resultat, meilleur
+
+
+def _generer_joueurs(n, graine=0):
+    """Génère des DataFrames stats/cotes synthétiques de n joueurs"""
+    rng = np.random.default_rng(graine)
+    stats = pd.DataFrame({
+        'Prénom': rng.choice(PRENOMS, n),
+        'Nom': [f"{nom}{i}" for i, nom in enumerate(rng.choice(NOMS, n))],
+        'Team': rng.choice(EQUIPES, n),
+        'Pos': rng.choice(['C', 'LW', 'RW', 'D'], n),
+        'GP': rng.integers(1, 82, n),
+        'G': rng.integers(0, 50, n),
+    })
+    selection = rng.choice(n, n // 3, replace=False)
+    odds = stats.iloc[selection][['Prénom', 'Nom', 'Team']].copy()
+    odds['Prénom'] = np.where(rng.random(len(odds)) < 0.2, rng.choice(PRENOMS, len(odds)), odds['Prénom'])
+    odds['Cote'] = rng.uniform(1.5, 8.0, len(odds)).round(2)
+    return stats, odds.reset_index(drop=True)
+
+
+def _faute_de_frappe(rng, nom):
+    """Une substitution, suppression, insertion ou inversion de lettres, hors première lettre"""
+    position = int(rng.integers(1, len(nom) - 1))
+    lettre = 'abcdefghijklmnopqrstuvwxyz'[rng.integers(26)]
+    return [nom[:position] + lettre + nom[position + 1:],
+            nom[:position] + nom[position + 1:],
+            nom[:position] + lettre + nom[position:],
+            nom[:position] + nom[position + 1] + nom[position] + nom[position + 2:]][rng.integers(4)]
+
+
+def _generer_fautes(n=900, fautes=200, saisons=1, equipes=True, graine=0):
+    """
+    Génère n joueurs répétés sur `saisons` saisons de statistiques et leurs cotes, dont `fautes` ont
+    une faute de frappe dans le nom. Retourne stats, cotes et la vérité : le (Prénom, Nom) des
+    statistiques de chaque ligne de cotes fautive. Sans `equipes`, les cotes n'ont pas d'équipe.
+    """
+    rng = np.random.default_rng(graine)
+    joueurs = set()
+    while len(joueurs) < n:
+        nom = ''.join(rng.choice(SYLLABES, rng.integers(2, 4))).capitalize()
+        if len(nom) >= 5:
+            joueurs.add((str(rng.choice(PRENOMS)), nom))
+    joueurs = pd.DataFrame(sorted(joueurs), columns=['Prénom', 'Nom']).assign(Team=rng.choice(EQUIPES, n))
+    stats = pd.concat([joueurs.assign(GP=rng.integers(1, 82, n), G=rng.integers(0, 50, n)) for _ in range(saisons)],
+                      ignore_index=True)
+    cotes = joueurs.assign(Cote=rng.uniform(1.5, 8.0, n).round(2))
+    noms = set(joueurs['Nom'])
+    fautifs = rng.choice(n, fautes, replace=False)
+    for ligne in fautifs:
+        nom = cotes.at[ligne, 'Nom']
+        while nom in noms or nom.capitalize() != nom:
+            nom = _faute_de_frappe(rng, cotes.at[ligne, 'Nom'])
+        cotes.at[ligne, 'Nom'] = nom
+    if not equipes:
+        cotes['Team'] = ''
+    verite = pd.Series(list(zip(joueurs.loc[fautifs, 'Prénom'], joueurs.loc[fautifs, 'Nom'])), index=fautifs)
+    return stats, cotes, verite
+
+
+# Cas piégeux ajoutés aux joueurs générés : deux homonymes de la même équipe dont un seul a une cote
+# (nom mal orthographié), et un joueur présent seulement dans les cotes, homonyme d'un coéquipier
+# des statistiques ; cote attendue de chaque joueur des statistiques concerné
+CAS_STATS = [('Luke', 'Hughson', 'TOR'), ('Jack', 'Hughson', 'TOR'), ('Matthew', 'Tkachuk', 'OTT')]
+CAS_COTES = [('Luke', 'Hugson', 'TOR', 3.25), ('Brady', 'Tkachuk', 'OTT', 4.5)]
+COTES_ATTENDUES = {('Luke', 'Hughson'): 3.25, ('Jack', 'Hughson'): None, ('Matthew', 'Tkachuk'): None}
+CAS_APPARIEMENTS = {('Luke', 'Hugson'): ('Luke', 'Hughson')}
+
+
+def _ajouter_cas(stats, cotes, equipes=True):
+    """Ajoute CAS_STATS et CAS_COTES aux tables générées par _generer_fautes"""
+    cas_stats = pd.DataFrame(CAS_STATS, columns=['Prénom', 'Nom', 'Team']).assign(GP=40, G=10)
+    cas_cotes = pd.DataFrame(CAS_COTES, columns=['Prénom', 'Nom', 'Team', 'Cote'])
+    if not equipes:
+        cas_cotes['Team'] = ''
+    return pd.concat([stats, cas_stats], ignore_index=True), pd.concat([cotes, cas_cotes], ignore_index=True)
+
+
+def _verifier_appariement(resultat, rapport, cotes, verite, rappel_min=0.8, precision_min=0.99):
+    """
+    Précision et rappel des appariements approchés face à la vérité de _generer_fautes, et cotes
+    des cas piégeux ; retourne (précision, rappel)
+    """
+    acceptes = rapport[rapport['Accepté']].drop_duplicates(['Prénom', 'Nom', 'Prénom cote', 'Nom cote'])
+    attendus = {(cotes.at[ligne, 'Prénom'], cotes.at[ligne, 'Nom']): joueur for ligne, joueur in verite.items()}
+    attendus.update(CAS_APPARIEMENTS)
+    justes = sum(attendus.get((p_cote, n_cote)) == (p, n)
+                 for p, n, p_cote, n_cote in acceptes[['Prénom', 'Nom', 'Prénom cote', 'Nom cote']].itertuples(index=False))
+    precision, rappel = justes / max(len(acceptes), 1), justes / (len(verite) + len(CAS_APPARIEMENTS))
+    assert precision >= precision_min, f"Précision {precision:.3f} < {precision_min}"
+    assert rappel >= rappel_min, f"Rappel {rappel:.3f} < {rappel_min}"
+    for (prenom, nom), attendue in COTES_ATTENDUES.items():
+        obtenue = resultat.loc[(resultat['Prénom'] == prenom) & (resultat['Nom'] == nom), 'Cote'].iloc[0]
+        assert (pd.isna(obtenue) if attendue is None else obtenue == attendue), \
+            f"{prenom} {nom} : cote {obtenue}, attendue {attendue}"
+    return precision, rappel
+
+
+def _enlever_accents_reference(texte):
+    """Ancienne version de enlever_accents_avec_remplacement (remplacements successifs), conservée comme référence"""
+    if isinstance(texte, str):
+        from data_processing import REMPLACEMENTS_SPECIAUX
+        texte_normalise = unicodedata.normalize('NFKD', texte)
+        texte_sans_accents = ''.join(
+            c if not unicodedata.combining(c) else '' for c in texte_normalise
+        )
+        for original, remplace in REMPLACEMENTS_SPECIAUX.items():
+            texte_sans_accents = texte_sans_accents.replace(original, remplace)
+        return texte_sans_accents
+    return texte
+
+
+def _fusion_reference(stats_df, odds_df):
+    """Ancienne fusion ligne à ligne (apply/iterrows) de scraper.py, conservée comme référence"""
+    from prenoms import lire_groupes
+
+    # Anciens dictionnaires PRENOM_VARIATIONS / PRENOM_STANDARD, reconstruits depuis le fichier des variantes
+    PRENOM_VARIATIONS = {groupe[0]: groupe[1:] for groupe in lire_groupes()}
+    PRENOM_STANDARD = {}
+    for standard, variations in PRENOM_VARIATIONS.items():
+        for var in variations:
+            PRENOM_STANDARD[var] = standard
+        PRENOM_STANDARD[standard] = standard
+
+    def normaliser_prenom(prenom):
+        prenom = prenom.strip()
+        return PRENOM_STANDARD.get(prenom, prenom)
+
+    stats = stats_df.copy()
+    odds = odds_df.copy()
+    stats['Nom'] = stats['Nom'].apply(_enlever_accents_reference).str.strip()
+    stats['Prénom'] = stats['Prénom'].apply(normaliser_prenom)
+    odds['Nom'] = odds['Nom'].apply(_enlever_accents_reference).str.strip()
+    odds['Prénom'] = odds['Prénom'].apply(normaliser_prenom)
+    cotes_dict = {}
+    for _, row in odds.iterrows():
+        cotes_dict[f"{row['Prénom']}_{row['Nom']}"] = row['Cote']
+        if row['Prénom'] in PRENOM_VARIATIONS:
+            for variation in PRENOM_VARIATIONS[row['Prénom']]:
+                cotes_dict[f"{variation}_{row['Nom']}"] = row['Cote']
+    stats['Cote'] = stats.apply(lambda x: cotes_dict.get(f"{x['Prénom']}_{x['Nom']}", "Non disponible"), axis=1)
+    return stats.sort_values(['Team', 'Nom'])
+
+
+def bench_fusion():
+    """Fusion stats/cotes : ancienne version ligne à ligne contre la jointure vectorisée (sans appariement approché)"""
+    from scraper import fusionner_donnees_par_prenom_nom
+
+    for n in TAILLES:
+        stats, odds = _generer_joueurs(n)
+        reference, t_reference = _chronometrer(_fusion_reference, stats, odds, repetitions=1)
+        resultat, t_vectorise = _chronometrer(fusionner_donnees_par_prenom_nom, stats, odds)
+        # Toute cote trouvée par l'ancienne fusion doit être retrouvée à l'identique
+        trouvees = reference['Cote'] != "Non disponible"
+        assert (resultat.loc[trouvees.index[trouvees], 'Cote'] == reference.loc[trouvees, 'Cote']).all(), \
+            "Cotes différentes"
+        print(f"fusion n={n:>7}: référence {t_reference * 1000:9.1f} ms | "
+              f"vectorisée {t_vectorise * 1000:8.1f} ms | x{t_reference / t_vectorise:.0f}")
+
+
+def _cotes_fixtures():
+    """Tableau long typé des cotes des pages enregistrées, construit comme par le scraper"""
+    from scraper import tableau_cotes
+    return tableau_cotes([ligne for lignes in _lignes_attendues().values() for ligne in lignes])
+
+
+def bench_agregation_cotes():
+    """
+    Cotes du scraper (tableau long typé, Team et Bookmaker catégoriels) résumées par
+    data_processing.agreger_cotes (une ligne par joueur, meilleure cote, cote médiane, nombre de
+    bookmakers) puis fusionnées avec des statistiques typées
+    """
+    from data_processing import agreger_cotes
+    from schema import appliquer_schema
+    from scraper import fusionner_donnees_par_prenom_nom
+
+    cotes = _cotes_fixtures()
+    assert isinstance(cotes['Team'].dtype, pd.CategoricalDtype), "Team non catégoriel"
+    # Résumé attendu de chaque joueur, recalculé à partir des lignes enregistrées
+    par_joueur = {}
+    for joueur, equipe, _, cote in (ligne for lignes in _lignes_attendues().values() for ligne in lignes):
+        par_joueur.setdefault((*joueur.split(' ', 1), equipe), []).extend([] if cote is None else [cote])
+    resume = agreger_cotes(cotes)
+    assert len(resume) == len(par_joueur), f"{len(resume)} lignes résumées pour {len(par_joueur)} joueurs"
+    for ligne in resume.to_dict('records'):
+        valeurs = par_joueur[(ligne['Prénom'], ligne['Nom'], ligne['Team'])]
+        meilleure, mediane = ligne['Cote'], ligne['Cote médiane']
+        assert ligne['Bookmakers'] == len(valeurs), \
+            f"{ligne['Nom']} : {ligne['Bookmakers']} bookmakers au lieu de {len(valeurs)}"
+        if valeurs:
+            assert np.isclose(meilleure, max(valeurs)) and np.isclose(mediane, np.median(valeurs)), \
+                f"{ligne['Nom']} : cotes {meilleure}/{mediane}, attendues {max(valeurs)}/{np.median(valeurs)}"
+        else:
+            assert pd.isna(meilleure) and pd.isna(mediane), f"{ligne['Nom']} : cote sans bookmaker"
+    stats = appliquer_schema(pd.DataFrame({
+        'Prénom': ['Auston', 'Connor', 'Nick', 'Juraj', 'Aleksander', 'Sidney'],
+        'Nom': ['Matthews', 'McDavid', 'Suzuki', 'Slafkovský', 'Barkov', 'Crosby'],
+        'Team': ['TOR', 'EDM', 'MTL', 'MTL', 'FLA', 'PIT'],
+        'GP': [60, 62, 61, 58, 55, 63], 'G': [40, 30, 25, 12, 20, 28],
+    }))
+    fusion = fusionner_donnees_par_prenom_nom(stats, cotes).set_index('Nom')
+    # Cote et appariement attendus : meilleure cote des bookmakers, aucune pour un joueur sans cote
+    # (Slafkovský) ou absent des pages (Crosby) ; Barkov n'a pas d'équipe côté cotes
+    attendues = {'Matthews': 2.45, 'McDavid': 2.15, 'Suzuki': 3.6, 'Slafkovsky': None, 'Barkov': 3.75,
+                 'Crosby': None}
+    for nom, attendue in attendues.items():
+        cote, appariement = fusion.at[nom, 'Cote'], fusion.at[nom, 'Appariement']
+        if attendue is None:
+            assert pd.isna(cote) and pd.isna(appariement), f"{nom} : cote {cote} ({appariement}), aucune attendue"
+        else:
+            assert np.isclose(cote, attendue) and appariement == 'exact', \
+                f"{nom} : cote {cote} ({appariement}), attendue {attendue} (exact)"
+    print(f"agrégation fixtures: {len(cotes)} lignes, {len(fusion)} joueurs fusionnés")
+
+    for n in TAILLES:
+        _, odds = _generer_joueurs(n)
+        bookmakers = ['Winamax', 'Betclic', 'Unibet', 'PMU']
+        longues = pd.concat([odds.assign(Bookmaker=bookmaker, Cote=odds['Cote'] + 0.05 * i)
+                             for i, bookmaker in enumerate(bookmakers)], ignore_index=True)
+        longues = appliquer_schema(longues)
+        resume, t_agregation = _chronometrer(agreger_cotes, longues)
+        assert len(resume) == len(odds[['Prénom', 'Nom', 'Team']].drop_duplicates()), "Joueurs en trop ou manquants"
+        assert (resume['Bookmakers'] == len(bookmakers)).all(), "Nombre de bookmakers faux"
+        print(f"agrégation n={n:>7}: {len(longues):>7} lignes -> {len(resume):>6} joueurs en {t_agregation * 1000:7.1f} ms")
+
+
+def bench_appariement():
+    """
+    Appariement approché, mesuré à part de la jointure exacte : premier calcul et fusion relancée
+    (cache), avec précision et rappel vérifiés sur des fautes de frappe connues
+    """
+    import appariement
+    from scraper import fusionner_donnees_par_prenom_nom
+
+    for equipes in (True, False):
+        for saisons in (1, 5, 20):
+            stats, cotes, verite = _generer_fautes(saisons=saisons, equipes=equipes)
+            stats, cotes = _ajouter_cas(stats, cotes, equipes)
+            _, t_exacte = _chronometrer(fusionner_donnees_par_prenom_nom, stats, cotes)
+
+            def approchee(s, c):
+                appariement._cache_rapports.clear()
+                return fusionner_donnees_par_prenom_nom(s, c, audit=True, approche=True)
+
+            (resultat, rapport), t_approchee = _chronometrer(approchee, stats, cotes)
+            # Sans équipe, une faute peut rapprocher un nom d'un autre joueur plus que du sien
+            # (Tohambr : Tohamber ou Tohambur ?) : précision un peu plus basse admise
+            precision, rappel = _verifier_appariement(resultat, rapport, cotes, verite,
+                                                      precision_min=0.99 if equipes else 0.98)
+            _, t_cache = _chronometrer(
+                lambda s, c: fusionner_donnees_par_prenom_nom(s, c, audit=True, approche=True), stats, cotes)
+            print(f"appariement équipes={'oui' if equipes else 'non'} saisons={saisons:>2} ({len(stats):>6} lignes): "
+                  f"jointure exacte {t_exacte * 1000:6.1f} ms | avec appariement approché {t_approchee * 1000:6.1f} ms "
+                  f"| relancée (cache) {t_cache * 1000:6.1f} ms | précision {precision:.3f} rappel {rappel:.3f}")
+
+
+def bench_accents():
+    """Suppression des accents : apply ligne à ligne contre la version par lot mémoïsée"""
+    from data_processing import _enlever_accents, enlever_accents_avec_remplacement, enlever_accents_serie
+
+    # Parité sur l'ensemble des tables latines (U+0000-U+024F, U+1E00-U+1EFF) et cyrillique (U+0400-U+04FF)
+    plages = [range(0x20, 0x250), range(0x1E00, 0x1F00), range(0x400, 0x500)]
+    caracteres = [chr(c) for plage in plages for c in plage]
+    textes = caracteres + [''.join(caracteres[i:i + 7]) for i in range(0, len(caracteres), 7)]
+    serie = pd.Series(textes + [None, float('nan'), 3])
+    attendu = [_enlever_accents_reference(t) for t in serie]
+    assert [enlever_accents_avec_remplacement(t) for t in serie] == attendu, "Parité non respectée"
+    assert enlever_accents_serie(serie).tolist()[:-3] == attendu[:-3], "Parité non respectée (lot)"
+    print(f"accents : parité vérifiée sur {len(textes)} chaînes latines et cyrilliques")
+
+    for n in TAILLES:
+        noms = pd.Series(np.random.default_rng(0).choice(NOMS + PRENOMS, n))
+        _, t_reference = _chronometrer(lambda s: s.apply(_enlever_accents_reference), noms)
+        _enlever_accents.cache_clear()
+        _, t_lot = _chronometrer(enlever_accents_serie, noms, repetitions=1)
+        print(f"accents n={n:>7}: référence {t_reference * 1000:9.1f} ms | "
+              f"par lot {t_lot * 1000:8.1f} ms | x{t_reference / t_lot:.0f}")
+
+
+def _page_stats_synthetique(n=900, graine=0):
+    """Page HTML reproduisant la structure du tableau #player_stats de hockey-reference (UTF-8)"""
+    rng = np.random.default_rng(graine)
+    entete = ''.join(f'<th>{c}</th>' for c in
+                     ['Rk', 'Player', 'Age', 'Team', 'Pos', 'GP', 'G', 'A', 'SOG', 'SPCT', 'TSA', 'ATOI'])
+    lignes = []
+    for i in range(n):
+        if i and i % 20 == 0:
+            lignes.append(f'<tr class="thead">{entete}</tr>')
+        gp, g = rng.integers(1, 82), rng.integers(0, 50)
+        sog = g + rng.integers(0, 250)
+        spct = f'{g / sog * 100:.1f}' if sog else ''
+        lignes.append(
+            f'<tr><th>{i + 1}</th><td><a href="/players/{i}.html">{rng.choice(PRENOMS)} {rng.choice(NOMS)}</a></td>'
+            f'<td>{rng.integers(18, 40)}</td><td><a>{rng.choice(EQUIPES)}</a></td><td>{rng.choice(["C", "D"])}</td>'
+            f'<td>{gp}</td><td>{g}</td><td>{rng.integers(0, 60)}</td><td>{sog}</td><td>{spct}</td>'
+            f'<td>{rng.integers(0, 400)}</td><td>{rng.integers(5, 25)}:{rng.integers(0, 60):02d}</td></tr>'
+        )
+    remplissage = '<p>' + 'x' * 200 + '</p>'
+    html = (
+        '<html><head><title>NHL Skaters</title></head><body>' + remplissage * 1500 +
+        '<table id="player_stats"><thead><tr class="over_header"><th colspan="5"></th><th colspan="7">Scoring</th></tr>'
+        f'<tr>{entete}</tr></thead><tbody>' + ''.join(lignes) + '</tbody></table>' + remplissage * 500 + '</body></html>'
+    )
+    return html.encode('utf-8')
+
+
+def _lire_tableau_stats_reference(contenu):
+    """Ancienne extraction (BeautifulSoup, str(), read_html, correction latin1 par cellule), conservée comme référence"""
+    from io import StringIO
+    from bs4 import BeautifulSoup
+
+    # requests décode la page en ISO-8859-1 faute d'encodage annoncé
+    soup = BeautifulSoup(contenu.decode('latin1'), "html.parser")
+    soup.find('tr', class_="over_header").decompose()
+    stats_table = soup.find(id="player_stats")
+    stats = pd.read_html(StringIO(str(stats_table)))[0]
+    stats = stats[["Player", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI"]]
+    stats = stats[stats['Player'] != 'Player'].copy()
+    stats['Player'] = stats['Player'].apply(lambda x: x.encode('latin1').decode('utf-8') if isinstance(x, str) else x)
+    return stats
+
+
+def bench_tableau_stats():
+    """Extraction du tableau de hockey-reference : BeautifulSoup + read_html contre lxml en une passe"""
+    from scraper import _lire_tableau_stats
+
+    contenu = _page_stats_synthetique()
+    reference, t_reference = _chronometrer(_lire_tableau_stats_reference, contenu)
+    resultat, t_lxml = _chronometrer(_lire_tableau_stats, contenu)
+    assert reference['Player'].tolist() == resultat['Player'].tolist(), "Noms différents"
+    assert (pd.to_numeric(reference['G']).to_numpy() == resultat['G'].to_numpy()).all(), "Buts différents"
+    print(f"tableau stats ({len(contenu) // 1024} Ko, {len(resultat)} joueurs): référence {t_reference * 1000:.1f} ms | "
+          f"lxml {t_lxml * 1000:.1f} ms | x{t_reference / t_lxml:.0f}")
+
+
+def _table_fusionnee(n, graine=0):
+    """Table fusionnée synthétique : stats de n joueurs avec une cote pour un tiers d'entre eux"""
+    stats, odds = _generer_joueurs(n, graine)
+    stats['Cote'] = np.nan
+    stats.loc[stats.sample(frac=1 / 3, random_state=graine).index, 'Cote'] = odds['Cote'].to_numpy()[:len(stats) // 3]
+    return stats
+
+
+def _rerun_reference(fusion, equipes, positions, recherche):
+    """Ancien rendu des pages "Stats + Cotes" et "Tous les joueurs" (masques par onglet, apply ligne à ligne)"""
+    termes = recherche.lower().split()
+    masque = fusion.apply(lambda x: any(t in x['Nom'].lower() for t in termes) or
+                                    any(t in x['Prénom'].lower() for t in termes), axis=1)
+    recherche_df = fusion[masque]
+    onglets = [recherche_df[recherche_df['Team'].astype(str) == equipe].copy()
+               for equipe in sorted(recherche_df['Team'].astype(str).unique())]
+    filtre = fusion.copy()
+    filtre['Cote'] = pd.to_numeric(filtre['Cote'], errors='coerce').fillna(999)
+    filtre = filtre[filtre['Cote'] < 999]
+    filtre = filtre[(filtre['Cote'] >= 2.0) & (filtre['G'] >= 10)]
+    filtre = filtre[filtre['Team'].isin(equipes)]
+    filtre = filtre[filtre['Pos'].isin(positions)]
+    return sum(len(onglet) for onglet in onglets), len(filtre)
+
+
+def _rerun_index(index, equipes, positions, recherche):
+    """Même rendu avec IndexJoueurs : recherche vectorisée et intersections d'index"""
+    lignes = index.rechercher(recherche)
+    onglets = [index.equipe(equipe, lignes) for equipe in index.equipes_de(lignes)]
+    filtre = index.filtrer(equipes, positions, cote_min=2.0, buts_min=10, sans_cote=False)
+    return sum(len(onglet) for onglet in onglets), len(filtre)
+
+
+def bench_filtres():
+    """Coût d'un rerun des vues filtrées : masques recalculés contre index équipe/position précalculés"""
+    from index_joueurs import IndexJoueurs
+
+    equipes, positions, recherche = EQUIPES[:6], ['C', 'D'], 'matt ovechkin'
+    for n in TAILLES:
+        fusion = _table_fusionnee(n)
+        reference, t_reference = _chronometrer(_rerun_reference, fusion, equipes, positions, recherche)
+        index, t_construction = _chronometrer(IndexJoueurs, fusion)
+        resultat, t_index = _chronometrer(_rerun_index, index, equipes, positions, recherche)
+        assert reference == resultat, f"Résultats différents: {reference} != {resultat}"
+        print(f"filtres n={n:>7}: référence {t_reference * 1000:8.1f} ms | index {t_index * 1000:8.1f} ms "
+              f"(construction unique {t_construction * 1000:.1f} ms) | x{t_reference / t_index:.0f}")
+
+
+def bench_recherche():
+    """Recherche de joueurs : apply ligne à ligne contre index de trigrammes (requêtes sans flou pour comparer)"""
+    from recherche import IndexRecherche
+
+    requetes = ['matt', 'ovechkin', 'tomas pastrnak', 'dr', 'slafkovsky']
+    for n in TAILLES:
+        stats, _ = _generer_joueurs(n)
+        index, t_construction = _chronometrer(IndexRecherche, stats['Prénom'], stats['Nom'])
+        t_reference = t_index = 0.0
+        for requete in requetes:
+            termes = requete.split()
+            reference, duree = _chronometrer(lambda: np.flatnonzero(stats.apply(
+                lambda x: any(t in x['Nom'].lower() for t in termes) or
+                          any(t in x['Prénom'].lower() for t in termes), axis=1).to_numpy()), repetitions=1)
+            t_reference += duree
+            resultat, duree = _chronometrer(index.rechercher, requete, False)
+            t_index += duree
+            # L'index replie aussi les accents : il trouve au moins tout ce que trouvait l'ancienne recherche
+            assert np.isin(reference, resultat).all(), f"Joueurs manquants pour '{requete}'"
+        print(f"recherche n={n:>7}: référence {t_reference / len(requetes) * 1000:8.2f} ms | "
+              f"index {t_index / len(requetes) * 1000:6.3f} ms par requête "
+              f"(construction unique {t_construction * 1000:.1f} ms)")
+
+
+def bench_schema():
+    """Types compacts (schema.py) : mémoire de la table des statistiques et coût de typage à chaque chargement"""
+    from schema import appliquer_schema
+
+    for n in TAILLES:
+        rng = np.random.default_rng(0)
+        stats, _ = _generer_joueurs(n)
+        # Table telle que lue de Firestore : textes, entiers 64 bits et ATOI "mm:ss"
+        brute = stats.assign(
+            A=rng.integers(0, 60, n), SOG=rng.integers(0, 300, n), TSA=rng.integers(0, 500, n),
+            SPCT=rng.uniform(0, 30, n).round(1),
+            ATOI=[f"{m}:{s:02d}" for m, s in zip(rng.integers(5, 26, n), rng.integers(0, 60, n))],
+        ).astype({'Team': object, 'Pos': object})
+        typee, t_typage = _chronometrer(appliquer_schema, brute, repetitions=1)
+
+        def typage_reference(df):
+            df = df.copy()
+            for colonne in ['GP', 'G', 'A', 'SOG', 'SPCT', 'TSA']:
+                df[colonne] = pd.to_numeric(df[colonne], errors='coerce')
+            return df
+
+        _, t_reference = _chronometrer(typage_reference, brute)
+        _, t_deja_typee = _chronometrer(appliquer_schema, typee)
+        memoire_brute = brute.memory_usage(deep=True).sum()
+        memoire_typee = typee.memory_usage(deep=True).sum()
+        print(f"schéma n={n:>7}: mémoire {memoire_brute / 1e6:7.2f} Mo -> {memoire_typee / 1e6:6.2f} Mo "
+              f"(x{memoire_brute / memoire_typee:.1f}) | typage par chargement {t_reference * 1000:7.2f} ms -> "
+              f"{t_deja_typee * 1000:6.3f} ms (conversion unique à l'ingestion {t_typage * 1000:.1f} ms)")
+
+
+def _indicateurs_reference(df):
+    """Calcul ligne à ligne des indicateurs, comme dans un tableur, conservé comme référence"""
+    import math
+
+    def ligne(x):
+        if not x['GP'] > 0:
+            return pd.Series([np.nan] * 6)
+        buts, tirs = x['G'] / x['GP'], x['SOG'] / x['GP']
+        buteur = 1 - math.exp(-buts)
+        cote = x['Cote'] if x['Cote'] > 1 else np.nan
+        return pd.Series([buts, tirs, 1 / cote, buteur, buteur * cote - 1, buteur - 1 / cote])
+
+    return df.apply(ligne, axis=1)
+
+
+def bench_indicateurs():
+    """Indicateurs de valeur : apply ligne à ligne contre le calcul vectorisé (table de plusieurs saisons)"""
+    from indicateurs import calculer_indicateurs, COLONNES_INDICATEURS
+    from schema import appliquer_schema
+
+    for n in TAILLES + (1_000_000,):
+        stats, _ = _generer_joueurs(n)
+        rng = np.random.default_rng(1)
+        table = appliquer_schema(stats.assign(
+            SOG=rng.integers(0, 300, n),
+            Cote=np.where(rng.random(n) < 0.3, rng.uniform(1.5, 8.0, n), np.nan),
+        ))
+        resultat, t_vectorise = _chronometrer(calculer_indicateurs, table)
+        if n <= 10_000:
+            reference, t_reference = _chronometrer(_indicateurs_reference, table, repetitions=1)
+            assert np.allclose(resultat[COLONNES_INDICATEURS].to_numpy(dtype=float), reference.to_numpy(dtype=float),
+                               rtol=1e-6, atol=1e-6, equal_nan=True), "Indicateurs différents"
+            comparaison = f"référence {t_reference * 1000:9.1f} ms | x{t_reference / t_vectorise:.0f} | "
+        else:
+            comparaison = ""
+        print(f"indicateurs n={n:>8}: {comparaison}vectorisé {t_vectorise * 1000:7.2f} ms")
+
+
+def bench_paquet():
+    """Lecture Firestore : un document par joueur contre un paquet Parquet découpé en blocs"""
+    import json
+    from stockage import serialiser_table, deserialiser_table
+    from schema import appliquer_schema
+    # Taille d'un bloc de paquet (firebase_utils.TAILLE_BLOC_PAQUET, non importable sans firebase_admin)
+    taille_bloc = 900_000
+
+    for n in (900,) + TAILLES:
+        stats, _ = _generer_joueurs(n)
+        rng = np.random.default_rng(2)
+        table = appliquer_schema(stats.assign(A=rng.integers(0, 60, n), SOG=rng.integers(0, 300, n),
+                                              SPCT=rng.uniform(0, 30, n).round(1)))
+        # Documents tels que transférés par joueur (champs JSON), reconstruits puis typés à la lecture
+        documents = [json.dumps(ligne, default=str) for ligne in table.astype(object).to_dict('records')]
+        _, t_documents = _chronometrer(
+            lambda: appliquer_schema(pd.DataFrame([json.loads(document) for document in documents])))
+        octets, t_serialisation = _chronometrer(serialiser_table, table)
+        lu, t_paquet = _chronometrer(deserialiser_table, octets)
+        assert (lu['G'].to_numpy() == table['G'].to_numpy()).all(), "Paquet différent de la table"
+        blocs = -(-len(octets) // taille_bloc)
+        print(f"paquet n={n:>7}: documents {n:>7} lectures {sum(map(len, documents)) / 1e3:9.1f} ko "
+              f"{t_documents * 1000:7.1f} ms | paquet {1 + blocs} lectures {len(octets) / 1e3:7.1f} ko "
+              f"{t_paquet * 1000:6.2f} ms (écriture {t_serialisation * 1000:.1f} ms)")
+
+
+def bench_journal():
+    """
+    Journal des cotes : coût d'un ajout au fil des jours (seul l'index du jour est réécrit) et
+    historique d'un joueur lu par les index de partition
+    """
+    import json
+    import tempfile
+    from datetime import datetime, timedelta
+    from journal_cotes import ajouter_releve, historique_joueur, joueurs_indexes, FICHIER_INDEX
+    from prenoms import cles_joueurs
+
+    _, odds = _generer_joueurs(2700)
+    bookmakers = ['Winamax', 'Betclic', 'Unibet']
+    longues = pd.concat([odds.assign(Bookmaker=bookmaker) for bookmaker in bookmakers], ignore_index=True)
+    jours, par_jour = 30, 8
+    with tempfile.TemporaryDirectory() as dossier:
+        debut = datetime(2026, 1, 1)
+        durees = []
+        for jour in range(jours):
+            for releve in range(par_jour):
+                moment = debut + timedelta(days=jour, hours=2 * releve)
+                t = time.perf_counter()
+                ajouter_releve(longues, moment, dossier)
+                durees.append(time.perf_counter() - t)
+        premier, dernier = np.median(durees[:par_jour]), np.median(durees[-par_jour:])
+        # Un ajout ne dépend que de la taille du relevé et du nombre de relevés du jour
+        assert dernier < 3 * premier, f"Ajout {dernier * 1000:.1f} ms au jour {jours} contre {premier * 1000:.1f} ms au jour 1"
+
+        cles = joueurs_indexes(dossier)
+        assert len(cles) == len(odds[['Prénom', 'Nom']].drop_duplicates()), "Joueurs indexés manquants"
+        historique, t_historique = _chronometrer(historique_joueur, cles[0], None, None, dossier)
+        lignes = (odds.assign(cle=cles_joueurs(odds['Prénom'], odds['Nom']))['cle'] == cles[0]).sum()
+        assert len(historique) == lignes * len(bookmakers) * jours * par_jour, "Historique incomplet"
+        semaine = historique_joueur(cles[0], debut + timedelta(days=7), debut + timedelta(days=14) - timedelta(seconds=1), dossier)
+        assert len(semaine) == lignes * len(bookmakers) * 7 * par_jour, "Historique d'une semaine faux"
+        # Partition sans index (journal antérieur) : lue avec le filtre des row groups
+        os.remove(os.path.join(dossier, f"date={debut:%Y-%m-%d}", FICHIER_INDEX))
+        assert len(historique_joueur(cles[0], None, None, dossier)) == len(historique), "Partition sans index ignorée"
+        taille_index = max(os.path.getsize(os.path.join(racine, FICHIER_INDEX))
+                           for racine, _, noms in os.walk(dossier) if FICHIER_INDEX in noms)
+        print(f"journal {jours * par_jour} relevés: ajout {premier * 1000:6.1f} ms (jour 1) / {dernier * 1000:6.1f} ms "
+              f"(jour {jours}) | index du jour {taille_index / 1e3:.0f} ko | historique {t_historique * 1000:.1f} ms")
+
+
+def bench_synchronisation():
+    """
+    Synchronisation incrémentale (firebase_utils.update_firestore) contre le client Firestore en
+    mémoire de firestore_factice : première synchronisation, une ligne modifiée, une ligne
+    supprimée, réexécution sans changement et manifeste d'une ancienne version d'identifiants
+    """
+    try:
+        import firebase_utils
+    except ImportError as e:
+        print(f"synchronisation : ignorée ({e.name} absent, voir requirements.txt)")
+        return
+    from firestore_factice import ClientFactice
+
+    nom = 'joueurs'
+    manifeste = f"{firebase_utils.MANIFESTES_COLLECTION}/{nom}"
+    db = ClientFactice()
+
+    def synchroniser(cas, df, attendus, ecritures, suppressions):
+        db.remettre_compteurs()
+        debut = time.perf_counter()
+        compteurs = firebase_utils.update_firestore(nom, df, db=db)
+        duree = time.perf_counter() - debut
+        lots = compteurs.pop('lots')
+        assert compteurs == attendus, f"{cas} : {compteurs} au lieu de {attendus}"
+        # Statistiques des lots remontées à l'appelant : toutes les opérations sauf le manifeste
+        assert sum(lot['operations'] for lot in lots) == ecritures - 1 + suppressions, f"{cas} : lots incomplets"
+        # Manifeste compris : il est réécrit à chaque synchronisation
+        assert db.ecritures == ecritures, f"{cas} : {db.ecritures} écritures au lieu de {ecritures}"
+        assert db.suppressions == suppressions, f"{cas} : {db.suppressions} suppressions au lieu de {suppressions}"
+        documents = firebase_utils._documents_depuis_dataframe(df)
+        stockes = {chemin.rsplit('/', 1)[-1]: donnees for chemin, donnees in db.documents.items()
+                   if chemin.startswith(f"{nom}/")}
+        assert stockes == documents, f"{cas} : collection différente du DataFrame"
+        assert db.documents[manifeste]['version'] == firebase_utils.VERSION_IDENTIFIANTS
+        print(f"synchronisation {cas:<22}: {db.ecritures:>4} écritures {db.suppressions:>2} suppressions "
+              f"{db.lectures:>4} lectures | {duree * 1000:7.1f} ms | {firebase_utils.decrire_lots(lots)}")
+        return documents
+
+    stats, _ = _generer_joueurs(900)
+    n = len(firebase_utils._documents_depuis_dataframe(stats))
+    inchange = dict.fromkeys(['ajoutés', 'modifiés', 'supprimés'], 0)
+
+    synchroniser("première", stats, {**inchange, 'inchangés': 0, 'ajoutés': n}, n + 1, 0)
+
+    modifie = stats.copy()
+    modifie.loc[0, 'G'] += 1
+    documents = synchroniser("ligne modifiée", modifie, {**inchange, 'inchangés': n - 1, 'modifiés': 1}, 2, 0)
+    doc_id = next(iter(documents))
+    assert db.documents[f"{nom}/{doc_id}"]['G'] == stats.loc[0, 'G'] + 1, "Document modifié non réécrit"
+
+    supprime = modifie.drop(index=5)
+    synchroniser("ligne supprimée", supprime, {**inchange, 'inchangés': n - 1, 'supprimés': 1}, 1, 1)
+
+    synchroniser("sans changement", supprime, {**inchange, 'inchangés': n - 1}, 1, 0)
+
+    # Manifeste antérieur au schéma d'identifiants courant et document à l'ancien format : tout est
+    # réécrit et le document orphelin supprimé
+    db.documents[manifeste]['version'] = firebase_utils.VERSION_IDENTIFIANTS - 1
+    db.documents[f"{nom}/{stats.loc[5, 'Prénom']}_{stats.loc[5, 'Nom']}"] = {'Nom': stats.loc[5, 'Nom']}
+    synchroniser("manifeste ancien", supprime, {**inchange, 'inchangés': 0, 'modifiés': n - 1, 'supprimés': 1},
+                 n, 1)
+
+
+# Pages enregistrées du site de cotes, servies par _serveur_fixtures
+DOSSIER_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'cotes')
+
+
+def _selenium_disponible():
+    """Vrai si selenium et le Chromium de production (navigateurs.creer_driver) sont installés"""
+    import importlib.util
+    return (importlib.util.find_spec('selenium') is not None
+            and os.path.exists('/usr/bin/chromium') and os.path.exists('/usr/bin/chromedriver'))
+
+
+def _serveur_fixtures():
+    """
+    Serveur HTTP local (thread) qui imite le site de cotes avec les pages de DOSSIER_FIXTURES :
+    /hockey-buteur sert la page des matchs (hockey-buteur.html, tableau rempli côté client) et
+    /hockey-buteur?match=<id> la page du match (match_<id>.html), /match-par-defaut la page du
+    premier match quel que soit le paramètre ; retourne le serveur et l'URL de la
+    page des cotes
+    """
+    import threading
+    from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+    from urllib.parse import urlsplit, parse_qs
+
+    class Gestionnaire(SimpleHTTPRequestHandler):
+        # Comme WordPress, le jeu de caractères est annoncé dans l'en-tête
+        extensions_map = {**SimpleHTTPRequestHandler.extensions_map, '.html': 'text/html; charset=utf-8'}
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=DOSSIER_FIXTURES, **kwargs)
+
+        def translate_path(self, path):
+            url = urlsplit(path)
+            # Site qui ignorerait le paramètre : toujours le tableau du premier match
+            if url.path.rstrip('/') == '/match-par-defaut':
+                return os.path.join(DOSSIER_FIXTURES, f"match_{next(iter(_lignes_attendues()))}.html")
+            match = parse_qs(url.query).get('match')
+            if match:
+                return os.path.join(DOSSIER_FIXTURES, f"match_{os.path.basename(match[0])}.html")
+            if url.path.rstrip('/') == '/hockey-buteur':
+                return os.path.join(DOSSIER_FIXTURES, 'hockey-buteur.html')
+            return super().translate_path(path)
+
+        def log_message(self, *args):
+            pass
+
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0), Gestionnaire)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur, f"http://127.0.0.1:{serveur.server_address[1]}/hockey-buteur"
+
+
+def _lignes_attendues():
+    import json
+    with open(os.path.join(DOSSIER_FIXTURES, 'lignes_attendues.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bench_parite_cotes():
+    """
+    Parité des backends de cotes sur les pages de match enregistrées (fixtures/cotes) : le parseur
+    HTTP et, si selenium et Chromium sont installés, le script d'extraction de Selenium doivent
+    donner les lignes de lignes_attendues.json une fois passés par scraper._parser_lignes
+    """
+    from scraper import _parser_lignes
+    from cotes_http import extraire_lignes
+
+    attendues = _lignes_attendues()
+    for match, lignes in attendues.items():
+        with open(os.path.join(DOSSIER_FIXTURES, f"match_{match}.html"), encoding='utf-8') as f:
+            html = f.read()
+        brutes, t_http = _chronometrer(extraire_lignes, html)
+        assert _parser_lignes(brutes) == lignes, f"Match {match} : lignes HTTP différentes"
+        print(f"parité match {match}: HTTP {len(lignes)} lignes en {t_http * 1000:.2f} ms")
+
+    if not _selenium_disponible():
+        print("parité Selenium : ignorée (selenium, /usr/bin/chromium ou /usr/bin/chromedriver absent)")
+        return
+    from navigateurs import creer_driver
+    from cotes_selenium import _extraire_tableau
+
+    serveur, url = _serveur_fixtures()
+    driver = creer_driver()
+    try:
+        for match, lignes in attendues.items():
+            driver.get(f"{url}?match={match}")
+            brutes, t_selenium = _chronometrer(_extraire_tableau, driver)
+            assert _parser_lignes(brutes) == lignes, f"Match {match} : lignes Selenium différentes"
+            print(f"parité match {match}: Selenium {len(lignes)} lignes en {t_selenium * 1000:.2f} ms")
+    finally:
+        driver.quit()
+        serveur.shutdown()
+
+
+def bench_extraction_cotes():
+    """
+    Extraction de tous les matchs sur le site imité par _serveur_fixtures : backend HTTP complet
+    (liste des matchs puis pages de match) et, si selenium et Chromium sont installés, backend
+    Selenium avec un navigateur (changement de match : attente sur la signature du tableau) puis
+    deux navigateurs en parallèle (répartition de recuperer_tableaux)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import requests
+    import cotes_http
+    from scraper import _parser_lignes
+
+    attendues = list(_lignes_attendues().values())
+    serveur, url = _serveur_fixtures()
+    try:
+        cotes_http.ODDS_URL, cotes_http.ODDS_MATCH_URL = url, url + "?match={match}"
+        tableaux, t_http = _chronometrer(cotes_http.recuperer_lignes, requests.Session(), repetitions=1)
+        assert [_parser_lignes(lignes) for lignes in tableaux] == attendues, "Backend HTTP : lignes différentes"
+        print(f"extraction HTTP: {len(tableaux)} matchs en {t_http * 1000:.1f} ms")
+        # Paramètre du match ignoré : l'erreur doit renvoyer vers le repli Selenium
+        cotes_http.ODDS_MATCH_URL = url.replace('/hockey-buteur', '/match-par-defaut') + "?match={match}"
+        try:
+            cotes_http.recuperer_lignes(requests.Session())
+            raise AssertionError("Backend HTTP : tableau d'un autre match accepté")
+        except cotes_http.BackendIndisponible as e:
+            print(f"extraction HTTP, paramètre ignoré: {e}")
+
+        if not _selenium_disponible():
+            print("extraction Selenium : ignorée (selenium, /usr/bin/chromium ou /usr/bin/chromedriver absent)")
+            return
+        import cotes_selenium
+        from navigateurs import creer_driver
+
+        cotes_selenium.ODDS_URL = url
+        drivers = [creer_driver(), creer_driver()]
+        try:
+            indices = list(range(len(attendues)))
+            debut = time.perf_counter()
+            resultats = cotes_selenium._extraire_matchs(drivers[0], indices)
+            t_un = time.perf_counter() - debut
+            assert [_parser_lignes(resultats[i]) for i in indices] == attendues, "Selenium : lignes différentes"
+
+            debut = time.perf_counter()
+            resultats = {}
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                for partiel in executor.map(cotes_selenium._extraire_matchs, drivers, [indices[0::2], indices[1::2]]):
+                    resultats.update(partiel)
+            t_deux = time.perf_counter() - debut
+            assert [_parser_lignes(resultats[i]) for i in indices] == attendues, "Selenium parallèle : lignes différentes"
+            print(f"extraction Selenium: {len(indices)} matchs, 1 navigateur {t_un * 1000:.0f} ms | "
+                  f"2 navigateurs {t_deux * 1000:.0f} ms")
+        finally:
+            for driver in drivers:
+                driver.quit()
+    finally:
+        serveur.shutdown()
+
+
+# Modules lourds qui ne doivent être importés qu'au premier scraping
+MODULES_LOURDS = ('selenium', 'requests', 'bs4', 'lxml')
+
+_MESURE_IMPORT = """
+import sys, time
+debut = time.perf_counter()
+{code}
+duree = time.perf_counter() - debut
+print(duree, ','.join(m for m in {lourds!r} if m in sys.modules))
+"""
+
+
+def _mesurer_import(code, repetitions=5):
+    """Meilleur temps d'exécution de `code` dans un interpréteur neuf, et modules lourds alors chargés"""
+    import subprocess
+    meilleur, charges = float('inf'), ''
+    for _ in range(repetitions):
+        sortie = subprocess.run(
+            [sys.executable, '-c', _MESURE_IMPORT.format(code=code, lourds=MODULES_LOURDS)],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True,
+        )
+        if sortie.returncode != 0:
+            return None, sortie.stderr.strip().splitlines()[-1]
+        duree, _, charges = sortie.stdout.strip().partition(' ')
+        meilleur = min(meilleur, float(duree))
+    return meilleur, charges
+
+
+def bench_demarrage():
+    """Temps d'import à froid : modules lus au démarrage de l'application, puis backends de cotes à la demande"""
+    mesures = {
+        'pandas (plancher)': "import pandas",
+        'scraper': "import scraper",
+        'taches': "import taches",
+        'scraper + backend http': "import scraper; scraper.charger_backend('http')",
+        'scraper + backend selenium': "import scraper; scraper.charger_backend('selenium')",
+    }
+    for nom, code in mesures.items():
+        duree, charges = _mesurer_import(code)
+        if duree is None:
+            print(f"import {nom:<28}: impossible ({charges})")
+            continue
+        if nom in ('scraper', 'taches'):
+            # Aucun backend de scraping ne doit être chargé au démarrage
+            assert not charges, f"Modules lourds importés par {nom} : {charges}"
+        print(f"import {nom:<28}: {duree * 1000:7.1f} ms | modules lourds chargés : {charges or 'aucun'}")
+
+
+BENCHMARKS = {
+    'fusion': bench_fusion,
+    'appariement': bench_appariement,
+    'agregation_cotes': bench_agregation_cotes,
+    'accents': bench_accents,
+    'tableau_stats': bench_tableau_stats,
+    'filtres': bench_filtres,
+    'recherche': bench_recherche,
+    'demarrage': bench_demarrage,
+    'schema': bench_schema,
+    'indicateurs': bench_indicateurs,
+    'paquet': bench_paquet,
+    'journal': bench_journal,
+    'synchronisation': bench_synchronisation,
+    'parite_cotes': bench_parite_cotes,
+    'extraction_cotes': bench_extraction_cotes,
+}
+
+if __name__ == "__main__":
+    noms = sys.argv[1:] or list(BENCHMARKS)
+    for nom in noms:
+        BENCHMARKS[nom]()
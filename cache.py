@@ -0,0 +1,68 @@
+# cache.py
+
+import threading
+from datetime import datetime, timedelta
+
+
+def should_refresh_cache(last_update_time, ttl=timedelta(minutes=5)):
+    if last_update_time is None:
+        return True
+    return datetime.now() - last_update_time > ttl
+
+
+class CacheTTL:
+    """
+    Cache mémoire à durée de vie limitée, partagé entre les sessions.
+    Un verrou par clé garantit qu'une seule session charge une entrée expirée pendant que les
+    autres attendent le résultat.
+    """
+
+    def __init__(self, ttl_secondes=300):
+        self.ttl = timedelta(seconds=ttl_secondes)
+        self._entrees = {}
+        self._verrou = threading.Lock()
+        self._verrous_cles = {}
+        self.succes = 0
+        self.echecs = 0
+
+    def _verrou_cle(self, cle):
+        with self._verrou:
+            return self._verrous_cles.setdefault(cle, threading.Lock())
+
+    def _entree_valide(self, cle):
+        entree = self._entrees.get(cle)
+        if entree is None or should_refresh_cache(entree[0], self.ttl):
+            return None
+        return entree
+
+    def obtenir(self, cle, charger):
+        """Retourne la valeur en cache pour `cle`, ou l'obtient avec `charger()` si absente ou expirée"""
+        with self._verrou_cle(cle):
+            entree = self._entree_valide(cle)
+            if entree is not None:
+                self.succes += 1
+                return entree[1]
+            self.echecs += 1
+            valeur = charger()
+            # Une valeur None (erreur ou collection vide) n'est pas mise en cache
+            if valeur is not None:
+                self._entrees[cle] = (datetime.now(), valeur)
+            return valeur
+
+    def invalider(self, collection=None):
+        """Supprime les entrées d'une collection (clés de la forme (collection, ...)), ou tout le cache"""
+        with self._verrou:
+            if collection is None:
+                self._entrees.clear()
+            else:
+                for cle in [cle for cle in self._entrees if cle[0] == collection]:
+                    del self._entrees[cle]
+
+    def metriques(self):
+        total = self.succes + self.echecs
+        return {
+            'succes': self.succes,
+            'echecs': self.echecs,
+            'taux_succes': self.succes / total if total else 0.0,
+            'entrees': len(self._entrees),
+        }
@@ -0,0 +1,98 @@
+# cache_http.py
+
+import os
+import json
+import time
+import hashlib
+import logging
+import requests
+import pandas as pd
+
+# Dossier du cache et durées (en secondes), configurables par variables d'environnement
+CACHE_HTTP_DIR = os.environ.get("HTTP_CACHE_DIR", ".cache/http")
+CACHE_HTTP_TTL = int(os.environ.get("HTTP_CACHE_TTL", 600))
+# Intervalle minimal entre deux requêtes vers une même URL, même si le cache est expiré
+INTERVALLE_MIN = int(os.environ.get("HTTP_CACHE_INTERVALLE_MIN", 60))
+
+logger = logging.getLogger(__name__)
+
+
+class CacheReponses:
+    """
+    Cache disque de réponses HTTP, stockant pour chaque URL les en-têtes ETag/Last-Modified, le corps
+    de la réponse et le DataFrame qui en a été extrait (au format Parquet).
+    Une entrée plus jeune que le TTL est servie sans requête ; au-delà, une requête conditionnelle
+    est envoyée et une réponse 304 renvoie le DataFrame en cache sans nouvelle analyse du HTML.
+    """
+
+    def __init__(self, dossier=CACHE_HTTP_DIR, ttl_secondes=CACHE_HTTP_TTL, intervalle_min=INTERVALLE_MIN):
+        self.dossier = dossier
+        self.ttl = ttl_secondes
+        self.intervalle_min = intervalle_min
+
+    def _chemins(self, url):
+        base = os.path.join(self.dossier, hashlib.sha1(url.encode('utf-8')).hexdigest())
+        return base + '.json', base + '.html', base + '.parquet'
+
+    def _lire_meta(self, chemin_meta, chemin_parquet, version):
+        if not (os.path.exists(chemin_meta) and os.path.exists(chemin_parquet)):
+            return None
+        try:
+            with open(chemin_meta, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Un DataFrame produit par une autre version du parser n'est pas réutilisable
+        return meta if meta.get('version') == version else None
+
+    def _ecrire_meta(self, chemin_meta, meta):
+        with open(chemin_meta, 'w') as f:
+            json.dump(meta, f)
+
+    def obtenir_dataframe(self, url, parser, headers=None, forcer=False, version=1):
+        """
+        Retourne le DataFrame extrait de `url` par `parser(contenu)`, depuis le cache si possible.
+        Le parser reçoit le corps brut (bytes) et choisit lui-même le décodage.
+        `forcer` ignore le TTL (mais pas l'intervalle minimal) ; `version` identifie le format produit
+        par le parser, une entrée d'une autre version est ignorée.
+        """
+        os.makedirs(self.dossier, exist_ok=True)
+        chemin_meta, chemin_html, chemin_parquet = self._chemins(url)
+        meta = self._lire_meta(chemin_meta, chemin_parquet, version)
+
+        if meta is not None:
+            age = time.time() - meta['verifie_le']
+            delai = self.intervalle_min if forcer else max(self.ttl, self.intervalle_min)
+            if age < delai:
+                logger.info(f"Cache HTTP: succès pour {url} (âge {age:.0f}s)")
+                return pd.read_parquet(chemin_parquet)
+
+        en_tetes = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                en_tetes['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                en_tetes['If-Modified-Since'] = meta['last_modified']
+
+        reponse = requests.get(url, headers=en_tetes, timeout=30)
+        if reponse.status_code == 304 and meta is not None:
+            logger.info(f"Cache HTTP: succès pour {url} (304 Not Modified)")
+            meta['verifie_le'] = time.time()
+            self._ecrire_meta(chemin_meta, meta)
+            return pd.read_parquet(chemin_parquet)
+        reponse.raise_for_status()
+
+        logger.info(f"Cache HTTP: échec pour {url}, téléchargement de la page")
+        contenu = reponse.content
+        df = parser(contenu)
+        with open(chemin_html, 'wb') as f:
+            f.write(contenu)
+        df.to_parquet(chemin_parquet, index=False)
+        self._ecrire_meta(chemin_meta, {
+            'url': url,
+            'version': version,
+            'etag': reponse.headers.get('ETag'),
+            'last_modified': reponse.headers.get('Last-Modified'),
+            'verifie_le': time.time(),
+        })
+        return df
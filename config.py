@@ -0,0 +1,45 @@
+# config.py
+
+import os
+import json
+from functools import lru_cache
+import toml
+
+# Fichier de configuration : le même secrets.toml que l'application Streamlit
+FICHIER_CONFIG = os.environ.get("NHL_CONFIG", ".streamlit/secrets.toml")
+
+
+@lru_cache(maxsize=None)
+def charger_config(chemin=FICHIER_CONFIG):
+    """Lit le fichier de configuration TOML (dictionnaire vide s'il n'existe pas)"""
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, 'r') as f:
+        return toml.load(f)
+
+
+def identifiants_cotes(config=None):
+    """
+    Identifiants du site de cotes : variables ODDS_USERNAME/ODDS_PASSWORD, sinon section
+    [credentials] du fichier de configuration.
+    """
+    section = (config if config is not None else charger_config()).get('credentials', {})
+    identifiants = {
+        'username': os.environ.get("ODDS_USERNAME", section.get('username')),
+        'password': os.environ.get("ODDS_PASSWORD", section.get('password')),
+    }
+    if not identifiants['username'] or not identifiants['password']:
+        raise KeyError("Identifiants du site de cotes absents (ODDS_USERNAME/ODDS_PASSWORD ou [credentials])")
+    return identifiants
+
+
+def identifiants_firebase(config=None):
+    """
+    Compte de service Firebase : fichier JSON désigné par FIREBASE_CREDENTIALS, sinon section
+    [firebase_credentials] du fichier de configuration. None si aucun n'est disponible.
+    """
+    chemin = os.environ.get("FIREBASE_CREDENTIALS")
+    if chemin:
+        with open(chemin, 'r') as f:
+            return json.load(f)
+    return (config if config is not None else charger_config()).get('firebase_credentials')
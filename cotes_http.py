@@ -0,0 +1,139 @@
+# cotes_http.py
+
+import os
+import re
+import unicodedata
+import requests
+from bs4 import BeautifulSoup
+from navigateurs import LOGIN_URL, ODDS_URL, FICHIER_COOKIES, charger_cookies, cookies_valides
+from config import identifiants_cotes
+
+# URL du tableau d'un match ({match} = valeur du bouton radio du match)
+ODDS_MATCH_URL = os.environ.get("ODDS_MATCH_URL", ODDS_URL + "?match={match}")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+
+class BackendIndisponible(Exception):
+    """Les tableaux de cotes ne peuvent pas être obtenus sans navigateur"""
+
+
+def creer_session(username, password, fichier_cookies=FICHIER_COOKIES):
+    """
+    Session HTTP connectée au site de cotes : reprend les cookies enregistrés par le pool de
+    navigateurs s'ils sont valides, sinon soumet le formulaire de connexion WordPress.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    cookies = charger_cookies(fichier_cookies)
+    if cookies and cookies_valides(cookies):
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'],
+                                domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+        return session
+
+    session.cookies.set('wordpress_test_cookie', 'WP Cookie check')
+    reponse = session.post(LOGIN_URL, data={
+        'log': username,
+        'pwd': password,
+        'rememberme': 'forever',
+        'wp-submit': 'Se connecter',
+        'redirect_to': ODDS_URL,
+        'testcookie': '1',
+    }, timeout=20)
+    reponse.raise_for_status()
+    if not any(nom.startswith('wordpress_logged_in') for nom in session.cookies.keys()):
+        raise BackendIndisponible("Connexion HTTP refusée")
+    return session
+
+
+def extraire_matchs(html):
+    """Retourne la valeur et le libellé ("Équipe A - Équipe B") des boutons radio des matchs du bloc NHL"""
+    soup = BeautifulSoup(html, "lxml")
+    bouton = next((b for b in soup.select("button.accordion-btn") if 'NHL' in b.get_text()), None)
+    if bouton is None:
+        raise BackendIndisponible("Bloc NHL introuvable dans la page")
+    panneau = bouton.find_next_sibling("div", class_="panel")
+    if panneau is None:
+        raise BackendIndisponible("Bloc NHL introuvable dans la page")
+    return [(radio.get('value'), radio.parent.get_text(" ", strip=True) if radio.parent.name == 'label' else '')
+            for radio in panneau.select("input[type=radio][name=match]")]
+
+
+def extraire_lignes(html):
+    """Lit le tableau des cotes d'un match au même format que l'extraction Selenium"""
+    soup = BeautifulSoup(html, "lxml")
+    entetes = []
+    for th in soup.select("table.result-table thead th"):
+        logo = th.find("img")
+        entetes.append(th.get_text(strip=True) or (logo.get("alt", "").strip() if logo else ""))
+    lignes = []
+    for tr in soup.select("table.result-table tbody tr"):
+        cellule = tr.find("td")
+        if cellule is None:
+            continue
+        cotes, bookmakers = [], []
+        for indice, td in enumerate(tr.find_all("td", recursive=False)):
+            ovale = td.select_one(".oval-background") if "center-cell" in td.get("class", []) else None
+            if ovale is None:
+                continue
+            cotes.append(ovale.get_text(strip=True))
+            bookmakers.append((entetes[indice] if indice < len(entetes) else "") or str(indice))
+        lignes.append({'joueur': cellule.get_text(" ", strip=True), 'cotes': cotes, 'bookmakers': bookmakers})
+    return lignes
+
+
+def _normaliser(texte):
+    texte = unicodedata.normalize('NFKD', texte)
+    return ''.join(c for c in texte if not unicodedata.combining(c)).casefold()
+
+
+def verifier_match(match, libelle, lignes):
+    """
+    Lève BackendIndisponible si le tableau lu n'est pas celui du match demandé : aucune des équipes
+    des joueurs (entre parenthèses) n'apparaît dans le libellé du match. Sans libellé ni équipe, rien
+    n'est vérifié. Protège contre un site qui ignorerait le paramètre de ODDS_MATCH_URL et servirait
+    toujours le même match.
+    """
+    equipes = {_normaliser(equipe.strip()) for ligne in lignes
+               for equipe in re.findall(r"\((.*?)\)", ligne['joueur'])}
+    if libelle and equipes and not any(equipe in _normaliser(libelle) for equipe in equipes):
+        raise BackendIndisponible(f"Le tableau lu pour le match {match} ({', '.join(sorted(equipes))}) "
+                                  f"n'est pas celui de « {libelle} »")
+
+
+def recuperer_lignes(session, progression=None):
+    """Récupère les lignes brutes de tous les matchs NHL, dans l'ordre de la page"""
+    page = session.get(ODDS_URL, timeout=20)
+    page.raise_for_status()
+    matchs = extraire_matchs(page.text)
+    resultats = []
+    for numero, (match, libelle) in enumerate(matchs, start=1):
+        if not match:
+            raise BackendIndisponible("Match sans identifiant")
+        reponse = session.get(ODDS_MATCH_URL.format(match=match), timeout=20)
+        reponse.raise_for_status()
+        lignes = extraire_lignes(reponse.text)
+        if not lignes:
+            # Tableau rempli côté client : seul un navigateur peut le lire
+            raise BackendIndisponible(f"Tableau du match {match} absent du HTML")
+        verifier_match(match, libelle, lignes)
+        # Même tableau pour deux matchs (libellés absents) : le paramètre du match est ignoré
+        if lignes in resultats:
+            raise BackendIndisponible(f"Le match {match} a le même tableau qu'un match précédent")
+        resultats.append(lignes)
+        if progression:
+            progression(f"Match {numero}/{len(matchs)} lu ({len(lignes)} joueurs)")
+    return resultats
+
+
+def recuperer_tableaux(identifiants=None, nb_navigateurs=1, progression=None):
+    """
+    Point d'entrée du backend (voir scraper.BACKENDS_COTES) : lignes brutes du tableau de chaque
+    match, lues par requêtes HTTP. `nb_navigateurs` est sans objet ici (requêtes séquentielles).
+    """
+    identifiants = identifiants or identifiants_cotes()
+    session = creer_session(identifiants["username"], identifiants["password"])
+    return recuperer_lignes(session, progression)
@@ -0,0 +1,170 @@
+# cotes_selenium.py
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from navigateurs import ODDS_URL, PoolNavigateurs
+from config import identifiants_cotes
+
+logger = logging.getLogger(__name__)
+
+XPATH_BLOC_NHL = "//div[@class='panel' and preceding-sibling::button[contains(text(), 'NHL')]]"
+XPATH_RADIOS_MATCHS = f"{XPATH_BLOC_NHL}//input[@type='radio'][@name='match']"
+
+# Lecture du tableau des cotes en un seul aller-retour WebDriver
+EXTRAIRE_TABLEAU_JS = """
+const entetes = Array.from(document.querySelectorAll('table.result-table thead th')).map(th => {
+    const logo = th.querySelector('img');
+    return th.innerText.trim() || (logo ? logo.alt.trim() : '');
+});
+const lignes = [];
+document.querySelectorAll('table.result-table tbody tr').forEach(tr => {
+    const cellule = tr.querySelector('td');
+    if (!cellule) return;
+    const cotes = [], bookmakers = [];
+    tr.querySelectorAll('td.center-cell').forEach(td => {
+        const ovale = td.querySelector('.oval-background');
+        if (!ovale) return;
+        cotes.push(ovale.innerText);
+        bookmakers.push(entetes[td.cellIndex] || String(td.cellIndex));
+    });
+    lignes.push({joueur: cellule.innerText, cotes: cotes, bookmakers: bookmakers});
+});
+return JSON.stringify(lignes);
+"""
+
+SIGNATURE_TABLEAU_JS = """
+const corps = document.querySelector('table.result-table tbody');
+return corps && corps.rows.length ? corps.textContent : null;
+"""
+
+
+_pool_navigateurs = None
+_verrou_pool = threading.Lock()
+
+
+def obtenir_pool_navigateurs(identifiants=None, taille_max=1):
+    """Pool de navigateurs connectés partagé par toutes les sessions de l'application"""
+    global _pool_navigateurs
+    with _verrou_pool:
+        if _pool_navigateurs is None:
+            identifiants = identifiants or identifiants_cotes()
+            _pool_navigateurs = PoolNavigateurs(
+                identifiants["username"],
+                identifiants["password"],
+                taille_max=max(taille_max, 1),
+            )
+        return _pool_navigateurs
+
+
+def _ouvrir_bloc_nhl(driver):
+    """Ouvre la page des cotes buteurs et déplie le bloc des matchs NHL"""
+    driver.get(ODDS_URL)
+    try:
+        dropdown_button = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'accordion-btn') and contains(text(), 'NHL')]"))
+        )
+        driver.execute_script("arguments[0].scrollIntoView();", dropdown_button)
+        dropdown_button.click()
+
+        WebDriverWait(driver, 10).until(
+            EC.visibility_of_element_located((By.XPATH, XPATH_BLOC_NHL))
+        )
+    except Exception as e:
+        logger.warning(f"Error opening NHL dropdown block: {e}")
+
+
+def _selectionner_match(driver, indice):
+    """Sélectionne le match `indice` et attend que le tableau des cotes corresponde à ce match"""
+    all_match_radios = driver.find_elements(By.XPATH, XPATH_RADIOS_MATCHS)
+    if indice >= len(all_match_radios):
+        return False
+    match_radio = all_match_radios[indice]
+    deja_selectionne = match_radio.is_selected()
+    signature_precedente = driver.execute_script(SIGNATURE_TABLEAU_JS)
+    driver.execute_script("arguments[0].scrollIntoView();", match_radio)
+    WebDriverWait(driver, 5).until(EC.element_to_be_clickable(match_radio)).click()
+
+    # Attendre que le tableau soit rempli et, si le match a changé, que son contenu soit remplacé
+    def tableau_pret(d):
+        signature = d.execute_script(SIGNATURE_TABLEAU_JS)
+        return signature is not None and (deja_selectionne or signature != signature_precedente)
+
+    try:
+        WebDriverWait(driver, 10, poll_frequency=0.1).until(tableau_pret)
+    except Exception:
+        logger.warning(f"Tableau du match {indice} non mis à jour après 10s")
+    return True
+
+
+def _extraire_tableau(driver):
+    """Lit toutes les lignes du tableau des cotes en un seul appel execute_script"""
+    return json.loads(driver.execute_script(EXTRAIRE_TABLEAU_JS))
+
+
+def _extraire_matchs(driver, indices, ouvrir_bloc=True, progression=None):
+    """Parcourt les matchs `indices` dans un navigateur connecté et retourne {indice: lignes brutes}"""
+    if ouvrir_bloc:
+        _ouvrir_bloc_nhl(driver)
+    resultats = {}
+    for i in indices:
+        try:
+            if _selectionner_match(driver, i):
+                resultats[i] = _extraire_tableau(driver)
+                if progression:
+                    progression(f"Match {i + 1} lu ({len(resultats[i])} joueurs)")
+        except Exception as e:
+            logger.warning(f"Error extracting table data for match {i}: {e}")
+    return resultats
+
+
+def recuperer_tableaux(identifiants=None, nb_navigateurs=1, progression=None):
+    """
+    Point d'entrée du backend (voir scraper.BACKENDS_COTES) : parcourt les matchs NHL avec des
+    navigateurs du pool et retourne les lignes brutes du tableau de chaque match, dans l'ordre de la page.
+    """
+    progression = progression or logger.info
+    pool = obtenir_pool_navigateurs(identifiants, nb_navigateurs)
+    pool.taille_max = max(pool.taille_max, nb_navigateurs)
+    drivers = []
+    defectueux = False
+    try:
+        # Tous les navigateurs sont réservés en une fois : attendre un second navigateur en gardant
+        # le premier pourrait bloquer un autre appelant qui ferait de même
+        progression(f"Récupération de {nb_navigateurs} navigateur(s) Chromium connecté(s)...")
+        drivers = pool.acquerir_plusieurs(nb_navigateurs)
+        driver = drivers[0]
+        progression("Navigateur Chromium prêt!")
+
+        _ouvrir_bloc_nhl(driver)
+        total_matches = len(driver.find_elements(By.XPATH, XPATH_RADIOS_MATCHS))
+        nb_navigateurs = max(1, min(nb_navigateurs, total_matches))
+
+        # Navigateurs en trop (moins de matchs que de navigateurs) rendus tout de suite au pool
+        for superflu in drivers[nb_navigateurs:]:
+            pool.liberer(superflu)
+        drivers = drivers[:nb_navigateurs]
+        if nb_navigateurs > 1:
+            progression(f"{total_matches} matchs répartis sur {nb_navigateurs} navigateurs")
+
+        # Répartir les matchs entre les navigateurs
+        # (le premier navigateur a déjà le bloc NHL ouvert)
+        repartition = [list(range(total_matches))[k::nb_navigateurs] for k in range(nb_navigateurs)]
+        ouvrir_bloc = [False] + [True] * (nb_navigateurs - 1)
+        with ThreadPoolExecutor(max_workers=nb_navigateurs) as executor:
+            resultats = {}
+            for partiel in executor.map(_extraire_matchs, drivers, repartition, ouvrir_bloc,
+                                        [progression] * nb_navigateurs):
+                resultats.update(partiel)
+        return [resultats[i] for i in sorted(resultats)]
+    except Exception:
+        defectueux = True
+        raise
+    finally:
+        # Les navigateurs restent ouverts et connectés pour le prochain scraping
+        for driver in drivers:
+            pool.liberer(driver, defectueux)
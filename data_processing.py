@@ -1,21 +1,87 @@
 # data_processing.py
 
 import unicodedata
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+
+# Remplacements des caractères que la décomposition NFKD ne ramène pas à l'ASCII
+REMPLACEMENTS_SPECIAUX = {
+    'ø': 'o', 'å': 'a', 'ä': 'a', 'ö': 'o', 'æ': 'ae',
+    'č': 'c', 'š': 's', 'ž': 'z', 'ř': 'r',
+    'А': 'A', 'Б': 'B', 'В': 'V', 'Г': 'G', 'Д': 'D', 'Е': 'E',
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e',
+}
+_TABLE_REMPLACEMENTS = str.maketrans(REMPLACEMENTS_SPECIAUX)
+
+
+@lru_cache(maxsize=8192)
+def _enlever_accents(texte):
+    if texte.isascii():
+        return texte
+    texte_normalise = unicodedata.normalize('NFKD', texte)
+    texte_sans_accents = ''.join(c for c in texte_normalise if not unicodedata.combining(c))
+    return texte_sans_accents.translate(_TABLE_REMPLACEMENTS)
 
 
 def enlever_accents_avec_remplacement(texte):
     if isinstance(texte, str):
-        texte_normalise = unicodedata.normalize('NFKD', texte)
-        texte_sans_accents = ''.join(
-            c if not unicodedata.combining(c) else '' for c in texte_normalise
-        )
-        remplacements_speciaux = {
-            'ø': 'o', 'å': 'a', 'ä': 'a', 'ö': 'o', 'æ': 'ae',
-            'č': 'c', 'š': 's', 'ž': 'z', 'ř': 'r',
-            'А': 'A', 'Б': 'B', 'В': 'V', 'Г': 'G', 'Д': 'D', 'Е': 'E',
-            'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e',
-        }
-        for original, remplace in remplacements_speciaux.items():
-            texte_sans_accents = texte_sans_accents.replace(original, remplace)
-        return texte_sans_accents
+        return _enlever_accents(texte)
     return texte
+
+
+def enlever_accents_serie(serie):
+    """
+    Version par lot de enlever_accents_avec_remplacement pour une Series :
+    chaque valeur distincte n'est normalisée qu'une fois.
+    """
+    codes, uniques = pd.factorize(serie)
+    if len(uniques) == 0:
+        return serie.copy()
+    resultats = np.array([enlever_accents_avec_remplacement(u) for u in uniques], dtype=object)
+    valeurs = np.where(codes >= 0, resultats[codes], serie.to_numpy(dtype=object))
+    return pd.Series(valeurs, index=serie.index, name=serie.name)
+
+
+def construire_cle(*colonnes):
+    """Construit une clé de jointure en concaténant des colonnes texte (opérations .str vectorisées)."""
+    cle = colonnes[0].astype(str).str.strip()
+    for colonne in colonnes[1:]:
+        cle = cle.str.cat(colonne.astype(str).str.strip(), sep='_')
+    return cle
+
+
+def associer_cotes(cles_stats, cles_cotes, cotes, defaut=np.nan):
+    """
+    Associe à chaque clé de `cles_stats` la cote correspondante dans `cotes` (nulle si absente).
+    En cas de clé dupliquée, la dernière occurrence l'emporte (même comportement qu'un dict rempli ligne à ligne).
+    """
+    table = pd.Series(cotes.to_numpy(), index=cles_cotes.to_numpy())
+    table = table[~table.index.duplicated(keep='last')]
+    # La position -1 (clé absente) pointe sur la valeur par défaut ajoutée en fin de tableau
+    valeurs = np.append(table.to_numpy(), defaut)
+    positions = table.index.get_indexer(cles_stats)
+    return pd.Series(valeurs[positions], index=cles_stats.index).astype(cotes.dtype, errors='ignore')
+
+
+def agreger_cotes(cotes):
+    """
+    Résume le tableau long des cotes (une ligne par joueur et par bookmaker) en une ligne par joueur :
+    meilleure cote, cote médiane, probabilité implicite moyenne (1/cote) et nombre de bookmakers.
+    Un tableau déjà résumé (sans colonne Bookmaker) est retourné tel quel.
+    """
+    if 'Bookmaker' not in cotes.columns:
+        return cotes
+    cles = [colonne for colonne in ('Prénom', 'Nom', 'Team') if colonne in cotes.columns]
+    # observed=True : avec Team catégorielle (schema.py), pandas 2 produirait sinon toutes les
+    # combinaisons Prénom × Nom × Team, y compris celles qui n'existent pas
+    groupes = cotes.assign(Probabilité=1.0 / cotes['Cote']).groupby(cles, sort=False, dropna=False, observed=True)
+    resume = groupes.agg(**{
+        'Cote': ('Cote', 'max'),
+        'Cote médiane': ('Cote', 'median'),
+        'Probabilité': ('Probabilité', 'mean'),
+        'Bookmakers': ('Cote', 'count'),
+    })
+    return resume.astype({'Cote': 'float32', 'Cote médiane': 'float32', 'Probabilité': 'float32',
+                          'Bookmakers': 'uint8'}).reset_index()
@@ -1,25 +1,59 @@
-import streamlit as st
 from firebase_admin import credentials, firestore
 import firebase_admin
 import tempfile
 import json
+import hashlib
 import pandas as pd
-import toml
 import os
+import random
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from google.api_core import exceptions as google_exceptions
+from config import identifiants_firebase
+from prenoms import identifiants_joueurs
+from stockage import serialiser_table, deserialiser_table
 
-def initialize_firebase():
+# Collection des manifestes d'empreintes utilisés par la synchronisation incrémentale
+MANIFESTES_COLLECTION = '_manifestes'
+# Version du schéma des identifiants de documents (voir prenoms.identifiants_joueurs) ; un manifeste
+# d'une autre version est ignoré, pour que la synchronisation supprime les documents à l'ancien format
+VERSION_IDENTIFIANTS = 2
+TAILLE_BATCH = 500
+
+# Disposition "paquet" : la table entière sérialisée en Parquet, découpée en blocs binaires sous
+# PAQUETS_COLLECTION/<collection>/blocs, et un document pointeur PAQUETS_COLLECTION/<collection>
+# qui donne la version courante et son nombre de blocs
+PAQUETS_COLLECTION = '_paquets'
+# Taille d'un bloc en octets, sous la limite de 1 Mio d'un document Firestore
+TAILLE_BLOC_PAQUET = 900_000
+# Blocs par batch, pour rester sous la limite de 10 Mio d'une requête de commit
+BLOCS_PAR_LOT = 8
+# Disposition écrite par publier_table : 'documents' (un document par joueur), 'paquet' ou 'les_deux'
+MODE_STOCKAGE = os.environ.get("FIRESTORE_MODE", "documents")
+MODES_STOCKAGE = ('documents', 'paquet', 'les_deux')
+
+# Erreurs Firestore pour lesquelles un commit est retenté
+ERREURS_TRANSITOIRES = (
+    google_exceptions.Aborted,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+)
+
+def initialize_firebase(firebase_secrets=None):
+    """
+    Initialise Firebase et retourne un client Firestore (None en cas d'échec).
+    Sans `firebase_secrets`, le compte de service est lu par config.identifiants_firebase.
+    """
     # Vérifier si Firebase est déjà initialisé
     if not firebase_admin._apps:
         try:
-            # Essayer d'abord de charger depuis un fichier local
-            try:
-                with open('.streamlit/secrets.toml', 'r') as f:
-                    config = toml.load(f)
-                    firebase_secrets = config['firebase_credentials']
-            except Exception as e:
-                st.error(f"Erreur lors de la lecture du fichier secrets.toml local: {str(e)}")
-                # Si la lecture locale échoue, essayer via st.secrets
-                firebase_secrets = st.secrets["firebase_credentials"]
+            if firebase_secrets is None:
+                firebase_secrets = identifiants_firebase()
+            if firebase_secrets is None:
+                raise KeyError("Section [firebase_credentials] absente de la configuration")
 
             # Vérifier que tous les champs requis sont présents
             required_fields = [
@@ -47,56 +81,231 @@ def initialize_firebase():
             return firestore.client()
             
         except Exception as e:
-            st.error(f"Erreur lors de l'initialisation de Firebase: {str(e)}")
-            st.error("Vérifiez que le fichier .streamlit/secrets.toml existe et contient les bonnes informations")
+            print(f"Erreur lors de l'initialisation de Firebase: {str(e)}")
+            print("Vérifiez que le fichier .streamlit/secrets.toml existe et contient les bonnes informations")
             return None
     else:
         return firestore.client()
 
-def update_firestore(collection_name, df):
+def hacher_document(doc_data):
+    """Empreinte stable du contenu d'un document, indépendante de l'ordre des champs"""
+    contenu = json.dumps(doc_data, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(contenu.encode('utf-8')).hexdigest()
+
+def _documents_depuis_dataframe(df):
+    """
+    Convertit un DataFrame en documents Firestore indexés par leur identifiant (voir
+    prenoms.identifiants_joueurs) ; pour un identifiant en double, la première ligne est gardée.
+    """
+    identifiants = identifiants_joueurs(df['Prénom'], df['Nom'], df['Team'] if 'Team' in df else None)
+    df = df[~identifiants.duplicated().to_numpy()]
+    identifiants = identifiants[~identifiants.duplicated()]
+    # Les colonnes float32 (voir schema.py) sont écrites avec leur écriture décimale la plus courte
+    # (2.4 et non 2.4000000953674316)
+    simples = df.select_dtypes('float32').columns
+    if len(simples):
+        df = df.assign(**{colonne: df[colonne].astype(str).astype('float64') for colonne in simples})
+    documents = {}
+    for doc_id, row in zip(identifiants, df.to_dict(orient='records')):
+        documents[doc_id] = {k: None if pd.api.types.is_scalar(v) and pd.isna(v) else v for k, v in row.items()}
+    return documents
+
+def lire_collection(db, collection_name, champs=None):
+    """
+    Lit une collection en DataFrame indexé par identifiant de document. Avec `champs`, seuls ces
+    champs sont transférés (projection select() côté serveur) ; les identifiants étant uniques par
+    joueur, aucun dédoublonnage n'est nécessaire.
+    """
+    requete = db.collection(collection_name)
+    if champs:
+        # Les noms de champs accentués ou avec espaces (Prénom, Cote médiane) doivent être échappés
+        requete = requete.select([firestore.FieldPath(champ).to_api_repr() for champ in champs])
+    documents = {doc.id: doc.to_dict() for doc in requete.stream()}
+    return pd.DataFrame.from_dict(documents, orient='index')
+
+def _lire_manifeste(db, collection_name):
+    """
+    Retourne les empreintes {doc_id: hash} de la dernière synchronisation, ou None si absentes ou
+    calculées avec un autre schéma d'identifiants
+    """
+    snapshot = db.collection(MANIFESTES_COLLECTION).document(collection_name).get()
+    if not snapshot.exists:
+        return None
+    manifeste = snapshot.to_dict()
+    if manifeste.get('version', 1) != VERSION_IDENTIFIANTS:
+        return None
+    return manifeste.get('empreintes', {})
+
+def _commit_lot(db, numero, operations, tentatives, delai_initial):
+    """Commit d'un lot avec nouvelles tentatives (backoff exponentiel) sur les erreurs transitoires"""
+    debut = time.perf_counter()
+    for tentative in range(1, tentatives + 1):
+        batch = db.batch()
+        for operation, doc_ref, doc_data in operations:
+            if operation == 'set':
+                batch.set(doc_ref, doc_data)
+            else:
+                batch.delete(doc_ref)
+        try:
+            batch.commit()
+            break
+        except ERREURS_TRANSITOIRES as e:
+            if tentative == tentatives:
+                raise
+            delai = delai_initial * 2 ** (tentative - 1)
+            print(f"Lot {numero} : erreur transitoire ({e}), nouvelle tentative dans {delai:.1f}s")
+            time.sleep(delai + random.uniform(0, delai))
+    return {'lot': numero, 'operations': len(operations), 'tentatives': tentative,
+            'duree': time.perf_counter() - debut}
+
+def ecrire_par_lots(db, operations, taille_lot=TAILLE_BATCH, max_workers=4, tentatives=3, delai_initial=0.5):
+    """
+    Exécute des opérations (type, référence, données) par lots de `taille_lot` (limite Firestore
+    de 500 opérations par batch), commités en parallèle par un pool de `max_workers` threads.
+    Retourne la durée, le nombre d'opérations et de tentatives de chaque lot.
+    """
+    lots = [operations[debut:debut + taille_lot] for debut in range(0, len(operations), taille_lot)]
+    if not lots:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(lots))) as executor:
+        futures = [executor.submit(_commit_lot, db, numero, lot, tentatives, delai_initial)
+                   for numero, lot in enumerate(lots)]
+        return [future.result() for future in futures]
+
+def decrire_lots(lots):
+    """Résumé lisible des statistiques de lots retournées par ecrire_par_lots"""
+    if not lots:
+        return "aucune écriture"
+    description = (f"{sum(lot['operations'] for lot in lots)} opérations en {len(lots)} lots "
+                   f"({max(lot['duree'] for lot in lots):.1f}s pour le plus lent")
+    nouvelles_tentatives = sum(lot['tentatives'] - 1 for lot in lots)
+    if nouvelles_tentatives:
+        description += f", {nouvelles_tentatives} nouvelles tentatives"
+    return description + ")"
+
+def update_firestore(collection_name, df, db=None):
+    """
+    Synchronise une collection avec un DataFrame en n'écrivant que les différences.
+    Chaque document est haché ; les empreintes de la dernière synchronisation sont conservées dans
+    un manifeste (collection MANIFESTES_COLLECTION) pour ne réécrire que les documents ajoutés ou
+    modifiés et supprimer ceux qui ont disparu.
+    Retourne le nombre de documents ajoutés, modifiés, supprimés et inchangés et les statistiques
+    des lots écrits (clé 'lots', voir ecrire_par_lots), ou False en cas d'erreur.
+    """
     try:
         # Récupérer la collection Firestore
-        db = initialize_firebase()
+        db = db or initialize_firebase()
         collection_ref = db.collection(collection_name)
         
-        # Supprimer tous les documents existants dans la collection
-        batch_size = 500
-        docs = collection_ref.limit(batch_size).stream()
-        deleted = 0
+        anciennes_empreintes = _lire_manifeste(db, collection_name)
+        if anciennes_empreintes is None:
+            # Pas de manifeste : tous les documents existants sont considérés comme inconnus
+            anciennes_empreintes = {doc_ref.id: None for doc_ref in collection_ref.list_documents()}
         
-        # Supprimer par lots pour éviter les timeouts
-        while docs:
-            batch = db.batch()
-            for doc in docs:
-                batch.delete(doc.reference)
-                deleted += 1
-            batch.commit()
-            docs = collection_ref.limit(batch_size).stream()
+        documents = _documents_depuis_dataframe(df)
+        empreintes = {doc_id: hacher_document(doc_data) for doc_id, doc_data in documents.items()}
         
-        print(f"Suppression de {deleted} documents existants dans {collection_name}")
+        operations = []
+        compteurs = {'ajoutés': 0, 'modifiés': 0, 'supprimés': 0, 'inchangés': 0}
+        for doc_id, empreinte in empreintes.items():
+            if doc_id not in anciennes_empreintes:
+                compteurs['ajoutés'] += 1
+            elif anciennes_empreintes[doc_id] != empreinte:
+                compteurs['modifiés'] += 1
+            else:
+                compteurs['inchangés'] += 1
+                continue
+            operations.append(('set', collection_ref.document(doc_id), documents[doc_id]))
+        for doc_id in anciennes_empreintes.keys() - empreintes.keys():
+            operations.append(('delete', collection_ref.document(doc_id), None))
+            compteurs['supprimés'] += 1
         
-        # Ajouter les nouvelles données par lots
-        batch = db.batch()
-        added = 0
-        for index, row in df.iterrows():
-            doc_data = {k: None if pd.isna(v) else v for k, v in row.to_dict().items()}
-            key = f"{doc_data['Prénom']}_{doc_data['Nom']}"
-            doc_ref = collection_ref.document(key)
-            batch.set(doc_ref, doc_data)
-            added += 1
-            
-            # Commit le batch tous les 500 documents
-            if added % 500 == 0:
-                batch.commit()
-                batch = db.batch()
+        lots = ecrire_par_lots(db, operations)
         
-        # Commit les documents restants
-        if added % 500 != 0:
-            batch.commit()
+        # Le manifeste n'est mis à jour qu'une fois les documents écrits
+        db.collection(MANIFESTES_COLLECTION).document(collection_name).set({'empreintes': empreintes, 'version': VERSION_IDENTIFIANTS})
         
-        print(f"Ajout de {added} nouveaux documents dans {collection_name}")
-        return True
+        print(f"Synchronisation de {collection_name} : {compteurs['ajoutés']} ajoutés, "
+              f"{compteurs['modifiés']} modifiés, {compteurs['supprimés']} supprimés, "
+              f"{compteurs['inchangés']} inchangés, {decrire_lots(lots)}")
+        return {**compteurs, 'lots': lots}
         
     except Exception as e:
         print(f"Erreur lors de la mise à jour de Firestore pour {collection_name}: {str(e)}")
         return False
+
+def publier_paquet(collection_name, df, db=None):
+    """
+    Écrit `df` dans la disposition "paquet" : blocs de la nouvelle version d'abord, puis le pointeur,
+    puis suppression des blocs de la version précédente. Une version identique à celle du pointeur
+    n'est pas réécrite. Retourne la version (empreinte du contenu), le nombre de blocs écrits et les
+    statistiques des lots (écriture des blocs puis suppression des anciens, voir ecrire_par_lots).
+    """
+    db = db or initialize_firebase()
+    octets = serialiser_table(df)
+    version = hashlib.sha1(octets).hexdigest()[:16]
+    pointeur_ref = db.collection(PAQUETS_COLLECTION).document(collection_name)
+    blocs_ref = pointeur_ref.collection('blocs')
+
+    pointeur = pointeur_ref.get()
+    ancien = pointeur.to_dict() if pointeur.exists else {}
+    if ancien.get('version') == version:
+        return {'version': version, 'blocs': 0, 'lots': []}
+
+    blocs = [octets[debut:debut + TAILLE_BLOC_PAQUET] for debut in range(0, len(octets), TAILLE_BLOC_PAQUET)]
+    lots = ecrire_par_lots(db, [('set', blocs_ref.document(f"{version}-{numero}"), {'donnees': bloc})
+                                for numero, bloc in enumerate(blocs)], taille_lot=BLOCS_PAR_LOT)
+    # Le pointeur ne change qu'une fois tous les blocs écrits : un lecteur ne voit jamais de version incomplète
+    pointeur_ref.set({'version': version, 'blocs': len(blocs), 'octets': len(octets), 'lignes': len(df),
+                      'date': datetime.now().isoformat(timespec='seconds')})
+    if ancien.get('version'):
+        lots += ecrire_par_lots(db, [('delete', blocs_ref.document(f"{ancien['version']}-{numero}"), None)
+                                     for numero in range(ancien.get('blocs', 0))])
+    print(f"Paquet de {collection_name} : version {version}, {len(df)} lignes, "
+          f"{len(octets)} octets en {len(blocs)} blocs, {decrire_lots(lots)}")
+    return {'version': version, 'blocs': len(blocs), 'lots': lots}
+
+def lire_paquet(db, collection_name, version_connue=None, colonnes=None):
+    """
+    Lit la disposition "paquet" d'une collection : un document pointeur puis ses blocs.
+    Retourne (version, DataFrame) ; le DataFrame est None si la version est `version_connue`
+    (rien d'autre n'est lu) ou si la collection n'a pas de paquet (version None).
+    """
+    pointeur = db.collection(PAQUETS_COLLECTION).document(collection_name).get()
+    if not pointeur.exists:
+        return None, None
+    pointeur = pointeur.to_dict()
+    version = pointeur['version']
+    if version == version_connue:
+        return version, None
+    blocs_ref = db.collection(PAQUETS_COLLECTION).document(collection_name).collection('blocs')
+    references = [blocs_ref.document(f"{version}-{numero}") for numero in range(pointeur['blocs'])]
+    # get_all ne garantit pas l'ordre des documents : les blocs sont remis dans l'ordre de leur numéro
+    blocs = {doc.id: doc.to_dict()['donnees'] for doc in db.get_all(references) if doc.exists}
+    if len(blocs) != len(references):
+        # Version remplacée entre la lecture du pointeur et celle des blocs
+        raise RuntimeError(f"Paquet {collection_name} version {version} incomplet")
+    return version, deserialiser_table(b''.join(blocs[ref.id] for ref in references), colonnes)
+
+def publier_table(collection_name, df, db=None, mode=None):
+    """
+    Publie une table dans la ou les dispositions du mode de stockage (MODE_STOCKAGE par défaut).
+    Retourne {'documents': compteurs de update_firestore, 'paquet': résultat de publier_paquet}
+    (None pour une disposition non écrite), ou False en cas d'erreur.
+    """
+    mode = mode or MODE_STOCKAGE
+    if mode not in MODES_STOCKAGE:
+        raise ValueError(f"Mode de stockage Firestore inconnu: {mode}")
+    db = db or initialize_firebase()
+    resultat = {'documents': None, 'paquet': None}
+    if mode in ('documents', 'les_deux'):
+        resultat['documents'] = update_firestore(collection_name, df, db)
+        if resultat['documents'] is False:
+            return False
+    if mode in ('paquet', 'les_deux'):
+        try:
+            resultat['paquet'] = publier_paquet(collection_name, df, db)
+        except Exception as e:
+            print(f"Erreur lors de l'écriture du paquet de {collection_name}: {str(e)}")
+            return False
+    return resultat
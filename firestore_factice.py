@@ -0,0 +1,132 @@
+# firestore_factice.py
+
+import copy
+import threading
+
+# Client Firestore en mémoire, limité à ce qu'utilise firebase_utils (documents, sous-collections,
+# batchs, get_all, select), pour vérifier la synchronisation sans projet Firebase (voir benchmarks.py).
+# Les lectures, écritures et suppressions sont comptées comme Firestore les facture.
+
+
+class InstantaneFactice:
+    """Lecture d'un document (DocumentSnapshot)"""
+
+    def __init__(self, reference, donnees):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = donnees is not None
+        self._donnees = donnees
+
+    def to_dict(self):
+        return copy.deepcopy(self._donnees) if self.exists else None
+
+
+class DocumentFactice:
+    """Référence de document (DocumentReference)"""
+
+    def __init__(self, client, chemin):
+        self._client = client
+        self.path = chemin
+        self.id = chemin.rsplit('/', 1)[-1]
+
+    def get(self):
+        with self._client._verrou:
+            self._client.lectures += 1
+            return InstantaneFactice(self, copy.deepcopy(self._client.documents.get(self.path)))
+
+    def set(self, donnees):
+        with self._client._verrou:
+            self._client.ecritures += 1
+            self._client.documents[self.path] = copy.deepcopy(donnees)
+
+    def delete(self):
+        with self._client._verrou:
+            self._client.suppressions += 1
+            self._client.documents.pop(self.path, None)
+
+    def collection(self, nom):
+        return CollectionFactice(self._client, f"{self.path}/{nom}")
+
+
+class RequeteFactice:
+    """Requête d'une collection, avec projection de champs (select)"""
+
+    def __init__(self, collection, champs=None):
+        self._collection = collection
+        # Les chemins de champs échappés (FieldPath.to_api_repr) sont entourés d'accents graves
+        self._champs = [champ.strip('`') for champ in champs] if champs is not None else None
+
+    def stream(self):
+        for reference in self._collection.list_documents():
+            instantane = reference.get()
+            if self._champs is not None:
+                donnees = instantane.to_dict()
+                instantane = InstantaneFactice(reference, {champ: donnees[champ] for champ in self._champs
+                                                           if champ in donnees})
+            yield instantane
+
+
+class CollectionFactice:
+    """Référence de collection (CollectionReference)"""
+
+    def __init__(self, client, chemin):
+        self._client = client
+        self.path = chemin
+        self.id = chemin.rsplit('/', 1)[-1]
+
+    def document(self, identifiant):
+        return DocumentFactice(self._client, f"{self.path}/{identifiant}")
+
+    def list_documents(self):
+        prefixe = self.path + '/'
+        with self._client._verrou:
+            chemins = [chemin for chemin in self._client.documents
+                       if chemin.startswith(prefixe) and '/' not in chemin[len(prefixe):]]
+        return [DocumentFactice(self._client, chemin) for chemin in sorted(chemins)]
+
+    def select(self, champs):
+        return RequeteFactice(self, champs)
+
+    def stream(self):
+        return RequeteFactice(self).stream()
+
+
+class LotFactice:
+    """Batch d'écritures appliqué d'un bloc au commit"""
+
+    def __init__(self, client):
+        self._client = client
+        self._operations = []
+
+    def set(self, reference, donnees):
+        self._operations.append((reference.set, (donnees,)))
+
+    def delete(self, reference):
+        self._operations.append((reference.delete, ()))
+
+    def commit(self):
+        with self._client._verrou:
+            self._client.commits += 1
+        for operation, arguments in self._operations:
+            operation(*arguments)
+
+
+class ClientFactice:
+    """Client Firestore en mémoire : documents {chemin: données} et compteurs d'opérations"""
+
+    def __init__(self):
+        self.documents = {}
+        self._verrou = threading.RLock()
+        self.remettre_compteurs()
+
+    def remettre_compteurs(self):
+        self.lectures = self.ecritures = self.suppressions = self.commits = 0
+
+    def collection(self, nom):
+        return CollectionFactice(self, nom)
+
+    def batch(self):
+        return LotFactice(self)
+
+    def get_all(self, references):
+        return [reference.get() for reference in references]
@@ -0,0 +1,142 @@
+# historique.py
+
+import os
+import time
+import shutil
+import logging
+import argparse
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+import pandas as pd
+from scraper import URL_STATS_SAISON, HEADERS_STATS, SAISON_COURANTE, _lire_tableau_stats, nettoyer_stats
+
+# Dataset Parquet partitionné par saison (un dossier Season=AAAA par saison)
+DOSSIER_HISTORIQUE = os.environ.get("HISTORIQUE_DIR", "data/historique_stats")
+# Préfixe des dossiers de travail d'une saison en cours d'écriture : ignorés à la lecture du dataset
+# (pyarrow ignore les noms commençant par un point) et par saisons_presentes
+PREFIXE_TEMPORAIRE = "."
+# hockey-reference limite à une vingtaine de requêtes par minute
+INTERVALLE_PAR_HOTE = float(os.environ.get("HISTORIQUE_INTERVALLE_HOTE", 3.5))
+
+logger = logging.getLogger(__name__)
+
+
+class LimiteurDebit:
+    """Impose un intervalle minimal entre deux requêtes vers un même hôte, entre tous les threads"""
+
+    def __init__(self, intervalle=INTERVALLE_PAR_HOTE):
+        self.intervalle = intervalle
+        self._prochaine = {}
+        self._verrou = threading.Lock()
+
+    def attendre(self, url):
+        hote = urlparse(url).netloc
+        with self._verrou:
+            maintenant = time.monotonic()
+            creneau = max(maintenant, self._prochaine.get(hote, maintenant))
+            self._prochaine[hote] = creneau + self.intervalle
+        time.sleep(max(0.0, creneau - time.monotonic()))
+
+
+def saisons_presentes(dossier=DOSSIER_HISTORIQUE):
+    """Saisons déjà présentes dans le dataset"""
+    if not os.path.isdir(dossier):
+        return set()
+    return {int(nom.split('=', 1)[1]) for nom in os.listdir(dossier)
+            if nom.startswith('Season=') and os.listdir(os.path.join(dossier, nom))}
+
+
+def _partition(saison, dossier):
+    return os.path.join(dossier, f"Season={saison}")
+
+
+def ecrire_saison(stats, saison, dossier=DOSSIER_HISTORIQUE):
+    """
+    Écrit (ou remplace) la partition d'une saison : le fichier est écrit dans un dossier temporaire
+    puis renommé en place une fois complet, comme les snapshots de stockage.py. Une écriture
+    interrompue ne laisse qu'un dossier temporaire, et la saison reste absente (ou à son ancienne version).
+    """
+    partition = _partition(saison, dossier)
+    temporaire = os.path.join(dossier, f"{PREFIXE_TEMPORAIRE}Season={saison}.tmp")
+    ancienne = os.path.join(dossier, f"{PREFIXE_TEMPORAIRE}Season={saison}.ancienne")
+    # Restes d'une écriture interrompue
+    shutil.rmtree(temporaire, ignore_errors=True)
+    shutil.rmtree(ancienne, ignore_errors=True)
+    os.makedirs(temporaire)
+    # Comme avec partition_cols, la saison est portée par le nom du dossier et non par le fichier
+    stats.drop(columns=['Season']).to_parquet(os.path.join(temporaire, "part.parquet"), index=False)
+    if os.path.isdir(partition):
+        os.replace(partition, ancienne)
+    os.replace(temporaire, partition)
+    shutil.rmtree(ancienne, ignore_errors=True)
+
+
+def telecharger_saison(saison, limiteur, session=None):
+    """Télécharge et met au format de l'application les statistiques d'une saison"""
+    url = URL_STATS_SAISON.format(saison=saison)
+    limiteur.attendre(url)
+    reponse = (session or requests).get(url, headers=HEADERS_STATS, timeout=30)
+    reponse.raise_for_status()
+    # nettoyer_stats applique le schéma commun (ATOI en secondes) : toutes les saisons ont le même schéma Parquet
+    stats = nettoyer_stats(_lire_tableau_stats(reponse.content))
+    stats['Season'] = saison
+    return stats
+
+
+def backfill(debut, fin, dossier=DOSSIER_HISTORIQUE, max_workers=4, limiteur=None, rafraichir=(SAISON_COURANTE,)):
+    """
+    Télécharge en parallèle les saisons `debut` à `fin` (incluses) et les ajoute au dataset.
+    Les saisons déjà présentes sont ignorées, sauf celles de `rafraichir` (par défaut la saison
+    courante, encore en cours) qui sont téléchargées à nouveau et remplacées : une exécution
+    interrompue peut être relancée. Retourne les saisons ajoutées ou remplacées.
+    """
+    limiteur = limiteur or LimiteurDebit()
+    demandees = set(range(debut, fin + 1))
+    a_telecharger = sorted((demandees - saisons_presentes(dossier)) | (demandees & set(rafraichir)))
+    # Pas de saison 2004-2005 (lock-out)
+    a_telecharger = [saison for saison in a_telecharger if saison != 2005]
+    if not a_telecharger:
+        logger.info("Toutes les saisons demandées sont déjà présentes")
+        return []
+
+    ajoutees = []
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(telecharger_saison, saison, limiteur, session): saison
+                   for saison in a_telecharger}
+        for future in as_completed(futures):
+            saison = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                logger.error(f"Saison {saison} ignorée: {e}")
+                continue
+            # Écriture saison par saison pour qu'une interruption ne perde pas les saisons terminées
+            ecrire_saison(stats, saison, dossier)
+            ajoutees.append(saison)
+            logger.info(f"Saison {saison}: {len(stats)} joueurs ajoutés")
+    return sorted(ajoutees)
+
+
+def charger_historique(dossier=DOSSIER_HISTORIQUE, saisons=None):
+    """Charge le dataset historique, éventuellement restreint à certaines saisons"""
+    filtres = [('Season', 'in', list(saisons))] if saisons else None
+    historique = pd.read_parquet(dossier, filters=filtres)
+    historique['Season'] = historique['Season'].astype(int)
+    return historique
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Récupère l'historique des statistiques des joueurs NHL")
+    parser.add_argument("debut", type=int, help="Première saison (ex: 2015 pour 2014-2015)")
+    parser.add_argument("fin", type=int, nargs='?', default=SAISON_COURANTE, help="Dernière saison (incluse)")
+    parser.add_argument("--dossier", default=DOSSIER_HISTORIQUE)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rafraichir", type=int, nargs='*', default=[SAISON_COURANTE],
+                        help="Saisons téléchargées à nouveau même si présentes (par défaut la saison courante)")
+    args = parser.parse_args()
+    saisons = backfill(args.debut, args.fin, dossier=args.dossier, max_workers=args.workers,
+                       rafraichir=args.rafraichir)
+    print(f"{len(saisons)} saisons ajoutées: {saisons}")
@@ -0,0 +1,88 @@
+# index_joueurs.py
+
+import numpy as np
+from recherche import IndexRecherche
+
+# Valeurs d'équipe ou de position qui ne sont pas proposées dans les filtres
+EQUIPES_INVALIDES = {"nan", "None", "", "Non assigné", "0"}
+POSITIONS_INVALIDES = {"nan", "None", "", "Non assigné"}
+
+_AUCUNE_LIGNE = np.empty(0, dtype=np.intp)
+
+
+class IndexJoueurs:
+    """
+    Table fusionnée (statistiques + cotes) préparée une seule fois pour des filtrages répétés.
+    Team et Pos sont converties en catégories et indexées (équipe → positions des lignes,
+    position → positions des lignes) : un filtre devient une intersection de tableaux de
+    positions triés au lieu d'un masque calculé sur toute la table.
+    """
+
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        df['Team'] = df['Team'].astype(str).astype('category')
+        df['Pos'] = df['Pos'].astype(str).astype('category')
+        self.df = df
+
+        self.par_equipe = {str(equipe): lignes for equipe, lignes in df.groupby('Team', observed=True).indices.items()}
+        self.par_position = {str(pos): lignes for pos, lignes in df.groupby('Pos', observed=True).indices.items()}
+        self.equipes = sorted(equipe for equipe in self.par_equipe if equipe not in EQUIPES_INVALIDES)
+        self.positions = sorted(pos for pos in self.par_position if pos not in POSITIONS_INVALIDES)
+
+        # Colonnes utilisées à chaque filtrage, extraites une fois en tableaux numpy
+        self._cotes = df['Cote'].to_numpy(dtype=float) if 'Cote' in df else np.full(len(df), np.nan)
+        self._buts = df['G'].fillna(0).to_numpy(dtype=float) if 'G' in df else np.zeros(len(df))
+        self.recherche = IndexRecherche(df['Prénom'], df['Nom'])
+
+    def __len__(self):
+        return len(self.df)
+
+    @staticmethod
+    def _union(index, cles):
+        lignes = [index[cle] for cle in cles if cle in index]
+        if not lignes:
+            return _AUCUNE_LIGNE
+        return np.unique(np.concatenate(lignes))
+
+    def lignes(self, equipes=None, positions=None):
+        """Positions (triées) des lignes appartenant à l'une des `equipes` et à l'une des `positions` (None = pas de filtre)"""
+        lignes = np.arange(len(self.df))
+        if equipes is not None:
+            lignes = np.intersect1d(lignes, self._union(self.par_equipe, equipes), assume_unique=True)
+        if positions is not None:
+            lignes = np.intersect1d(lignes, self._union(self.par_position, positions), assume_unique=True)
+        return lignes
+
+    def rechercher(self, texte, lignes=None, flou=True):
+        """Positions des lignes dont le nom ou le prénom contient l'un des mots de `texte` (voir recherche.py)"""
+        if not texte.split():
+            return np.arange(len(self.df)) if lignes is None else lignes
+        trouvees = self.recherche.rechercher(texte, flou=flou)
+        return trouvees if lignes is None else np.intersect1d(lignes, trouvees, assume_unique=True)
+
+    def filtrer(self, equipes=None, positions=None, cote_min=None, buts_min=None, sans_cote=True, lignes=None):
+        """
+        Lignes de la table correspondant aux filtres. Les joueurs sans cote passent le filtre
+        `cote_min` et ne sont exclus que si `sans_cote` est faux.
+        """
+        candidates = self.lignes(equipes, positions)
+        if lignes is not None:
+            candidates = np.intersect1d(candidates, lignes, assume_unique=True)
+        cotes = self._cotes[candidates]
+        masque = np.isnan(cotes) if sans_cote else np.zeros(len(candidates), dtype=bool)
+        masque |= cotes >= (cote_min if cote_min is not None else -np.inf)
+        if buts_min is not None:
+            masque &= self._buts[candidates] >= buts_min
+        return self.df.iloc[candidates[masque]]
+
+    def equipes_de(self, lignes):
+        """Équipes (triées) représentées parmi les positions de lignes données"""
+        codes = np.unique(self.df['Team'].cat.codes.to_numpy()[lignes])
+        return sorted(str(equipe) for equipe in self.df['Team'].cat.categories[codes[codes >= 0]])
+
+    def equipe(self, equipe, lignes=None):
+        """Joueurs d'une équipe, éventuellement restreints à des positions de lignes"""
+        lignes_equipe = self.par_equipe.get(equipe, _AUCUNE_LIGNE)
+        if lignes is not None:
+            lignes_equipe = np.intersect1d(lignes_equipe, lignes, assume_unique=True)
+        return self.df.iloc[lignes_equipe]
@@ -0,0 +1,45 @@
+# indicateurs.py
+
+import numpy as np
+
+# Indicateurs calculés après la fusion, dans l'ordre d'affichage
+COLONNES_INDICATEURS = ['Buts/match', 'Tirs/match', 'Prob. implicite', 'Prob. buteur', 'Espérance', 'Avantage']
+
+
+def _colonne(df, nom):
+    """Colonne numérique en float64 (NaN si elle est absente)"""
+    if nom not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[nom].to_numpy(dtype=float, na_value=np.nan, copy=True)
+
+
+def calculer_indicateurs(df):
+    """
+    Ajoute à la table fusionnée (statistiques + cotes) les indicateurs de valeur, calculés en une
+    passe NumPy sur toute la table :
+    - Buts/match et Tirs/match (G/GP, SOG/GP) ;
+    - Prob. implicite : 1/Cote, probabilité de marquer selon la meilleure cote ;
+    - Prob. buteur : probabilité de marquer au moins un but selon une loi de Poisson de moyenne
+      G/GP, soit 1 - exp(-G/GP) ;
+    - Espérance : gain moyen par unité misée à la meilleure cote, Prob. buteur × Cote - 1 ;
+    - Avantage : Prob. buteur - Prob. implicite (positif quand la cote sous-estime le joueur).
+    Un joueur sans match joué ou sans cote a des indicateurs nuls (NaN).
+    """
+    # Sans match joué ou sans cote valide (décimale > 1), la valeur est nulle et se propage
+    matchs = _colonne(df, 'GP')
+    matchs[~(matchs > 0)] = np.nan
+    cotes = _colonne(df, 'Cote')
+    cotes[~(cotes > 1)] = np.nan
+    buts_par_match = _colonne(df, 'G') / matchs
+    tirs_par_match = _colonne(df, 'SOG') / matchs
+    implicite = 1.0 / cotes
+    buteur = -np.expm1(-buts_par_match)
+    indicateurs = {
+        'Buts/match': buts_par_match,
+        'Tirs/match': tirs_par_match,
+        'Prob. implicite': implicite,
+        'Prob. buteur': buteur,
+        'Espérance': buteur * cotes - 1.0,
+        'Avantage': buteur - implicite,
+    }
+    return df.assign(**{nom: valeurs.astype(np.float32) for nom, valeurs in indicateurs.items()})
@@ -0,0 +1,197 @@
+# journal_cotes.py
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from stockage import DOSSIER_DONNEES
+from prenoms import cles_joueurs
+
+# Journal des relevés de cotes, en ajout seul : un fichier Parquet par scraping, rangé par jour
+DOSSIER_JOURNAL = os.path.join(DOSSIER_DONNEES, "journal_cotes")
+# Index de chaque partition : joueur -> fichiers de la partition qui contiennent ce joueur. Un ajout
+# ne réécrit que l'index de son jour, dont la taille ne dépend pas de l'ancienneté du journal
+FICHIER_INDEX = "index_joueurs.json"
+PREFIXE_PARTITION = "date="
+FORMAT_FICHIER = "%Y%m%dT%H%M%S"
+
+SCHEMA_RELEVE = pa.schema([
+    ('cle_joueur', pa.string()),
+    ('Prénom', pa.string()),
+    ('Nom', pa.string()),
+    ('Team', pa.dictionary(pa.int8(), pa.string())),
+    ('Bookmaker', pa.dictionary(pa.int8(), pa.string())),
+    ('Cote', pa.float32()),
+    ('horodatage', pa.timestamp('s')),
+])
+
+_verrou = threading.Lock()
+
+
+def _chemin_index(partition):
+    return os.path.join(partition, FICHIER_INDEX)
+
+
+def _lire_index(partition):
+    """Index d'une partition, ou None s'il est absent ou illisible"""
+    try:
+        with open(_chemin_index(partition), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _ecrire_index(partition, index):
+    temporaire = _chemin_index(partition) + ".tmp"
+    with open(temporaire, 'w') as f:
+        json.dump(index, f)
+    os.replace(temporaire, _chemin_index(partition))
+
+
+def ajouter_releve(odds_df, horodatage=None, dossier=DOSSIER_JOURNAL):
+    """
+    Ajoute au journal le tableau long des cotes d'un scraping (une ligne par joueur et bookmaker).
+    Retourne le chemin relatif du fichier créé.
+    """
+    horodatage = (horodatage or datetime.now()).replace(microsecond=0)
+    releve = pd.DataFrame({
+        'cle_joueur': cles_joueurs(odds_df['Prénom'], odds_df['Nom']).to_numpy(),
+        'Prénom': odds_df['Prénom'].to_numpy(),
+        'Nom': odds_df['Nom'].to_numpy(),
+        'Team': odds_df['Team'].astype(str).where(odds_df['Team'].notna(), '').to_numpy(),
+        'Bookmaker': odds_df['Bookmaker'].to_numpy(),
+        'Cote': odds_df['Cote'].to_numpy(dtype='float32'),
+        'horodatage': horodatage,
+    }).sort_values('cle_joueur')
+
+    nom = f"{horodatage:{FORMAT_FICHIER}}.parquet"
+    relatif = os.path.join(f"{PREFIXE_PARTITION}{horodatage:%Y-%m-%d}", nom)
+    chemin = os.path.join(dossier, relatif)
+    partition = os.path.dirname(chemin)
+    os.makedirs(partition, exist_ok=True)
+    table = pa.Table.from_pandas(releve, schema=SCHEMA_RELEVE, preserve_index=False)
+    pq.write_table(table, chemin + ".tmp", compression="zstd")
+    os.replace(chemin + ".tmp", chemin)
+
+    with _verrou:
+        # Partition sans index (journal antérieur) : reconstruit à partir de ses fichiers
+        index = _lire_index(partition)
+        if index is None:
+            index = _indexer_partition(partition, exclus={nom})
+        for cle in releve['cle_joueur'].unique():
+            index.setdefault(cle, []).append(nom)
+        _ecrire_index(partition, index)
+    return relatif
+
+
+def _horodatage_fichier(relatif):
+    return datetime.strptime(os.path.basename(relatif).split('.')[0], FORMAT_FICHIER)
+
+
+def _fichiers_partition(partition):
+    return sorted(nom for nom in os.listdir(partition) if nom.endswith(".parquet"))
+
+
+def _indexer_partition(partition, exclus=()):
+    """Index d'une partition construit en lisant la colonne cle_joueur de ses fichiers"""
+    index = {}
+    for nom in _fichiers_partition(partition):
+        if nom in exclus:
+            continue
+        cles = pq.read_table(os.path.join(partition, nom), columns=['cle_joueur']).column('cle_joueur')
+        for cle in pc.unique(cles).to_pylist():
+            index.setdefault(cle, []).append(nom)
+    return index
+
+
+def _partitions(debut=None, fin=None, dossier=DOSSIER_JOURNAL):
+    """Partitions (jours) du journal qui recoupent [debut, fin], élaguées d'après leur nom"""
+    if not os.path.isdir(dossier):
+        return []
+    partitions = []
+    for partition in sorted(os.listdir(dossier)):
+        if not partition.startswith(PREFIXE_PARTITION):
+            continue
+        jour = datetime.strptime(partition[len(PREFIXE_PARTITION):], "%Y-%m-%d")
+        if (debut and jour + timedelta(days=1) <= debut) or (fin and jour > fin):
+            continue
+        partitions.append(partition)
+    return partitions
+
+
+def _dans_creneau(relatif, debut, fin):
+    moment = _horodatage_fichier(relatif)
+    return (debut is None or moment >= debut) and (fin is None or moment <= fin)
+
+
+def fichiers_creneau(debut=None, fin=None, dossier=DOSSIER_JOURNAL):
+    """Fichiers du journal dont le relevé tombe dans [debut, fin], sans ouvrir les fichiers"""
+    fichiers = []
+    for partition in _partitions(debut, fin, dossier):
+        for nom in _fichiers_partition(os.path.join(dossier, partition)):
+            relatif = os.path.join(partition, nom)
+            if _dans_creneau(relatif, debut, fin):
+                fichiers.append(relatif)
+    return fichiers
+
+
+def _lire(fichiers, dossier, filtre=None):
+    if not fichiers:
+        return pd.DataFrame(columns=SCHEMA_RELEVE.names)
+    tables = [pq.read_table(os.path.join(dossier, f), filters=filtre, memory_map=True) for f in fichiers]
+    releves = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    return releves.sort_values(['horodatage', 'cle_joueur'], ignore_index=True)
+
+
+def historique_joueur(cle_joueur, debut=None, fin=None, dossier=DOSSIER_JOURNAL):
+    """
+    Relevés d'un joueur : les partitions sont élaguées par jour, puis seuls les fichiers qui le
+    contiennent d'après l'index de chaque partition sont lus. Une partition sans index est lue en
+    entier avec le filtre, que les statistiques des row groups (fichiers triés par cle_joueur) élaguent.
+    """
+    fichiers = []
+    for partition in _partitions(debut, fin, dossier):
+        index = _lire_index(os.path.join(dossier, partition))
+        noms = index.get(cle_joueur, []) if index is not None else _fichiers_partition(os.path.join(dossier, partition))
+        fichiers.extend(relatif for relatif in (os.path.join(partition, nom) for nom in noms)
+                        if _dans_creneau(relatif, debut, fin))
+    return _lire(fichiers, dossier, filtre=[('cle_joueur', '=', cle_joueur)])
+
+
+def releves_creneau(debut=None, fin=None, dossier=DOSSIER_JOURNAL):
+    """Tous les relevés d'une fenêtre de temps"""
+    return _lire(fichiers_creneau(debut, fin, dossier), dossier)
+
+
+def mouvements_creneau(debut=None, fin=None, dossier=DOSSIER_JOURNAL):
+    """Évolution de la meilleure cote de chaque joueur sur une fenêtre : première, dernière, min, max"""
+    releves = releves_creneau(debut, fin, dossier).dropna(subset=['Cote'])
+    if not releves.empty:
+        # Meilleure cote de chaque joueur à chaque relevé
+        releves = releves.groupby(['horodatage', 'cle_joueur'], observed=True, as_index=False).agg(
+            Prénom=('Prénom', 'first'), Nom=('Nom', 'first'), Team=('Team', 'first'), Cote=('Cote', 'max'))
+    if releves.empty:
+        return pd.DataFrame(columns=['Prénom', 'Nom', 'Team', 'Première', 'Dernière', 'Min', 'Max', 'Variation', 'Relevés'])
+    groupes = releves.groupby('cle_joueur', sort=False)
+    mouvements = groupes.agg(
+        Prénom=('Prénom', 'last'), Nom=('Nom', 'last'), Team=('Team', 'last'),
+        Première=('Cote', 'first'), Dernière=('Cote', 'last'),
+        Min=('Cote', 'min'), Max=('Cote', 'max'), Relevés=('Cote', 'size'),
+    )
+    mouvements['Variation'] = mouvements['Dernière'] - mouvements['Première']
+    mouvements.insert(len(mouvements.columns) - 1, 'Variation', mouvements.pop('Variation'))
+    return mouvements.reset_index(drop=True).sort_values('Variation')
+
+
+def joueurs_indexes(dossier=DOSSIER_JOURNAL):
+    """Clés des joueurs présents dans le journal, d'après l'index de chaque partition"""
+    cles = set()
+    for partition in _partitions(dossier=dossier):
+        chemin = os.path.join(dossier, partition)
+        index = _lire_index(chemin)
+        cles.update(index if index is not None else _indexer_partition(chemin))
+    return sorted(cles)
@@ -1,7 +1,10 @@
 # merge.py
 
-import pandas as pd
-from data_processing import enlever_accents_avec_remplacement
+from datetime import datetime
+from stockage import lire_snapshot, ecrire_snapshot, FORMAT_HORODATAGE
+from data_processing import enlever_accents_serie, construire_cle, associer_cotes, agreger_cotes
+from appariement import completer_cotes
+from indicateurs import calculer_indicateurs
 import logging
 
 # Configuration du logging
@@ -14,34 +17,30 @@ logging.basicConfig(
     ]
 )
 
-def fusionner_donnees_par_prenom_nom(stats_df, odds_df):
+def fusionner_donnees_par_prenom_nom(stats_df, odds_df, audit=False, approche=False):
     """
     Fusionne les données de statistiques et de cotes des joueurs.
-    Utilise une approche simple et directe pour préserver tous les joueurs.
+    Utilise une approche simple et directe pour préserver tous les joueurs ; avec `approche`, elle
+    est complétée par l'appariement approché des joueurs restés sans cote (voir appariement.py).
     """
     # Copier les DataFrames pour éviter de modifier les originaux
     stats = stats_df.copy()
-    odds = odds_df.copy()
+    odds = agreger_cotes(odds_df).copy()
 
     # Normaliser les noms
-    stats['Nom'] = stats['Nom'].apply(enlever_accents_avec_remplacement).str.strip()
-    stats['Prénom'] = stats['Prénom'].apply(enlever_accents_avec_remplacement).str.strip()
-    odds['Nom'] = odds['Nom'].apply(enlever_accents_avec_remplacement).str.strip()
-    odds['Prénom'] = odds['Prénom'].apply(enlever_accents_avec_remplacement).str.strip()
+    stats['Nom'] = enlever_accents_serie(stats['Nom']).str.strip()
+    stats['Prénom'] = enlever_accents_serie(stats['Prénom']).str.strip()
+    odds['Nom'] = enlever_accents_serie(odds['Nom']).str.strip()
+    odds['Prénom'] = enlever_accents_serie(odds['Prénom']).str.strip()
 
-    # Créer un dictionnaire des cotes
-    cotes = {}
-    for _, row in odds.iterrows():
-        key = (row['Prénom'].strip(), row['Nom'].strip(), row['Team'].strip())
-        cotes[key] = row['Cote']
+    # Associer les cotes par une jointure unique sur (Prénom, Nom, Team)
+    cles_stats = construire_cle(stats['Prénom'], stats['Nom'], stats['Team'])
+    cles_cotes = construire_cle(odds['Prénom'], odds['Nom'], odds['Team'])
+    stats['Cote'] = associer_cotes(cles_stats, cles_cotes, odds['Cote'])
 
-    # Fonction pour trouver la cote d'un joueur
-    def get_cote(prenom, nom, team):
-        key = (prenom.strip(), nom.strip(), team.strip())
-        return cotes.get(key, "Non disponible")
-
-    # Ajouter la colonne des cotes aux statistiques
-    stats['Cote'] = [get_cote(p, n, t) for p, n, t in zip(stats['Prénom'], stats['Nom'], stats['Team'])]
+    # Appariement approché (optionnel) des joueurs restés sans cote
+    stats['Cote'], stats['Appariement'], rapport = completer_cotes(stats, odds, cles_stats, cles_cotes,
+                                                                   approche=approche)
 
     # Trier par équipe et nom
     stats = stats.sort_values(['Team', 'Nom'])
@@ -53,7 +52,7 @@ def fusionner_donnees_par_prenom_nom(stats_df, odds_df):
     print("\nJoueurs Johnston après fusion:")
     print(johnston_result[['Prénom', 'Nom', 'Team', 'Cote']].to_string())
 
-    return stats
+    return (stats, rapport) if audit else stats
 
 def merge_data():
     """
@@ -64,23 +63,38 @@ def merge_data():
         
         # Récupération des statistiques des joueurs
         logging.info("Récupération des statistiques des joueurs...")
-        stats_df = pd.read_csv('stats.csv')
+        stats_df = lire_snapshot('stats')
+        if stats_df is None:
+            raise FileNotFoundError("Aucun snapshot de statistiques dans le stockage local")
         logging.info(f"Nombre de joueurs dans les statistiques: {len(stats_df)}")
         
         # Récupération des cotes des joueurs
         logging.info("Récupération des cotes des joueurs...")
-        odds_df = pd.read_csv('odds.csv')
-        logging.info(f"Nombre de joueurs dans les cotes: {len(odds_df)}")
+        odds_df = lire_snapshot('odds')
+        if odds_df is None:
+            raise FileNotFoundError("Aucun snapshot de cotes dans le stockage local")
+        logging.info(f"Nombre de cotes (joueur, bookmaker): {len(odds_df)}")
         
         # Fusion des données
         logging.info("Fusion des données en cours...")
-        merged_df = fusionner_donnees_par_prenom_nom(stats_df, odds_df)
+        merged_df, rapport = fusionner_donnees_par_prenom_nom(stats_df, odds_df, audit=True, approche=True)
         logging.info(f"Nombre de joueurs après fusion: {len(merged_df)}")
+        logging.info(f"Appariements approchés acceptés: {int(rapport['Accepté'].sum())} "
+                     f"(sur {len(rapport)} paires dans le rapport)")
+        
+        # Indicateurs de valeur (buts par match, probabilités, espérance)
+        merged_df = calculer_indicateurs(merged_df)
         
         # Vérification des données manquantes
-        missing_odds = merged_df[merged_df['Cote'] == "Non disponible"].shape[0]
+        missing_odds = int(merged_df['Cote'].isna().sum())
         logging.info(f"Nombre de joueurs sans cote: {missing_odds}")
         
+        # Sauvegarde du résultat dans le stockage local
+        horodatage = ecrire_snapshot('merged', merged_df)
+        logging.info(f"Snapshot des données fusionnées enregistré: {horodatage}")
+        if not rapport.empty:
+            ecrire_snapshot('appariements', rapport, horodatage=datetime.strptime(horodatage, FORMAT_HORODATAGE))
+        
         return merged_df
         
     except Exception as e:
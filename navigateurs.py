@@ -0,0 +1,339 @@
+# navigateurs.py
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+# URLs du site de cotes (modifiables pour pointer vers un serveur local de test)
+BASE_URL = os.environ.get("ODDS_BASE_URL", "https://maxicotes.fr")
+LOGIN_URL = f"{BASE_URL}/wp-login.php"
+ODDS_URL = f"{BASE_URL}/hockey-buteur"
+
+# Cookies de session conservés entre deux exécutions
+FICHIER_COOKIES = os.environ.get("ODDS_COOKIES_FILE", ".cache/cookies_cotes.json")
+# Préfixe du cookie posé par WordPress une fois connecté
+COOKIE_CONNEXION = "wordpress_logged_in"
+# Un navigateur inutilisé depuis plus longtemps est fermé
+DUREE_INACTIVITE_MAX = int(os.environ.get("ODDS_DUREE_INACTIVITE_MAX", 15 * 60))
+# Attente maximale (en secondes) d'un navigateur libre du pool
+DELAI_ACQUISITION = float(os.environ.get("ODDS_DELAI_ACQUISITION", 120))
+# Éléments présents sur les pages WordPress d'un utilisateur connecté : barre d'administration,
+# classe "logged-in" du body, lien de déconnexion
+SELECTEUR_CONNECTE = os.environ.get(
+    "ODDS_SELECTEUR_CONNECTE", "#wpadminbar, body.logged-in, a[href*='action=logout']")
+EST_CONNECTE_JS = "return document.querySelector(arguments[0]) !== null;"
+
+logger = logging.getLogger(__name__)
+
+
+class ConnexionRefusee(Exception):
+    """Le site de cotes ne reconnaît pas la session après une connexion"""
+
+
+class PoolEpuise(Exception):
+    """Aucun navigateur du pool n'est devenu libre avant le délai d'attente"""
+
+
+def creer_driver():
+    """Démarre un Chromium headless configuré pour Streamlit Cloud"""
+    # Selenium n'est importé qu'au démarrage d'un navigateur : les cookies et URLs de ce module
+    # servent aussi au backend HTTP (cotes_http.py), qui n'en a pas besoin
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    # Configuration de Chromium pour Streamlit Cloud
+    chrome_options = Options()
+
+    # Configuration pour le mode headless
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+
+    # Configuration spécifique pour Chromium sur Debian
+    chrome_options.binary_location = "/usr/bin/chromium"
+
+    # Options supplémentaires
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-infobars')
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+
+    # User agent
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+    # Utilisation du ChromeDriver installé via packages.txt
+    service = Service('/usr/bin/chromedriver')
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.set_page_load_timeout(30)
+    return driver
+
+
+def connecter(driver, username, password):
+    """Se connecte au site de cotes via le formulaire WordPress et ferme la popup éventuelle"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get(LOGIN_URL)
+
+    WebDriverWait(driver, 20).until(
+        EC.presence_of_element_located((By.ID, "user_login"))
+    )
+
+    username_input = driver.find_element(By.ID, "user_login")
+    username_input.send_keys(username)
+
+    password_input = driver.find_element(By.ID, "user_pass")
+    password_input.send_keys(password)
+
+    login_button = driver.find_element(By.ID, "wp-submit")
+    login_button.click()
+
+    try:
+        popup_close_button = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "button.pum-close.popmake-close"))
+        )
+        popup_close_button.click()
+    except Exception:
+        logger.info("No popup found or failed to close.")
+
+
+def cookies_valides(cookies):
+    """Vrai si les cookies contiennent une session WordPress non expirée"""
+    maintenant = time.time()
+    return any(
+        cookie['name'].startswith(COOKIE_CONNEXION) and cookie.get('expiry', maintenant + 1) > maintenant
+        for cookie in cookies
+    )
+
+
+def charger_cookies(fichier=FICHIER_COOKIES):
+    try:
+        with open(fichier, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cookies de session illisibles ({fichier}): {e}")
+        return None
+
+
+def sauver_cookies(cookies, fichier=FICHIER_COOKIES):
+    dossier = os.path.dirname(fichier)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    # Fichier lisible par le seul utilisateur courant : il donne accès au compte
+    descripteur = os.open(fichier, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descripteur, 'w') as f:
+        json.dump(cookies, f)
+    logger.info(f"Cookies de session enregistrés ({fichier})")
+
+
+class PoolNavigateurs:
+    """
+    Pool de navigateurs connectés au site de cotes, réutilisés d'un scraping à l'autre.
+    Les cookies de connexion sont persistés sur disque : un nouveau navigateur reprend la session
+    existante et ne repasse par le formulaire de connexion que si elle a expiré.
+    """
+
+    def __init__(self, username, password, taille_max=4, fichier_cookies=FICHIER_COOKIES):
+        self.username = username
+        self.password = password
+        self.taille_max = taille_max
+        self.fichier_cookies = fichier_cookies
+        self._libres = []  # (driver, horodatage de dernière utilisation)
+        self._nb_ouverts = 0
+        self._condition = threading.Condition()
+        self._prechauffage = None
+
+    def session_valide(self, driver):
+        """
+        Vérifie que le navigateur répond et que le site le considère toujours connecté : cookie de
+        session non expiré, puis page d'accueil rechargée et marqueur de connexion (SELECTEUR_CONNECTE)
+        présent. Un cookie encore valide côté navigateur ne suffit pas : le serveur a pu clore la session.
+        """
+        try:
+            if not cookies_valides(driver.get_cookies()):
+                return False
+            driver.get(BASE_URL)
+            return bool(driver.execute_script(EST_CONNECTE_JS, SELECTEUR_CONNECTE))
+        except Exception:
+            return False
+
+    def _authentifier(self, driver):
+        cookies = charger_cookies(self.fichier_cookies)
+        if cookies and cookies_valides(cookies):
+            driver.get(BASE_URL)
+            for cookie in cookies:
+                cookie.pop('sameSite', None)
+                try:
+                    driver.add_cookie(cookie)
+                except Exception as e:
+                    logger.warning(f"Cookie {cookie.get('name')} non restauré: {e}")
+            if self.session_valide(driver):
+                logger.info("Session du site de cotes reprise depuis les cookies enregistrés")
+                return
+        logger.info("Session expirée ou absente, nouvelle connexion")
+        connecter(driver, self.username, self.password)
+        # Identifiants refusés ou formulaire modifié : le navigateur ne doit pas être rendu au scraper,
+        # qui lirait les pages réservées sans être connecté
+        if not self.session_valide(driver):
+            raise ConnexionRefusee("Connexion au site de cotes refusée (aucun marqueur de session)")
+        sauver_cookies(driver.get_cookies(), self.fichier_cookies)
+
+    def _fermer(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._condition:
+            self._nb_ouverts -= 1
+            self._condition.notify_all()
+
+    def _fermer_inactifs(self):
+        limite = time.time() - DUREE_INACTIVITE_MAX
+        with self._condition:
+            inactifs = [driver for driver, derniere_utilisation in self._libres if derniere_utilisation < limite]
+            self._libres = [(driver, t) for driver, t in self._libres if t >= limite]
+        if inactifs:
+            logger.info(f"{len(inactifs)} navigateur(s) inactif(s) fermé(s)")
+        for driver in inactifs:
+            self._fermer(driver)
+
+    def _reserver(self, nombre, timeout):
+        """
+        Réserve `nombre` navigateurs d'un seul coup : des navigateurs libres et des places pour en
+        ouvrir de nouveaux (None). Lève PoolEpuise si la réservation n'est pas possible avant `timeout`.
+        """
+        with self._condition:
+            disponible = lambda: len(self._libres) + self.taille_max - self._nb_ouverts >= nombre
+            if not disponible():
+                logger.info(f"Attente de {nombre} navigateur(s) libre(s) ({self._nb_ouverts} ouverts "
+                            f"sur {self.taille_max})")
+            if not self._condition.wait_for(disponible, timeout):
+                raise PoolEpuise(f"{nombre} navigateurs demandés, aucun libéré en {timeout:g}s "
+                                 f"({self._nb_ouverts} ouverts sur {self.taille_max})")
+            reserves = [self._libres.pop()[0] for _ in range(min(nombre, len(self._libres)))]
+            self._nb_ouverts += nombre - len(reserves)
+            return reserves + [None] * (nombre - len(reserves))
+
+    def _preparer(self, driver):
+        """
+        Rend connecté un navigateur réservé : navigateur libre vérifié (réauthentifié si sa session a
+        expiré, remplacé s'il ne répond plus ou si la connexion échoue), ou nouveau navigateur (None).
+        En cas d'échec, la place réservée est rendue au pool et l'erreur propagée.
+        """
+        if driver is not None:
+            if self.session_valide(driver):
+                return driver
+            try:
+                self._authentifier(driver)
+                return driver
+            except Exception as e:
+                logger.warning(f"Navigateur du pool inutilisable ({e}), remplacement")
+                self._fermer(driver)
+                with self._condition:
+                    self._nb_ouverts += 1
+
+        nouveau = None
+        try:
+            logger.info("Démarrage d'un nouveau navigateur")
+            nouveau = creer_driver()
+            self._authentifier(nouveau)
+            return nouveau
+        except Exception as e:
+            logger.error(f"Navigateur non connecté au site de cotes: {e}")
+            if nouveau is not None:
+                try:
+                    nouveau.quit()
+                except Exception:
+                    pass
+            with self._condition:
+                self._nb_ouverts -= 1
+                self._condition.notify_all()
+            raise
+
+    def acquerir_plusieurs(self, nombre, timeout=DELAI_ACQUISITION):
+        """
+        Retourne `nombre` navigateurs connectés, réservés en une fois : un appelant qui a besoin de
+        plusieurs navigateurs n'en garde jamais un en attendant les autres. Lève PoolEpuise après
+        `timeout` secondes d'attente, ValueError si `nombre` dépasse la taille du pool.
+        """
+        if nombre > self.taille_max:
+            raise ValueError(f"{nombre} navigateurs demandés pour un pool de {self.taille_max}")
+        self._fermer_inactifs()
+        reserves = self._reserver(nombre, timeout)
+        logger.info(f"{nombre} navigateur(s) réservé(s), dont {sum(d is None for d in reserves)} à démarrer")
+        drivers = []
+        try:
+            for position, driver in enumerate(reserves):
+                drivers.append(self._preparer(driver))
+        except Exception:
+            for driver in drivers:
+                self.liberer(driver)
+            # Places réservées non encore préparées
+            restants = reserves[position + 1:]
+            for driver in restants:
+                if driver is not None:
+                    self.liberer(driver)
+            with self._condition:
+                self._nb_ouverts -= sum(driver is None for driver in restants)
+                self._condition.notify_all()
+            raise
+        return drivers
+
+    def acquerir(self, timeout=DELAI_ACQUISITION):
+        """Retourne un navigateur connecté, en réutilisant un navigateur libre si possible"""
+        return self.acquerir_plusieurs(1, timeout)[0]
+
+    def liberer(self, driver, defectueux=False):
+        """Remet un navigateur dans le pool (ou le ferme s'il est défectueux)"""
+        if defectueux:
+            self._fermer(driver)
+            return
+        with self._condition:
+            self._libres.append((driver, time.time()))
+            self._condition.notify_all()
+
+    @contextmanager
+    def navigateur(self):
+        driver = self.acquerir()
+        defectueux = False
+        try:
+            yield driver
+        except Exception:
+            defectueux = True
+            raise
+        finally:
+            self.liberer(driver, defectueux)
+
+    def prechauffer(self, nombre=1):
+        """Démarre et connecte `nombre` navigateurs en arrière-plan (sans effet si déjà lancé)"""
+        with self._condition:
+            if self._prechauffage is not None:
+                return self._prechauffage
+
+            def _prechauffer():
+                try:
+                    drivers = self.acquerir_plusieurs(min(nombre, self.taille_max))
+                except Exception as e:
+                    logger.warning(f"Préchauffage des navigateurs interrompu: {e}")
+                    return
+                for driver in drivers:
+                    self.liberer(driver)
+
+            self._prechauffage = threading.Thread(target=_prechauffer, daemon=True)
+            self._prechauffage.start()
+            return self._prechauffage
+
+    def fermer(self):
+        """Ferme tous les navigateurs libres du pool"""
+        with self._condition:
+            libres, self._libres = self._libres, []
+        for driver, _ in libres:
+            self._fermer(driver)
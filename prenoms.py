@@ -0,0 +1,99 @@
+# prenoms.py
+
+import os
+from functools import lru_cache
+from data_processing import enlever_accents_avec_remplacement, enlever_accents_serie
+
+FICHIER_VARIANTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prenoms_variantes.txt')
+
+
+def plier_prenom(prenom):
+    """Forme de comparaison d'un prénom : sans accents, sans espaces superflus et en minuscules"""
+    return enlever_accents_avec_remplacement(prenom).strip().lower()
+
+
+def lire_groupes(chemin=FICHIER_VARIANTES):
+    """Lit le fichier des variantes : une liste de groupes de prénoms équivalents"""
+    groupes = []
+    with open(chemin, 'r', encoding='utf-8') as f:
+        for ligne in f:
+            ligne = ligne.split('#', 1)[0].strip()
+            if ligne:
+                groupes.append([prenom.strip() for prenom in ligne.split(',') if prenom.strip()])
+    return groupes
+
+
+class IndexPrenoms:
+    """
+    Index d'équivalence des prénoms construit une seule fois.
+    Les groupes sont fusionnés par union-find sur leur forme pliée ; chaque classe a pour
+    identifiant canonique le premier prénom rencontré.
+    """
+
+    def __init__(self, groupes):
+        parents = {}
+
+        def trouver(prenom):
+            while parents[prenom] != prenom:
+                parents[prenom] = parents[parents[prenom]]
+                prenom = parents[prenom]
+            return prenom
+
+        # Les prénoms sont insérés dans l'ordre du fichier : la racine la plus ancienne l'emporte
+        ordre = {}
+        for groupe in groupes:
+            plies = [plier_prenom(prenom) for prenom in groupe]
+            for prenom in plies:
+                if prenom not in parents:
+                    parents[prenom] = prenom
+                    ordre[prenom] = len(ordre)
+            for prenom in plies[1:]:
+                racine_a, racine_b = trouver(plies[0]), trouver(prenom)
+                if racine_a != racine_b:
+                    if ordre[racine_b] < ordre[racine_a]:
+                        racine_a, racine_b = racine_b, racine_a
+                    parents[racine_b] = racine_a
+
+        self._canonique = {prenom: trouver(prenom) for prenom in parents}
+
+    @classmethod
+    def depuis_fichier(cls, chemin=FICHIER_VARIANTES):
+        return cls(lire_groupes(chemin))
+
+    def id_canonique(self, prenom):
+        """Identifiant canonique d'un prénom (sa forme pliée s'il n'a pas de variante connue)"""
+        prenom = plier_prenom(prenom)
+        return self._canonique.get(prenom, prenom)
+
+    def canonicaliser(self, prenoms):
+        """Version vectorisée de id_canonique pour une Series"""
+        plies = enlever_accents_serie(prenoms).str.strip().str.lower()
+        return plies.map(self._canonique).fillna(plies)
+
+    def sont_equivalents(self, prenom_a, prenom_b):
+        return self.id_canonique(prenom_a) == self.id_canonique(prenom_b)
+
+
+@lru_cache(maxsize=None)
+def charger_index_prenoms(chemin=FICHIER_VARIANTES):
+    """Index des prénoms partagé, chargé au premier appel"""
+    return IndexPrenoms.depuis_fichier(chemin)
+
+
+def cles_joueurs(prenoms, noms):
+    """Clé stable d'un joueur (prénom canonique et nom sans accents, en minuscules) pour des Series"""
+    noms_plies = enlever_accents_serie(noms).str.strip().str.lower()
+    return charger_index_prenoms().canonicaliser(prenoms).str.cat(noms_plies, sep='_')
+
+
+def identifiants_joueurs(prenoms, noms, equipes=None):
+    """
+    Identifiant de document d'un joueur pour des Series : clé stable (voir cles_joueurs) suivie de
+    l'équipe, pour que deux homonymes de deux équipes restent distincts (sans équipe, la clé seule).
+    Les caractères autres que [a-z0-9_] deviennent '-' : l'identifiant ne contient ni '/' ni espace.
+    """
+    cles = cles_joueurs(prenoms, noms)
+    if equipes is not None:
+        equipes = equipes.astype(str).where(equipes.notna(), '').str.strip().str.lower()
+        cles = cles.where(equipes == '', cles + '_' + equipes)
+    return cles.str.replace(r'[^a-z0-9_]+', '-', regex=True)
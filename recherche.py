@@ -0,0 +1,112 @@
+# recherche.py
+
+import numpy as np
+import pandas as pd
+from data_processing import enlever_accents_avec_remplacement, enlever_accents_serie
+
+# Score de Dice minimal (trigrammes communs) pour qu'un mot approché soit retenu
+SEUIL_FLOU = 0.5
+
+_AUCUNE_LIGNE = np.empty(0, dtype=np.intp)
+
+
+def plier(texte):
+    """Forme de recherche d'un texte : sans accents et en minuscules"""
+    return enlever_accents_avec_remplacement(texte).lower()
+
+
+def trigrammes(mot):
+    """Trigrammes d'un mot encadré d'espaces (les débuts et fins de mot ont leurs propres trigrammes)"""
+    mot = f" {mot} "
+    return {mot[i:i + 3] for i in range(len(mot) - 2)}
+
+
+class IndexRecherche:
+    """
+    Index inversé des noms de joueurs, construit une fois par table fusionnée.
+    Chaque mot du prénom et du nom (sans accents, en minuscules) est relié aux lignes qui le
+    contiennent, et chaque trigramme aux mots qui le contiennent. Une recherche ne teste que les
+    mots qui ont tous les trigrammes du terme ; un terme sans correspondance exacte est rapproché
+    des mots qui partagent le plus de trigrammes avec lui (fautes de frappe).
+    """
+
+    def __init__(self, prenoms, noms):
+        prenoms = pd.Series(prenoms).reset_index(drop=True).astype(str)
+        noms = pd.Series(noms).reset_index(drop=True).astype(str)
+        mots = pd.concat([
+            enlever_accents_serie(prenoms).str.lower().str.split(),
+            enlever_accents_serie(noms).str.lower().str.split(),
+        ]).explode().dropna()
+
+        # Occurrences (mot, ligne) : identifiant du mot distinct et position de la ligne
+        self._codes, self.mots = pd.factorize(mots, sort=True)
+        self._lignes = mots.index.to_numpy(dtype=np.intp)
+        self._longueurs = self.mots.str.len().to_numpy()
+
+        # Trigrammes de chaque mot, extraits position par position sur tout le vocabulaire
+        encadres = pd.Series(" " + self.mots + " ")
+        trigrammes_mots, identifiants = [], []
+        for debut in range(int(self._longueurs.max(initial=0))):
+            tranche = encadres.str.slice(debut, debut + 3)
+            complets = (tranche.str.len() == 3).to_numpy()
+            trigrammes_mots.append(tranche[complets].to_numpy(dtype=object))
+            identifiants.append(np.flatnonzero(complets))
+        codes_trigrammes, uniques = pd.factorize(np.concatenate(trigrammes_mots or [np.empty(0, dtype=object)]))
+        identifiants = np.concatenate(identifiants or [_AUCUNE_LIGNE])
+        self._trigrammes = {trigramme: code for code, trigramme in enumerate(uniques)}
+
+        # Listes de mots par trigramme, stockées à plat : mots [bornes[t], bornes[t + 1]) du trigramme t
+        paires = np.sort(codes_trigrammes.astype(np.int64) * max(len(self.mots), 1) + identifiants)
+        paires = paires[np.diff(paires, prepend=-1) != 0]
+        codes_paires = paires // max(len(self.mots), 1)
+        self._mots_trigrammes = (paires % max(len(self.mots), 1)).astype(np.intp)
+        self._bornes = np.searchsorted(codes_paires, np.arange(len(uniques) + 1))
+
+    def _mots_du_trigramme(self, trigramme):
+        code = self._trigrammes.get(trigramme)
+        if code is None:
+            return _AUCUNE_LIGNE
+        return self._mots_trigrammes[self._bornes[code]:self._bornes[code + 1]]
+
+    def _mots_contenant(self, terme):
+        """Identifiants des mots qui contiennent `terme`"""
+        if len(terme) < 3:
+            # Trop court pour les trigrammes : test sur tout le vocabulaire
+            candidats = np.arange(len(self.mots))
+        else:
+            # Un mot qui contient le terme contient tous ses trigrammes intérieurs
+            candidats = self._mots_du_trigramme(terme[:3])
+            for debut in range(1, len(terme) - 2):
+                if len(candidats) == 0:
+                    break
+                candidats = np.intersect1d(candidats, self._mots_du_trigramme(terme[debut:debut + 3]), assume_unique=True)
+        if len(candidats) == 0:
+            return candidats
+        return candidats[self.mots[candidats].str.contains(terme, regex=False)]
+
+    def _mots_proches(self, terme, seuil=SEUIL_FLOU):
+        """Identifiants des mots dont le score de Dice sur les trigrammes avec `terme` atteint `seuil`"""
+        trigrammes_terme = trigrammes(terme)
+        communs = np.bincount(
+            np.concatenate([self._mots_du_trigramme(trigramme) for trigramme in trigrammes_terme]),
+            minlength=len(self.mots),
+        )
+        scores = 2 * communs / (len(trigrammes_terme) + self._longueurs)
+        return np.flatnonzero(scores >= seuil)
+
+    def rechercher(self, texte, flou=True):
+        """
+        Positions (triées) des lignes dont le prénom ou le nom contient l'un des mots de `texte`.
+        Avec `flou`, un mot sans correspondance est remplacé par les mots les plus proches.
+        """
+        identifiants = []
+        for terme in plier(texte).split():
+            trouves = self._mots_contenant(terme)
+            if len(trouves) == 0 and flou and len(terme) >= 3:
+                trouves = self._mots_proches(terme)
+            identifiants.append(trouves)
+        if not identifiants:
+            return _AUCUNE_LIGNE
+        retenus = np.zeros(len(self.mots), dtype=bool)
+        retenus[np.concatenate(identifiants)] = True
+        return np.unique(self._lignes[retenus[self._codes]])
@@ -0,0 +1,76 @@
+# schema.py
+
+import numpy as np
+import pandas as pd
+
+# Types des colonnes des tables de joueurs (statistiques, cotes, fusion), appliqués une seule fois
+# à l'ingestion : scraping, écriture d'un snapshot, lecture de Firestore
+TYPES_COLONNES = {
+    'Team': 'category',
+    'Pos': 'category',
+    'Bookmaker': 'category',
+    'GP': 'uint16',
+    'G': 'uint16',
+    'A': 'uint16',
+    'SOG': 'uint16',
+    'TSA': 'uint16',
+    # Temps de glace moyen par match, en secondes (texte "mm:ss" sur hockey-reference)
+    'ATOI': 'uint16',
+    'SPCT': 'float32',
+    'Cote': 'float32',
+    'Cote médiane': 'float32',
+    'Probabilité': 'float32',
+    'Bookmakers': 'uint8',
+}
+
+
+def atoi_en_secondes(atoi):
+    """Temps de glace "mm:ss" converti en secondes ; une valeur déjà numérique est gardée telle quelle"""
+    if pd.api.types.is_numeric_dtype(atoi):
+        return atoi
+    # Quelques centaines de valeurs distinctes au plus : chacune n'est analysée qu'une fois
+    codes, valeurs = pd.factorize(atoi)
+    valeurs = pd.Series(valeurs, dtype=object)
+    parties = valeurs.astype(str).str.extract(r'^\s*(\d+):(\d{1,2})\s*$')
+    secondes = pd.to_numeric(parties[0], errors='coerce') * 60 + pd.to_numeric(parties[1], errors='coerce')
+    # Valeurs sans ":" (cellule vide remplacée par 0, secondes déjà converties)
+    secondes = secondes.fillna(pd.to_numeric(valeurs, errors='coerce')).to_numpy(dtype=float)
+    return pd.Series(np.append(secondes, np.nan)[codes], index=atoi.index)
+
+
+def atoi_en_texte(secondes):
+    """Temps de glace en secondes mis au format "mm:ss" pour l'affichage"""
+    secondes = pd.to_numeric(secondes, errors='coerce').fillna(0).astype(int)
+    return (secondes // 60).astype(str) + ':' + (secondes % 60).astype(str).str.zfill(2)
+
+
+def _convertir(serie, type_cible):
+    if type_cible == 'category':
+        # Catégories textuelles, les valeurs manquantes restent manquantes
+        return serie.astype(str).where(serie.notna()).astype('category')
+    if type_cible == 'float32':
+        return pd.to_numeric(serie, errors='coerce').astype('float32')
+    # Compteurs : valeurs manquantes à 0, bornées à la capacité du type
+    limites = np.iinfo(type_cible)
+    return pd.to_numeric(serie, errors='coerce').fillna(0).clip(limites.min, limites.max).round().astype(type_cible)
+
+
+def appliquer_schema(df):
+    """
+    Retourne `df` avec les colonnes de TYPES_COLONNES converties à leur type. Les colonnes déjà au
+    bon type ne sont pas retouchées : appliquer le schéma à une table déjà typée ne coûte rien.
+    """
+    conversions = {}
+    for colonne, type_cible in TYPES_COLONNES.items():
+        if colonne not in df.columns or df[colonne].dtype == type_cible:
+            continue
+        serie = atoi_en_secondes(df[colonne]) if colonne == 'ATOI' else df[colonne]
+        conversions[colonne] = _convertir(serie, type_cible)
+    return df.assign(**conversions) if conversions else df
+
+
+def pour_affichage(df):
+    """Copie de `df` au format d'affichage (temps de glace en "mm:ss")"""
+    if 'ATOI' not in df.columns:
+        return df
+    return df.assign(ATOI=atoi_en_texte(df['ATOI']))
@@ -1,18 +1,32 @@
 # scraper.py
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-import time
 import re
-from data_processing import enlever_accents_avec_remplacement
-import streamlit as st
+import os
+import logging
+import importlib
+import pandas as pd
+from data_processing import enlever_accents_serie, construire_cle, associer_cotes, agreger_cotes
+from prenoms import charger_index_prenoms
+from appariement import completer_cotes
+from schema import appliquer_schema
+
+# Les modules lourds (lxml, requests, Selenium) ne sont importés qu'au premier scraping :
+# l'application et les tâches qui ne font que lire des données déjà collectées démarrent sans eux
+
+logger = logging.getLogger(__name__)
+
+# Page des statistiques des patineurs d'une saison (NHL_2025 = saison 2024-2025)
+URL_STATS_SAISON = "https://www.hockey-reference.com/leagues/NHL_{saison}_skaters.html"
+SAISON_COURANTE = 2025
+HEADERS_STATS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Colonnes conservées du tableau des statistiques de hockey-reference
+COLONNES_STATS = ["Player", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI"]
+COLONNES_NUMERIQUES = ["GP", "G", "A", "SOG", "SPCT", "TSA"]
+# À incrémenter quand le format du tableau extrait change, pour invalider le cache disque
+VERSION_TABLEAU_STATS = 2
 
 # Dictionnaire de correspondance des noms d'équipes
 TEAM_MAPPING = {
@@ -51,313 +65,203 @@ TEAM_MAPPING = {
     'Winnipeg Jets': 'WPG'
 }
 
-# Dictionnaire des variations de prénoms
-PRENOM_VARIATIONS = {
-    'Alex': ['Alexander', 'Alexandre'],
-    'Artemi': ['Artemy'],
-    'Chris': ['Christopher'],
-    'Matt': ['Matthew'],
-    'Mike': ['Michael'],
-    'Nick': ['Nicholas'],
-    'Sam': ['Samuel'],
-    'Tony': ['Anthony'],
-    'Will': ['William'],
-    'Bob': ['Robert'],
-    'Dan': ['Daniel'],
-    'Dave': ['David'],
-    'Jim': ['James'],
-    'Joe': ['Joseph'],
-    'Tom': ['Thomas'],
-    'Ben': ['Benjamin'],
-    'Josh': ['Joshua'],
-    'Tim': ['Timothy'],
-    'Steve': ['Steven'],
-    'Rob': ['Robert'],
-    'Rick': ['Richard'],
-    'Ondřej':['Ondrej'],
-    'Mitchell':['Mitch'],
-    'Evgeny':['Evgenii'],
-    'Oscar':['Oskar'],
-    'Pat':['Patrick'],
-    'Tomáš':['Tomas'],
-    'Dmitri':['Dmitry'],
-    'Dmitry':['Dmitry'],
-    'Evgenii':['Evgenii'],
-    'Evgeny':['Evgenii'],
-    'Anze':['Anže'],
-    'JJ':['John-Jason'],
-    'André':['Andre'],
-    'Matty':['Matthew'],
-    'Vasily':['Vasili'],
-    'Jim':['James'],
-    'Zach':['Zachary'],
-    'Matthew':['Matty'],
-    'Alexei':['Alexey'],
-    'Alexey':['Alexey'],
-    'Dmitry':['Dmitry'],
-    'Evgenii':['Evgenii'],
-    'Evgeny':['Evgenii'],
-    'Vasily':['Vasili'],
-    'Vasili':['Vasili'],
-    'Aliaksei':['Alexei'],
-    'Phillip':['Philip'],
-    'Erik':['Erik'],
-    'Dmitry':['Dmitry'],
-    'Evgeny':['Evgenii'],
-    'Evgenii':['Evgenii'],
-    'Jonathon':['Jon'],
-    'Frederick':['Frédérick'],
-    'Matthew':['Matt'],
-    'Vasily':['Vasili'],
-    'Vasili':['Vasily'],
-    'Matthew':['Matty'],
-    'Nick':['Nicholaus'],
-    'J.J.':['Janis'],
-    'Janis':['J.J.'],
-}
+def _lire_tableau_stats(contenu):
+    """
+    Extrait le tableau #player_stats en une seule passe lxml, avec des colonnes déjà typées.
+    La page est décodée en UTF-8 dès l'analyse : hockey-reference n'annonce pas toujours son
+    encodage, ce qui produisait des noms mal décodés qu'il fallait corriger cellule par cellule.
+    """
+    from lxml import etree
+    arbre = etree.fromstring(contenu, etree.HTMLParser(encoding='utf-8'))
+    table = arbre.xpath('//table[@id="player_stats"]')[0]
+    entetes = [''.join(th.itertext()).strip()
+               for th in table.xpath('./thead/tr[not(contains(@class, "over_header"))][last()]/*')]
+    # Les pages des saisons anciennes n'ont pas toutes les colonnes (tirs, temps de glace...)
+    positions = [entetes.index(colonne) if colonne in entetes else None for colonne in COLONNES_STATS]
+
+    lignes = []
+    # Les lignes d'en-tête répétées dans le corps du tableau ont la classe "thead"
+    for tr in table.xpath('./tbody/tr[not(contains(@class, "thead"))]'):
+        cellules = [''.join(cellule.itertext()).strip() for cellule in tr.xpath('./th|./td')]
+        lignes.append([(cellules[i] or None) if i is not None and i < len(cellules) else None for i in positions])
+
+    stats = pd.DataFrame(lignes, columns=COLONNES_STATS)
+    for colonne in COLONNES_NUMERIQUES:
+        stats[colonne] = pd.to_numeric(stats[colonne], errors='coerce')
+    return stats
+
+
+def nettoyer_stats(stats_table):
+    """Met le tableau extrait de hockey-reference au format des statistiques de l'application"""
+    stats_table_clean = stats_table[stats_table['Team'].apply(lambda x: len(str(x)) >= 3)]
+
+    stats_table_clean = stats_table_clean.fillna(0)
+    stats_table_clean[['Prénom', 'Nom']] = stats_table_clean['Player'].str.extract(r'([^\s]+)\s*(.*)', expand=True)
+    stats_table_clean['Prénom'] = stats_table_clean['Prénom'].fillna('Non disponible')
+    stats_table_clean['Nom'] = stats_table_clean['Nom'].fillna('Non disponible')
+    stats_table_clean.drop(columns=['Player'], inplace=True)
+    stats_table_clean['Nom'] = enlever_accents_serie(stats_table_clean['Nom'])
+    # Types compacts (voir schema.py) : catégories, petits entiers, float32 et ATOI en secondes
+    return appliquer_schema(stats_table_clean[['Prénom', 'Nom', 'Team', 'Pos', 'GP', 'G', 'A', 'SOG', 'SPCT', 'TSA', 'ATOI']])
+
+
+def scrape_player_stats(forcer=False, saison=SAISON_COURANTE):
+    """
+    Récupère les statistiques des joueurs sur hockey-reference.
+    La page et le tableau extrait sont mis en cache sur disque (voir cache_http.py) : `forcer`
+    revalide la page même si le cache n'a pas expiré.
+    """
+    from cache_http import CacheReponses
+    stats_table = CacheReponses().obtenir_dataframe(
+        URL_STATS_SAISON.format(saison=saison), _lire_tableau_stats,
+        headers=HEADERS_STATS, forcer=forcer, version=VERSION_TABLEAU_STATS
+    )
+    return nettoyer_stats(stats_table)
+
+
+# Nombre de navigateurs utilisés en parallèle pour parcourir les matchs
+NB_NAVIGATEURS = int(os.environ.get("ODDS_NB_NAVIGATEURS", 1))
+
+# Backend de récupération des cotes : "selenium", ou "http" (requêtes simples, repli sur Selenium si besoin)
+ODDS_BACKEND = os.environ.get("ODDS_BACKEND", "selenium")
+
+# Tableau long des cotes : une ligne par joueur et par bookmaker
+COLONNES_COTES = ['Prénom', 'Nom', 'Team', 'Bookmaker', 'Cote']
+
+# Backends de récupération des cotes (nom → module), importés au premier scraping qui les utilise.
+# Chaque module expose recuperer_tableaux(identifiants, nb_navigateurs, progression), qui retourne
+# les lignes brutes du tableau de chaque match
+BACKENDS_COTES = {"selenium": "cotes_selenium", "http": "cotes_http"}
+# Backend de repli quand le backend demandé échoue
+BACKEND_REPLI = "selenium"
+
+
+def charger_backend(nom):
+    """Module du backend de cotes `nom` (voir BACKENDS_COTES), importé à la première demande"""
+    if nom not in BACKENDS_COTES:
+        raise ValueError(f"Backend de cotes inconnu : {nom} (disponibles : {', '.join(BACKENDS_COTES)})")
+    return importlib.import_module(BACKENDS_COTES[nom])
+
 
-# Créer un dictionnaire inversé pour rechercher le prénom standard à partir d'une variation
-PRENOM_STANDARD = {}
-for standard, variations in PRENOM_VARIATIONS.items():
-    for var in variations:
-        PRENOM_STANDARD[var] = standard
-    PRENOM_STANDARD[standard] = standard
-
-def normaliser_prenom(prenom):
-    """Normalise un prénom en utilisant sa forme standard si elle existe"""
-    prenom = prenom.strip()
-    return PRENOM_STANDARD.get(prenom, prenom)
-
-def scrape_player_stats():
-    url_start = "https://www.hockey-reference.com/leagues/NHL_2025_skaters.html"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    data = requests.get(url_start, headers=headers)
-    soup = BeautifulSoup(data.text, "html.parser")
-    soup.find('tr', class_="over_header").decompose()
-    stats_table = soup.find(id="player_stats")
-
-    stats_table2024 = pd.read_html(str(stats_table))[0]
-    columns_to_keep = ["Player", "Team", "Pos", "GP", "G", "A", "SOG", "SPCT", "TSA", "ATOI"]
-    stats_table2024_clean = stats_table2024[columns_to_keep]
-    stats_table2024_clean = stats_table2024_clean[stats_table2024_clean['Team'].apply(lambda x: len(str(x)) >= 3)]
-
-    stats_table2024_clean = stats_table2024_clean.fillna(0)
-    stats_table2024_clean['Player'] = stats_table2024_clean['Player'].apply(lambda x: x.encode('latin1').decode('utf-8') if isinstance(x, str) else x)
-    stats_table2024_clean[['Prénom', 'Nom']] = stats_table2024_clean['Player'].str.extract(r'([^\s]+)\s*(.*)', expand=True)
-    stats_table2024_clean['Prénom'].fillna('Non disponible', inplace=True)
-    stats_table2024_clean['Nom'].fillna('Non disponible', inplace=True)
-    stats_table2024_clean.drop(columns=['Player'], inplace=True)
-    stats_table2024_clean['Nom'] = stats_table2024_clean['Nom'].apply(enlever_accents_avec_remplacement)
-    stats_table2024_clean = stats_table2024_clean[['Prénom', 'Nom', 'Team', 'Pos', 'GP', 'G', 'A', 'SOG', 'SPCT', 'TSA', 'ATOI']]
-    return stats_table2024_clean
-
-
-def select_all_nhl_matches_and_extract_data():
+def _parser_lignes(lignes):
     """
-    Sélectionne tous les matchs NHL et extrait les données
+    Convertit les lignes brutes du tableau en lignes [joueur, équipe, bookmaker, cote], une par
+    bookmaker ; un joueur sans aucune cote garde une ligne avec un bookmaker et une cote nuls.
     """
-    driver = None
     data = []
-    try:
-        # Utiliser les identifiants depuis les secrets Streamlit
-        username = st.secrets["credentials"]["username"]
-        password = st.secrets["credentials"]["password"]
-        
-        # Configuration de Chromium pour Streamlit Cloud
-        chrome_options = Options()
-        
-        # Configuration pour le mode headless
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        
-        # Configuration spécifique pour Chromium sur Debian
-        chrome_options.binary_location = "/usr/bin/chromium"
-        
-        # Options supplémentaires
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-infobars')
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        
-        # User agent
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        st.write("Configuration du navigateur Chromium en mode headless...")
-        
-        # Utilisation du ChromeDriver installé via packages.txt
-        service = Service('/usr/bin/chromedriver')
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.set_page_load_timeout(30)
-        
-        st.write("Navigateur Chromium démarré avec succès!")
-        # Vérification du mode headless
-        st.write(f"Mode headless actif: {driver.execute_script('return navigator.webdriver')}")
-        
-        login_url = "https://maxicotes.fr/wp-login.php"
-        driver.get(login_url)
-
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.ID, "user_login"))
-        )
-
-        username_input = driver.find_element(By.ID, "user_login")
-        username_input.send_keys(username)
-
-        password_input = driver.find_element(By.ID, "user_pass")
-        password_input.send_keys(password)
-
-        login_button = driver.find_element(By.ID, "wp-submit")
-        login_button.click()
+    for ligne in lignes:
+        full_text = ligne['joueur']
+        # Extraire le nom du joueur et l'équipe
+        match = re.match(r"(.*?)\s*\((.*?)\)", full_text)
+        if match:
+            player_name = match.group(1).strip()
+            team_name = match.group(2).strip()
+            # Convertir le nom complet de l'équipe en abréviation
+            team_abbrev = TEAM_MAPPING.get(team_name, "")
+        else:
+            player_name = re.sub(r"\s*\(.*?\)", "", full_text).strip()
+            team_abbrev = ""
 
-        try:
-            popup_close_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.pum-close.popmake-close"))
-            )
-            popup_close_button.click()
-        except:
-            print("No popup found or failed to close.")
+        bookmakers = ligne.get('bookmakers') or [str(k) for k in range(len(ligne['cotes']))]
+        cotes = [(bookmaker, float(cote)) for bookmaker, cote in zip(bookmakers, ligne['cotes']) if cote.strip()]
+        if cotes:
+            data.extend([player_name, team_abbrev, bookmaker, cote] for bookmaker, cote in cotes)
+        else:
+            data.append([player_name, team_abbrev, None, None])
+    return data
+
+
+def _recuperer_cotes(backend, nb_navigateurs, identifiants, progression):
+    """Lignes [joueur, équipe, bookmaker, cote] de tous les matchs, lues par le backend `backend`"""
+    tableaux = charger_backend(backend).recuperer_tableaux(identifiants, nb_navigateurs, progression)
+    return [ligne for lignes in tableaux for ligne in _parser_lignes(lignes)]
+
+
+def tableau_cotes(data):
+    """
+    Tableau long typé (une ligne par joueur et bookmaker, voir schema.py) des lignes
+    [joueur, équipe, bookmaker, cote] ; les agrégats par joueur sont calculés ensuite par
+    data_processing.agreger_cotes
+    """
+    df = pd.DataFrame(data, columns=["Player", "Team", "Bookmaker", "Cote"])
+    df[['Prénom', 'Nom']] = df['Player'].str.extract(r'([^\s]+)\s*(.*)', expand=True)
+    
+    # Nettoyage des données
+    df['Prénom'] = df['Prénom'].fillna('Non disponible')
+    df['Nom'] = df['Nom'].fillna('Non disponible')
+    
+    # Réorganisation des colonnes et types compacts (voir schema.py)
+    return appliquer_schema(df[COLONNES_COTES])
 
-        url = "https://maxicotes.fr/hockey-buteur"
-        driver.get(url)
-        time.sleep(2)
 
+def select_all_nhl_matches_and_extract_data(nb_navigateurs=None, backend=None, identifiants=None, progression=None):
+    """
+    Sélectionne tous les matchs NHL et extrait les données.
+    Le backend "http" lit les tableaux par simples requêtes et se replie sur Selenium s'ils ne sont
+    pas rendus côté serveur. Avec Selenium, les navigateurs proviennent d'un pool qui les garde
+    connectés entre deux exécutions ; avec nb_navigateurs > 1, les matchs sont répartis entre
+    plusieurs navigateurs. `identifiants` ({"username", "password"}) vient par défaut de config.py.
+    `progression` reçoit les messages d'avancement (par défaut, le journal du module).
+    """
+    backend = backend or ODDS_BACKEND
+    nb_navigateurs = nb_navigateurs or NB_NAVIGATEURS
+    progression = progression or logger.info
+    data = None
+    if backend != BACKEND_REPLI:
         try:
-            dropdown_button = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//button[contains(@class, 'accordion-btn') and contains(text(), 'NHL')]"))
-            )
-            driver.execute_script("arguments[0].scrollIntoView();", dropdown_button)
-            time.sleep(2)
-            dropdown_button.click()
-
-            bloc_nhl = WebDriverWait(driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, "//div[@class='panel' and preceding-sibling::button[contains(text(), 'NHL')]]"))
-            )
+            data = _recuperer_cotes(backend, nb_navigateurs, identifiants, progression)
+            progression(f"Cotes récupérées par {backend} ({len(data)} lignes)")
         except Exception as e:
-            print(f"Error opening NHL dropdown block: {e}")
-
+            logger.warning(f"Récupération {backend} impossible ({e}), utilisation de {BACKEND_REPLI}")
+    if data is None:
         try:
-            all_match_radios = driver.find_elements(By.XPATH, "//div[@class='panel' and preceding-sibling::button[contains(text(), 'NHL')]]//input[@type='radio'][@name='match']")
-            total_matches = len(all_match_radios)
-
-            for i in range(total_matches):
-                all_match_radios = driver.find_elements(By.XPATH, "//div[@class='panel' and preceding-sibling::button[contains(text(), 'NHL')]]//input[@type='radio'][@name='match']")
-                if i < len(all_match_radios):
-                    match_radio = all_match_radios[i]
-                    driver.execute_script("arguments[0].scrollIntoView();", match_radio)
-                    WebDriverWait(driver, 5).until(EC.element_to_be_clickable(match_radio)).click()
-                    time.sleep(1)
-
-                    try:
-                        rows = driver.find_elements(By.CSS_SELECTOR, "table.result-table tbody tr")
-                        for row in rows:
-                            player_cell = row.find_element(By.CSS_SELECTOR, "td")
-                            full_text = player_cell.text
-                            # Extraire le nom du joueur et l'équipe
-                            match = re.match(r"(.*?)\s*\((.*?)\)", full_text)
-                            if match:
-                                player_name = match.group(1).strip()
-                                team_name = match.group(2).strip()
-                                # Convertir le nom complet de l'équipe en abréviation
-                                team_abbrev = TEAM_MAPPING.get(team_name, "")
-                            else:
-                                player_name = re.sub(r"\s*\(.*?\)", "", full_text).strip()
-                                team_abbrev = ""
-
-                            odds_elements = row.find_elements(By.CSS_SELECTOR, "td.center-cell .oval-background")
-                            odds = {float(od.text) for od in odds_elements if od.text.strip()}
-                            if odds:
-                                highest_odd = max(odds)
-                                data.append([player_name, team_abbrev, highest_odd])
-                            else:
-                                data.append([player_name, team_abbrev, "Pas de cote disponible"])
-                    except Exception as e:
-                        print(f"Error extracting table data: {e}")
+            data = _recuperer_cotes(BACKEND_REPLI, nb_navigateurs, identifiants, progression)
         except Exception as e:
-            print(f"Error selecting matches: {e}")
-
-    except Exception as e:
-        st.error(f"Une erreur s'est produite lors du scraping: {str(e)}")
-        return pd.DataFrame()  # Retourner un DataFrame vide en cas d'erreur
-    finally:
-        if driver is not None:
-            try:
-                driver.quit()
-                st.write("Navigateur fermé avec succès")
-            except Exception:
-                st.warning("Erreur lors de la fermeture du navigateur")
+            logger.error(f"Une erreur s'est produite lors du scraping: {str(e)}")
+            return pd.DataFrame()  # Retourner un DataFrame vide en cas d'erreur
 
     # Si aucune donnée n'a été récupérée
     if not data:
-        st.warning("Aucune cote n'a été trouvée pour les joueurs.")
+        logger.warning("Aucune cote n'a été trouvée pour les joueurs.")
         return pd.DataFrame()
 
-    # Création du DataFrame avec les données récupérées
-    df = pd.DataFrame(data, columns=["Player", "Team", "Cote"])
-    df[['Prénom', 'Nom']] = df['Player'].str.extract(r'([^\s]+)\s*(.*)', expand=True)
-    
-    # Nettoyage des données
-    df['Prénom'] = df['Prénom'].fillna('Non disponible')
-    df['Nom'] = df['Nom'].fillna('Non disponible')
-    
-    # Réorganisation des colonnes
-    df = df[['Prénom', 'Nom', 'Team', 'Cote']]
-    
-    # Mettre en cache les résultats
-    if 'last_scraping_result' not in st.session_state:
-        st.session_state.last_scraping_result = None
-    st.session_state.last_scraping_result = df
-    
-    st.success(f"Scraping terminé avec succès! {len(df)} joueurs trouvés.")
+    df = tableau_cotes(data)
+    nb_joueurs = len(df[['Prénom', 'Nom', 'Team']].drop_duplicates())
+    progression(f"Scraping terminé avec succès! {nb_joueurs} joueurs trouvés.")
     return df
 
 
-def fusionner_donnees_par_prenom_nom(stats_df, odds_df):
+def fusionner_donnees_par_prenom_nom(stats_df, odds_df, audit=False, approche=False):
     """
     Fusionne les données de statistiques et de cotes des joueurs.
+    Les prénoms sont ramenés à leur identifiant canonique (voir prenoms.py) avant la jointure ;
+    un tableau long de cotes est d'abord résumé par joueur (meilleure cote). Avec `approche`, les
+    joueurs restés sans cote passent ensuite par l'appariement approché (voir appariement.py) ; la
+    colonne Appariement indique comment chaque cote a été trouvée. Avec `audit`, retourne aussi le
+    rapport des appariements approchés (vide sans `approche`).
     """
     # Faire une copie des DataFrames
     stats = stats_df.copy()
-    odds = odds_df.copy()
+    odds = agreger_cotes(odds_df).copy()
+    index_prenoms = charger_index_prenoms()
     
     # Normaliser les noms et prénoms
-    stats['Nom'] = stats['Nom'].apply(enlever_accents_avec_remplacement).str.strip()
-    stats['Prénom'] = stats['Prénom'].apply(normaliser_prenom)
-    odds['Nom'] = odds['Nom'].apply(enlever_accents_avec_remplacement).str.strip()
-    odds['Prénom'] = odds['Prénom'].apply(normaliser_prenom)
-    
-    # Créer une clé unique pour chaque joueur
-    stats['key'] = stats.apply(lambda x: f"{x['Prénom']}_{x['Nom']}", axis=1)
-    odds['key'] = odds.apply(lambda x: f"{x['Prénom']}_{x['Nom']}", axis=1)
-    
-    # Créer un dictionnaire des cotes avec gestion des variations de prénoms
-    cotes_dict = {}
-    for _, row in odds.iterrows():
-        key = f"{row['Prénom']}_{row['Nom']}"
-        cotes_dict[key] = row['Cote']
-        
-        # Ajouter des entrées pour les variations de prénoms
-        if row['Prénom'] in PRENOM_VARIATIONS:
-            for variation in PRENOM_VARIATIONS[row['Prénom']]:
-                var_key = f"{variation}_{row['Nom']}"
-                cotes_dict[var_key] = row['Cote']
-    
-    # Appliquer les cotes
-    def get_cote(row):
-        key = f"{row['Prénom']}_{row['Nom']}"
-        return cotes_dict.get(key, "Non disponible")
+    stats['Nom'] = enlever_accents_serie(stats['Nom']).str.strip()
+    stats['Prénom'] = stats['Prénom'].str.strip()
+    odds['Nom'] = enlever_accents_serie(odds['Nom']).str.strip()
     
-    # Ajouter les cotes
-    stats['Cote'] = stats.apply(get_cote, axis=1)
+    # Ajouter les cotes par une seule jointure sur la clé (prénom canonique, nom)
+    cles_stats = construire_cle(index_prenoms.canonicaliser(stats['Prénom']), stats['Nom'])
+    cles_cotes = construire_cle(index_prenoms.canonicaliser(odds['Prénom']), odds['Nom'])
+    stats['Cote'] = associer_cotes(cles_stats, cles_cotes, odds['Cote'])
     
-    # Nettoyer et retourner le résultat
-    stats = stats.drop('key', axis=1)
+    # Appariement approché (optionnel) des joueurs restés sans cote
+    stats['Cote'], stats['Appariement'], rapport = completer_cotes(stats, odds, cles_stats, cles_cotes,
+                                                                   approche=approche)
     
     # Trier seulement si la colonne Team existe
     if 'Team' in stats.columns:
-        return stats.sort_values(['Team', 'Nom'])
+        stats = stats.sort_values(['Team', 'Nom'])
     else:
-        return stats.sort_values('Nom')
+        stats = stats.sort_values('Nom')
+    return (stats, rapport) if audit else stats
@@ -0,0 +1,116 @@
+# stockage.py
+
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from schema import appliquer_schema
+
+# Dossier racine du stockage local : un sous-dossier par table, une partition par snapshot
+DOSSIER_DONNEES = os.environ.get("DATA_DIR", "data")
+FORMAT_HORODATAGE = "%Y%m%dT%H%M%S"
+PREFIXE_SNAPSHOT = "snapshot="
+
+TABLES = ("stats", "odds", "merged", "appariements")
+
+
+def _dossier_table(table, dossier=None):
+    if table not in TABLES:
+        raise ValueError(f"Table inconnue: {table}")
+    return os.path.join(dossier or DOSSIER_DONNEES, table)
+
+
+def _typer_colonnes(df):
+    """
+    Rend les colonnes objet compatibles avec un schéma Arrow : une colonne qui mêle nombres et
+    textes (ex: cotes et "Non disponible") devient numérique, les textes devenant nuls.
+    """
+    df = df.copy()
+    for colonne in df.columns:
+        if df[colonne].dtype == object:
+            non_nuls = df[colonne].dropna()
+            # Les colonnes de listes (ex: cotes de tous les bookmakers) sont gérées par Arrow
+            if len(non_nuls) and isinstance(non_nuls.iloc[0], (list, tuple, np.ndarray)):
+                continue
+            genre = pd.api.types.infer_dtype(df[colonne], skipna=True)
+            if genre in ("mixed", "mixed-integer"):
+                numerique = pd.to_numeric(df[colonne], errors='coerce')
+                df[colonne] = numerique if numerique.notna().any() else df[colonne].astype(str)
+    return df
+
+
+def lister_snapshots(table, dossier=None):
+    """Horodatages des snapshots d'une table, du plus ancien au plus récent"""
+    chemin = _dossier_table(table, dossier)
+    if not os.path.isdir(chemin):
+        return []
+    return sorted(
+        nom[len(PREFIXE_SNAPSHOT):] for nom in os.listdir(chemin)
+        if nom.startswith(PREFIXE_SNAPSHOT) and os.path.exists(os.path.join(chemin, nom, "part.parquet"))
+    )
+
+
+def dernier_snapshot(table, dossier=None):
+    snapshots = lister_snapshots(table, dossier)
+    return snapshots[-1] if snapshots else None
+
+
+def _table_arrow(df):
+    # Le schéma des tables de joueurs est conservé par Arrow : les lectures sont déjà typées
+    return pa.Table.from_pandas(_typer_colonnes(appliquer_schema(df)), preserve_index=False)
+
+
+def ecrire_snapshot(table, df, horodatage=None, dossier=None, conserver=None):
+    """
+    Écrit un DataFrame comme nouveau snapshot Parquet typé de `table` et retourne son horodatage.
+    Le fichier est écrit sous un nom temporaire puis renommé, pour qu'un lecteur ne voie jamais
+    un snapshot incomplet. `conserver` limite le nombre de snapshots gardés.
+    """
+    horodatage = (horodatage or datetime.now()).strftime(FORMAT_HORODATAGE)
+    chemin = os.path.join(_dossier_table(table, dossier), PREFIXE_SNAPSHOT + horodatage)
+    os.makedirs(chemin, exist_ok=True)
+    arrow_table = _table_arrow(df)
+    temporaire = os.path.join(chemin, "part.parquet.tmp")
+    pq.write_table(arrow_table, temporaire, compression="zstd")
+    os.replace(temporaire, os.path.join(chemin, "part.parquet"))
+
+    if conserver:
+        for ancien in lister_snapshots(table, dossier)[:-conserver]:
+            dossier_ancien = os.path.join(_dossier_table(table, dossier), PREFIXE_SNAPSHOT + ancien)
+            os.remove(os.path.join(dossier_ancien, "part.parquet"))
+            os.rmdir(dossier_ancien)
+    return horodatage
+
+
+def lire_table_arrow(table, horodatage=None, colonnes=None, dossier=None):
+    """Lit un snapshot (le plus récent par défaut) en table Arrow, avec un fichier mappé en mémoire"""
+    horodatage = horodatage or dernier_snapshot(table, dossier)
+    if horodatage is None:
+        return None
+    chemin = os.path.join(_dossier_table(table, dossier), PREFIXE_SNAPSHOT + horodatage, "part.parquet")
+    if colonnes is not None:
+        colonnes = [c for c in colonnes if c in pq.read_schema(chemin).names]
+    return pq.read_table(chemin, columns=colonnes, memory_map=True)
+
+
+def lire_snapshot(table, horodatage=None, colonnes=None, dossier=None):
+    """Lit un snapshot (le plus récent par défaut) en DataFrame, ou None s'il n'y en a pas"""
+    arrow_table = lire_table_arrow(table, horodatage, colonnes, dossier)
+    return arrow_table.to_pandas() if arrow_table is not None else None
+
+
+def serialiser_table(df):
+    """Table typée sérialisée en octets Parquet (zstd), au même format qu'un snapshot"""
+    tampon = pa.BufferOutputStream()
+    pq.write_table(_table_arrow(df), tampon, compression="zstd")
+    return tampon.getvalue().to_pybytes()
+
+
+def deserialiser_table(octets, colonnes=None):
+    """DataFrame typé lu depuis des octets produits par serialiser_table"""
+    fichier = pa.BufferReader(octets)
+    if colonnes is not None:
+        colonnes = [c for c in colonnes if c in pq.read_schema(fichier).names]
+    return pq.read_table(fichier, columns=colonnes).to_pandas()
@@ -0,0 +1,185 @@
+# taches.py
+
+import os
+import time
+import fcntl
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from config import FICHIER_CONFIG, charger_config, identifiants_cotes, identifiants_firebase
+from scraper import scrape_player_stats, select_all_nhl_matches_and_extract_data, fusionner_donnees_par_prenom_nom
+from data_processing import agreger_cotes
+from stockage import lire_snapshot, ecrire_snapshot, FORMAT_HORODATAGE
+from journal_cotes import ajouter_releve
+from indicateurs import calculer_indicateurs
+
+# Fichiers de verrou des tâches (un par type de tâche)
+DOSSIER_VERROUS = os.environ.get("TACHES_VERROUS_DIR", ".cache/verrous")
+# Intervalles par défaut du planificateur, en secondes
+INTERVALLE_STATS = int(os.environ.get("TACHES_INTERVALLE_STATS", 6 * 3600))
+INTERVALLE_COTES = int(os.environ.get("TACHES_INTERVALLE_COTES", 15 * 60))
+
+# Collections Firestore alimentées par la publication
+COLLECTIONS = {'stats': 'stats_joueurs_database', 'odds': 'cotes_joueurs_database'}
+
+logger = logging.getLogger(__name__)
+
+
+class TacheEnCours(Exception):
+    """Une tâche du même type tient déjà le verrou"""
+
+
+@contextmanager
+def verrou(nom, dossier=DOSSIER_VERROUS, attendre=False):
+    """
+    Verrou exclusif entre processus sur `nom` (flock, libéré par le système si le processus meurt).
+    Sans `attendre`, lève TacheEnCours si le verrou est déjà pris.
+    """
+    os.makedirs(dossier, exist_ok=True)
+    with open(os.path.join(dossier, f"{nom}.lock"), 'a+') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if attendre else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise TacheEnCours(f"Tâche {nom} déjà en cours")
+        # Le PID du détenteur aide au diagnostic d'un verrou bloqué
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")
+        f.flush()
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def tache_stats(config, progression=None):
+    """Scrape les statistiques et écrit un snapshot 'stats'"""
+    stats = scrape_player_stats(forcer=True)
+    horodatage = ecrire_snapshot('stats', stats)
+    logger.info(f"Statistiques : {len(stats)} joueurs (snapshot {horodatage})")
+
+
+def tache_cotes(config, progression=None):
+    """Scrape les cotes, écrit un snapshot 'odds' et ajoute le relevé au journal des cotes"""
+    cotes = select_all_nhl_matches_and_extract_data(identifiants=identifiants_cotes(config), progression=progression)
+    if cotes.empty:
+        raise RuntimeError("Aucune cote récupérée")
+    horodatage = ecrire_snapshot('odds', cotes)
+    ajouter_releve(cotes)
+    logger.info(f"Cotes : {len(cotes)} lignes (snapshot {horodatage})")
+
+
+def tache_fusion(config, progression=None):
+    """Fusionne les derniers snapshots de statistiques et de cotes en un snapshot 'merged'"""
+    stats, cotes = lire_snapshot('stats'), lire_snapshot('odds')
+    if stats is None or cotes is None:
+        raise FileNotFoundError("Snapshots de statistiques ou de cotes manquants")
+    fusion, rapport = fusionner_donnees_par_prenom_nom(stats, cotes, audit=True, approche=True)
+    fusion = calculer_indicateurs(fusion)
+    horodatage = ecrire_snapshot('merged', fusion)
+    # Rapport d'audit des appariements approchés, sous le même horodatage que la fusion
+    if not rapport.empty:
+        ecrire_snapshot('appariements', rapport, horodatage=datetime.strptime(horodatage, FORMAT_HORODATAGE))
+    logger.info(f"Fusion : {len(fusion)} joueurs, {int(fusion['Cote'].isna().sum())} sans cote, "
+                f"{int(rapport['Accepté'].sum())} appariements approchés (snapshot {horodatage})")
+
+
+def tache_publication(config, progression=None):
+    """Recopie les derniers snapshots dans Firestore (disposition choisie par FIRESTORE_MODE)"""
+    # Import tardif : firebase_admin n'est nécessaire que pour la publication
+    from firebase_utils import initialize_firebase, publier_table, decrire_lots
+    db = initialize_firebase(identifiants_firebase(config))
+    if db is None:
+        raise RuntimeError("Firebase indisponible")
+    for table, collection in COLLECTIONS.items():
+        df = lire_snapshot(table)
+        if df is None:
+            logger.warning(f"Publication : aucun snapshot '{table}'")
+            continue
+        resultat = publier_table(collection, agreger_cotes(df), db)
+        if resultat is False:
+            raise RuntimeError(f"Échec de la publication de {collection}")
+        for disposition, publie in resultat.items():
+            if publie:
+                logger.info(f"Publication de {collection} ({disposition}) : {decrire_lots(publie['lots'])}")
+
+
+TACHES = {
+    'stats': tache_stats,
+    'cotes': tache_cotes,
+    'fusion': tache_fusion,
+    'publication': tache_publication,
+}
+
+
+def executer(nom, config=None, attendre=False, progression=None):
+    """
+    Exécute une tâche sous son verrou. Retourne False si une exécution du même type est déjà
+    en cours (et que `attendre` est faux), True sinon ; les erreurs de la tâche sont propagées.
+    `progression` reçoit les messages d'avancement des scrapers (par défaut, leur journal).
+    """
+    config = config if config is not None else charger_config()
+    try:
+        with verrou(nom, attendre=attendre):
+            debut = time.perf_counter()
+            logger.info(f"Tâche {nom} : début")
+            TACHES[nom](config, progression)
+            logger.info(f"Tâche {nom} : terminée en {time.perf_counter() - debut:.1f}s")
+            return True
+    except TacheEnCours as e:
+        logger.warning(f"{e}, exécution ignorée")
+        return False
+
+
+def planifier(intervalles, config=None, publier=False, arret=None):
+    """
+    Exécute chaque tâche de `intervalles` ({nom: secondes}) à son propre rythme, dans son propre thread :
+    un scraping de statistiques long ne retarde pas celui des cotes. Avec `publier`, chaque exécution
+    réussie est suivie d'une fusion et d'une publication. S'arrête quand `arret` (threading.Event) est levé.
+    """
+    config = config if config is not None else charger_config()
+    arret = arret or threading.Event()
+
+    def boucle(nom, intervalle):
+        while not arret.is_set():
+            debut = time.monotonic()
+            try:
+                if executer(nom, config) and publier:
+                    # Fusion et publication attendent leur verrou : la seconde tâche terminée
+                    # doit elle aussi voir ses données fusionnées
+                    executer('fusion', config, attendre=True)
+                    executer('publication', config, attendre=True)
+            except Exception:
+                logger.exception(f"Tâche {nom} : échec")
+            arret.wait(max(0.0, intervalle - (time.monotonic() - debut)))
+
+    threads = [threading.Thread(target=boucle, args=(nom, intervalle), name=f"tache-{nom}", daemon=True)
+               for nom, intervalle in intervalles.items()]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1.0)
+    except KeyboardInterrupt:
+        logger.info("Arrêt du planificateur")
+        arret.set()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Scraping, fusion et publication des données NHL sans Streamlit")
+    parser.add_argument("tache", choices=list(TACHES) + ['planifier'])
+    parser.add_argument("--config", default=FICHIER_CONFIG, help="Fichier de configuration TOML")
+    parser.add_argument("--intervalle-stats", type=int, default=INTERVALLE_STATS)
+    parser.add_argument("--intervalle-cotes", type=int, default=INTERVALLE_COTES)
+    parser.add_argument("--publier", action="store_true", help="Fusionner et publier après chaque scraping planifié")
+    args = parser.parse_args()
+
+    config = charger_config(args.config)
+    if args.tache == 'planifier':
+        planifier({'stats': args.intervalle_stats, 'cotes': args.intervalle_cotes}, config, publier=args.publier)
+    elif not executer(args.tache, config):
+        raise SystemExit(1)
@@ -0,0 +1,112 @@
+# travaux.py
+
+import uuid
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Journaux dont les messages sont recopiés dans la progression du travail qui les émet
+JOURNAUX_SUIVIS = ("scraper", "taches", "cache_http", "navigateurs", "cotes_http", "cotes_selenium")
+
+EN_ATTENTE = "en attente"
+EN_COURS = "en cours"
+TERMINE = "terminé"
+ECHEC = "échec"
+
+
+class Travail:
+    """Un travail soumis au gestionnaire : état, horodatages, résultat ou erreur et progression"""
+
+    def __init__(self, nom):
+        self.id = uuid.uuid4().hex[:8]
+        self.nom = nom
+        self.etat = EN_ATTENTE
+        self.soumis_le = datetime.now()
+        self.debut = None
+        self.fin = None
+        self.resultat = None
+        self.erreur = None
+        self.messages = deque(maxlen=50)
+
+    def progression(self, message):
+        """Ajoute un message d'avancement (callback `progression` des scrapers)"""
+        self.messages.append(message)
+
+    @property
+    def termine(self):
+        return self.etat in (TERMINE, ECHEC)
+
+    @property
+    def duree(self):
+        if self.debut is None:
+            return 0.0
+        return ((self.fin or datetime.now()) - self.debut).total_seconds()
+
+
+class _CaptureProgression(logging.Handler):
+    """Range chaque message de journal dans la progression du travail exécuté par le thread émetteur"""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.travaux_par_thread = {}
+
+    def emit(self, record):
+        travail = self.travaux_par_thread.get(record.thread)
+        if travail is not None:
+            travail.messages.append(record.getMessage())
+
+
+class GestionnaireTravaux:
+    """
+    Exécute des travaux en arrière-plan dans un pool de threads, avec au plus un travail en cours
+    par nom : soumettre un travail déjà en cours retourne le travail existant.
+    Destiné à être partagé entre toutes les sessions de l'application.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="travail")
+        self._verrou = threading.Lock()
+        self._derniers = {}
+        self._capture = _CaptureProgression()
+        for nom in JOURNAUX_SUIVIS:
+            journal = logging.getLogger(nom)
+            journal.addHandler(self._capture)
+            if journal.getEffectiveLevel() > logging.INFO:
+                journal.setLevel(logging.INFO)
+
+    def soumettre(self, nom, fonction, *args, **kwargs):
+        """Lance `fonction(*args, **kwargs)` en arrière-plan, sauf si un travail `nom` est déjà en cours"""
+        with self._verrou:
+            travail = self._derniers.get(nom)
+            if travail is not None and not travail.termine:
+                return travail
+            travail = Travail(nom)
+            self._derniers[nom] = travail
+        self._executor.submit(self._executer, travail, fonction, args, kwargs)
+        return travail
+
+    def travail_courant(self):
+        """Travail exécuté par le thread appelant, ou None en dehors d'un travail"""
+        return self._capture.travaux_par_thread.get(threading.get_ident())
+
+    def dernier(self, nom):
+        """Dernier travail soumis sous ce nom (en cours ou terminé), ou None"""
+        return self._derniers.get(nom)
+
+    def _executer(self, travail, fonction, args, kwargs):
+        thread = threading.get_ident()
+        self._capture.travaux_par_thread[thread] = travail
+        travail.debut = datetime.now()
+        travail.etat = EN_COURS
+        try:
+            travail.resultat = fonction(*args, **kwargs)
+            travail.etat = TERMINE
+        except Exception as e:
+            logging.getLogger(__name__).exception(f"Travail {travail.nom} : échec")
+            travail.erreur = str(e)
+            travail.etat = ECHEC
+        finally:
+            travail.fin = datetime.now()
+            self._capture.travaux_par_thread.pop(thread, None)